@@ -0,0 +1,91 @@
+import concurrent.futures
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.devices.models import Device
+from netconf_lib.connection import get_pool
+from netconf_lib.nokia_snapshot import SNAPSHOT_PARTS
+from netconf_lib.planner import fetch_datasets
+
+
+class Command(BaseCommand):
+    help = "Compare fleet fan-out throughput of the threaded ncclient path and the " \
+           "asyncio backend against a local fake NETCONF server."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--devices", type=int, default=200,
+            help="Number of simulated devices to poll (default: 200)",
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.05,
+            help="Simulated per-RPC device latency in seconds (default: 0.05)",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=5,
+            help="Thread pool size for the threaded path (default: 5, as in build_topology)",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=500,
+            help="Max concurrent sessions for the asyncio path (default: 500)",
+        )
+        parser.add_argument(
+            "--skip-threaded", action="store_true",
+            help="Only run the asyncio path (useful for very large --devices)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from netconf_lib.aio import fetch_fleet
+            from netconf_lib.fakeserver import FakeNetconfServer
+        except ImportError as e:
+            raise CommandError(f"asyncssh is required for this benchmark: {e}")
+
+        server = FakeNetconfServer(latency=options["latency"])
+        port = server.start_in_thread()[0]
+        names = list(SNAPSHOT_PARTS.values())
+
+        # In-memory devices only; nothing is written to the database.
+        template = Device(username="bench")
+        template.set_password("bench")
+        devices = []
+        for i in range(options["devices"]):
+            device = Device(
+                pk=i + 1, name=f"sim-{i}", hostname="127.0.0.1", port=port, username="bench",
+            )
+            device.encrypted_password = template.encrypted_password
+            devices.append(device)
+
+        self.stdout.write(
+            f"Polling {len(devices)} simulated devices "
+            f"({options['latency'] * 1000:.0f} ms/RPC, datasets: {', '.join(names)})"
+        )
+
+        threaded = None
+        if not options["skip_threaded"]:
+            start = time.perf_counter()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                results = list(executor.map(lambda d: fetch_datasets(d, names), devices))
+            threaded = time.perf_counter() - start
+            get_pool().close_all()
+            self._report(f"threaded ({options['workers']} workers)", threaded, results)
+
+        start = time.perf_counter()
+        results = list(fetch_fleet(devices, names, limit=options["limit"]).values())
+        asyncio_elapsed = time.perf_counter() - start
+        self._report(f"asyncio (limit {options['limit']})", asyncio_elapsed, results)
+
+        server.stop_thread()
+
+        if threaded:
+            self.stdout.write(self.style.SUCCESS(
+                f"Speedup: {threaded / asyncio_elapsed:.1f}x"
+            ))
+
+    def _report(self, label, elapsed, results):
+        failed = sum(1 for r in results if any(v.get("error") for v in r.values()))
+        self.stdout.write(
+            f"  {label:<24} {elapsed:8.2f}s  "
+            f"{len(results) / elapsed:8.1f} devices/s  ({failed} failed)"
+        )
@@ -0,0 +1,193 @@
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from netconf_lib import (
+    benchdata, nokia_fdb, nokia_ldp, nokia_logs, nokia_mpls, nokia_port_stats, nokia_routing,
+)
+from netconf_lib.parsing import page_of, parse_xml
+
+# name -> (generator, size option, parser, result key)
+PARSERS = {
+    "fdb": (benchdata.fdb_xml, "macs", nokia_fdb._parse_fdb, "entries"),
+    "fdb_page": (
+        benchdata.fdb_xml, "macs",
+        lambda xml_data: {"entries": page_of(nokia_fdb.iter_fdb(xml_data), 1, 100)[0]},
+        "entries",
+    ),
+    "route_table": (benchdata.route_table_xml, "routes", nokia_routing._parse_route_table, "routes"),
+    "route_table_page": (
+        benchdata.route_table_xml, "routes",
+        lambda xml_data: {"routes": page_of(nokia_routing.iter_routes(xml_data), 1, 100)[0]},
+        "routes",
+    ),
+    "port_stats": (benchdata.port_stats_xml, "ports", nokia_port_stats._parse_port_stats, "ports"),
+    "ldp_bindings": (benchdata.ldp_bindings_xml, "bindings", nokia_ldp._parse_ldp_bindings, "bindings"),
+    "mpls_lsps": (benchdata.mpls_lsps_xml, "lsps", nokia_mpls._parse_mpls_lsps, "lsps"),
+    "log_entries": (benchdata.log_entries_xml, "events", nokia_logs._parse_log_entries, "entries"),
+}
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "parsers.json"
+
+
+class Command(BaseCommand):
+    help = "Benchmark the NETCONF reply parsers on large synthetic SR OS replies " \
+           "(time, peak memory, allocations) and compare against a JSON baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "parsers", nargs="*", metavar="PARSER",
+            help=f"Parsers to run (default: all of {', '.join(PARSERS)})",
+        )
+        parser.add_argument("--routes", type=int, default=100000, help="Routes (default: 100000)")
+        parser.add_argument("--macs", type=int, default=200000, help="FDB MACs (default: 200000)")
+        parser.add_argument("--ports", type=int, default=1000, help="Ports (default: 1000)")
+        parser.add_argument(
+            "--bindings", type=int, default=20000, help="LDP bindings (default: 20000)",
+        )
+        parser.add_argument("--lsps", type=int, default=2000, help="MPLS LSPs (default: 2000)")
+        parser.add_argument("--events", type=int, default=10000, help="Log events (default: 10000)")
+        parser.add_argument(
+            "--repeat", type=int, default=3,
+            help="Timed runs per parser; the fastest is reported (default: 3)",
+        )
+        parser.add_argument(
+            "--tree", action="store_true",
+            help="Hand the parsers an already parsed reply tree, as the getters get from "
+                 "ncclient, instead of the XML string (compare with --baseline)",
+        )
+        parser.add_argument(
+            "--baseline", default=str(DEFAULT_BASELINE),
+            help=f"Baseline JSON file (default: {DEFAULT_BASELINE})",
+        )
+        parser.add_argument(
+            "--save-baseline", action="store_true",
+            help="Write this run's results as the new baseline",
+        )
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25,
+            help="Allowed slowdown/growth over the baseline before flagging (default: 0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--fail-on-regression", action="store_true",
+            help="Exit with an error if any parser regressed (for CI)",
+        )
+
+    def handle(self, *args, **options):
+        names = options["parsers"] or list(PARSERS)
+        unknown = [n for n in names if n not in PARSERS]
+        if unknown:
+            raise CommandError(f"Unknown parser(s): {', '.join(unknown)}")
+
+        baseline_path = Path(options["baseline"])
+        baseline = {}
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text()).get("results", {})
+
+        self.stdout.write(
+            f"{'parser':<18}{'size':>9}{'reply':>10}{'time':>11}{'peak mem':>12}"
+            f"{'allocs':>11}{'retained':>11}"
+        )
+        results = {}
+        regressions = []
+        for name in names:
+            generate, size_option, parse, key = PARSERS[name]
+            size = options[size_option]
+            xml_data = generate(size)
+            reply_bytes = len(xml_data)
+            if options["tree"]:
+                xml_data = parse_xml(xml_data)
+            result = measure(parse, xml_data, options["repeat"])
+            result.update({"size": size, "reply_bytes": reply_bytes})
+            del xml_data
+
+            # A parser that silently returns nothing would look very fast.
+            if result.pop("rows") == 0 and size:
+                raise CommandError(f"{name} parsed 0 {key} from a {size}-row reply")
+
+            results[name] = result
+            self.stdout.write(
+                f"{name:<18}{size:>9}{result['reply_bytes'] / 1e6:>8.1f}MB"
+                f"{result['seconds'] * 1000:>9.0f}ms{result['peak_bytes'] / 1e6:>10.1f}MB"
+                f"{result['allocations']:>11,}{result['retained_bytes'] / 1e6:>9.1f}MB"
+            )
+            for problem in compare(result, baseline.get(name), options["tolerance"]):
+                regressions.append(f"{name}: {problem}")
+                self.stdout.write(self.style.WARNING(f"  REGRESSION {problem}"))
+
+        if options["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+        elif not baseline:
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline to create one.")
+
+        if regressions:
+            message = f"{len(regressions)} regression(s) over {options['tolerance']:.0%} tolerance"
+            if options["fail_on_regression"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        elif baseline:
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+
+def measure(parse, xml_data, repeat=3):
+    """Time ``parse(xml_data)`` (best of ``repeat``), then trace its memory once.
+
+    ``allocations`` counts memory blocks allocated during the parse,
+    ``peak_bytes`` the traced high-water mark, ``retained_bytes`` what the
+    returned result still holds.
+    """
+    best = None
+    rows = 0
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        start = time.perf_counter()
+        result = parse(xml_data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        rows = max((len(v) for v in result.values() if isinstance(v, list)), default=0)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = parse(xml_data)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    allocations = sum(max(stat.count_diff, 0) for stat in diff)
+    retained = sum(stat.size_diff for stat in diff)
+    del result
+
+    return {
+        "seconds": round(best, 6),
+        "peak_bytes": peak,
+        "allocations": allocations,
+        "retained_bytes": max(retained, 0),
+        "rows": rows,
+    }
+
+
+def compare(result, previous, tolerance):
+    """Yield a description of every metric that grew by more than ``tolerance``."""
+    if not previous or previous.get("size") != result["size"]:
+        return
+    for metric, label in (("seconds", "time"), ("peak_bytes", "peak memory"), ("allocations", "allocations")):
+        old, new = previous.get(metric), result[metric]
+        if old and new > old * (1 + tolerance):
+            yield f"{label} {new / old - 1:+.0%} ({old:,} -> {new:,})"
@@ -0,0 +1,111 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.devices.models import Device
+
+
+class Command(BaseCommand):
+    help = "Run a local fleet of simulated SR OS NETCONF devices for load tests " \
+           "(one SSH listener per device on 127.0.0.1)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--devices", type=int, default=10,
+            help="Number of simulated routers (default: 10)",
+        )
+        parser.add_argument(
+            "--host", default="127.0.0.1",
+            help="Address to listen on (default: 127.0.0.1)",
+        )
+        parser.add_argument(
+            "--base-port", type=int, default=0,
+            help="First listening port; devices get consecutive ports "
+                 "(default: 0 = any free port)",
+        )
+        parser.add_argument("--ports", type=int, default=48, help="Ports per device (default: 48)")
+        parser.add_argument(
+            "--macs", type=int, default=1000, help="FDB entries per device (default: 1000)",
+        )
+        parser.add_argument(
+            "--routes", type=int, default=1000, help="IPv4 routes per device (default: 1000)",
+        )
+        parser.add_argument(
+            "--services", type=int, default=10, help="VPLS services per device (default: 10)",
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.0,
+            help="Simulated processing time per RPC in seconds (default: 0)",
+        )
+        parser.add_argument(
+            "--register", action="store_true",
+            help="Create/update Device rows sim-0..sim-N pointing at the simulators "
+                 "(username/password: admin/admin)",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=0,
+            help="Stop after this many seconds (default: 0 = run until Ctrl-C)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from netconf_lib.simulator import SimulatedFleetData, SrosSimulator, system_ip
+        except ImportError as e:
+            raise CommandError(f"asyncssh is required for the simulator: {e}")
+
+        count = options["devices"]
+        if count < 1:
+            raise CommandError("--devices must be at least 1")
+        base = options["base_port"]
+        ports = [base + i for i in range(count)] if base else [0] * count
+
+        start = time.perf_counter()
+        data = SimulatedFleetData(
+            devices=count, ports=options["ports"], macs=options["macs"],
+            routes=options["routes"], services=options["services"],
+        )
+        server = SrosSimulator(data, latency=options["latency"])
+        try:
+            bound = server.start_in_thread(options["host"], ports)
+        except OSError as e:
+            raise CommandError(f"Could not listen: {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} simulated routers listening on {options['host']} "
+            f"(ports {min(bound)}..{max(bound)}) in {time.perf_counter() - start:.1f}s"
+        ))
+        self.stdout.write(
+            f"Per device: {data.ports} ports, {data.macs} MACs, {data.routes} routes, "
+            f"{data.services} VPLS, {options['latency'] * 1000:.0f} ms/RPC"
+        )
+
+        if options["register"]:
+            for index, port in enumerate(bound):
+                device, _ = Device.objects.update_or_create(
+                    name=f"sim-{index}",
+                    defaults={
+                        "hostname": options["host"], "port": port, "username": "admin",
+                        "notes": f"Simulated router (system IP {system_ip(index)})",
+                    },
+                )
+                device.set_password("admin")
+                device.save()
+            self.stdout.write(f"Registered devices sim-0..sim-{count - 1}")
+        else:
+            for index, port in enumerate(bound[:5]):
+                self.stdout.write(f"  sim-{index}: {options['host']}:{port}  (any username/password)")
+            if count > 5:
+                self.stdout.write(f"  ... and {count - 5} more")
+
+        stopped_at = time.monotonic() + options["duration"] if options["duration"] else None
+        try:
+            while stopped_at is None or time.monotonic() < stopped_at:
+                time.sleep(min(10, options["duration"] or 10))
+                self.stdout.write(
+                    f"sessions={server.sessions} rpcs={server.rpcs} edits={server.edits} "
+                    f"commits={sum(d.commits for d in server.devices.values())}"
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop_thread()
+            self.stdout.write("Simulators stopped.")
@@ -38,23 +38,66 @@ def bgp_peers(request, pk):
 
 # --- Route Table ---
 
+ROUTES_PER_PAGE = (50, 100, 500, 1000)
+ROUTE_MATCH_MODES = {
+    "contains": "Contains",
+    "exact": "Exact prefix",
+    "longest": "Longest match",
+}
+
+
 @login_required
 def route_table(request, pk):
     device = get_object_or_404(Device, pk=pk)
     routes = []
+    total = 0
     error = None
     prefix_filter = request.GET.get("prefix", "")
     try:
-        from netconf_lib.nokia_routing import get_route_table
-        result = get_route_table(device, prefix_filter=prefix_filter or None)
-        routes = result.get("routes", [])
+        page = max(int(request.GET.get("page", 1)), 1)
+        per_page = int(request.GET.get("per_page", ROUTES_PER_PAGE[1]))
+    except ValueError:
+        page, per_page = 1, ROUTES_PER_PAGE[1]
+    if per_page not in ROUTES_PER_PAGE:
+        per_page = ROUTES_PER_PAGE[1]
+    match = request.GET.get("match", "contains")
+    if match not in ROUTE_MATCH_MODES:
+        match = "contains"
+    reply_bytes = None
+    try:
+        if match != "contains" and prefix_filter:
+            # Exact / longest-prefix lookups run on the router (key-qualified filter).
+            from netconf_lib.nokia_routing import lookup_routes
+            result = lookup_routes(device, prefix_filter, match=match)
+            reply_bytes = result.get("reply_bytes")
+            routes = result.get("routes", [])
+            total = len(routes)
+            page = 1
+        else:
+            from netconf_lib.nokia_routing import get_route_table_page
+            result = get_route_table_page(
+                device, prefix_filter=prefix_filter or None, page=page, per_page=per_page,
+            )
+            routes = result.get("routes", [])
+            total = result.get("total", 0)
         error = result.get("error")
     except Exception as e:
         error = str(e)
+    num_pages = max(-(-total // per_page), 1)
     return render(request, "debugging/route_table.html", {
         "device": device,
         "routes": routes,
         "prefix_filter": prefix_filter,
+        "match": match,
+        "match_modes": ROUTE_MATCH_MODES,
+        "reply_bytes": reply_bytes,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "per_page_choices": ROUTES_PER_PAGE,
+        "num_pages": num_pages,
+        "first_index": (page - 1) * per_page + 1 if routes else 0,
+        "last_index": (page - 1) * per_page + len(routes),
         "error": error,
         "devices": Device.objects.all(),
     })
@@ -67,16 +110,18 @@ def port_utilization(request, pk):
     device = get_object_or_404(Device, pk=pk)
     ports = []
     error = None
+    elapsed = None
     try:
         from netconf_lib.nokia_port_stats import get_port_utilization
         result = get_port_utilization(device)
-        ports = result.get("ports", [])
+        ports, elapsed = _with_rates(device, result.get("ports", []))
         error = result.get("error")
     except Exception as e:
         error = str(e)
     return render(request, "debugging/port_utilization.html", {
         "device": device,
         "ports": ports,
+        "elapsed": elapsed,
         "error": error,
         "devices": Device.objects.all(),
     })
@@ -89,11 +134,47 @@ def port_utilization_ajax(request, pk):
     try:
         from netconf_lib.nokia_port_stats import get_port_utilization
         result = get_port_utilization(device)
+        result["ports"], result["elapsed"] = _with_rates(device, result["ports"])
         return JsonResponse(result)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+PORT_SNAPSHOT_TTL = 3600
+
+
+def _with_rates(device, ports):
+    """Port rows as dicts plus bps/utilization/error rates since the last poll.
+
+    The previous counter snapshot of each device is the one in the database
+    (PortCounterState), shared with sample_port_counters, so the first poll
+    (or one after PORT_SNAPSHOT_TTL) has no rates. The traffic in between is
+    stored as samples too, so the sampler's history has no gap for it.
+    Returns ``(rows, seconds since the previous poll or None)``.
+    """
+    from apps.monitoring.port_history import (
+        SNAPSHOT_TTL, build_samples, previous_snapshots, save_samples, save_snapshots,
+    )
+    from netconf_lib.counters import PortCounterSnapshot, rate_rows
+    from netconf_lib.records import as_dicts
+
+    rows = as_dicts(ports)
+    if not ports:
+        return rows, None
+    snapshot = PortCounterSnapshot.from_ports(ports)
+    previous = previous_snapshots([device], PORT_SNAPSHOT_TTL).get(device.pk)
+    save_snapshots({device.pk: snapshot})
+    rates = snapshot.rates(previous) if previous is not None else None
+    if rates is None:
+        return rows, None
+    if rates["elapsed"] <= SNAPSHOT_TTL:
+        save_samples(build_samples(device, snapshot, previous))
+    per_port = rate_rows(rates)
+    for row in rows:
+        row.update(per_port[row["port_id"]])
+    return rows, round(rates["elapsed"], 1)
+
+
 # --- SAP Statistics ---
 
 @login_required
@@ -182,13 +263,14 @@ def ldp_sessions(request, pk):
     statistics = {}
     error = None
     try:
-        from netconf_lib.nokia_ldp import get_ldp_bindings, get_ldp_sessions
-        session_result = get_ldp_sessions(device)
+        from netconf_lib.planner import fetch_datasets
+        data = fetch_datasets(device, ["ldp_sessions", "ldp_bindings"])
+        session_result = data["ldp_sessions"]
         sessions = session_result.get("sessions", [])
         statistics = session_result.get("statistics", {})
         error = session_result.get("error")
 
-        binding_result = get_ldp_bindings(device)
+        binding_result = data["ldp_bindings"]
         bindings = binding_result.get("bindings", [])
     except Exception as e:
         error = str(e)
@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.devices.models import (
+    Device, _derive_fernet_key, _get_fernet, _machine_salt, clear_fernet_cache,
+)
+from cryptography.fernet import Fernet
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the per-connection cost of Device.get_password() " \
+           "with and without the derived-key cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=20,
+            help="Number of simulated connections per measurement (default: 20)",
+        )
+        parser.add_argument(
+            "--devices", type=int, default=200,
+            help="Fleet size for the fleet decrypt measurement (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        fleet_size = options["devices"]
+
+        # In-memory devices only; nothing is written to the database.
+        device = Device(name="bench", hostname="192.0.2.1", username="admin")
+        device.set_password("bench-password")
+        fleet = []
+        for i in range(fleet_size):
+            d = Device(pk=i + 1, name=f"bench-{i}", hostname="192.0.2.1", username="admin")
+            d.encrypted_password = device.encrypted_password
+            fleet.append(d)
+
+        base_key = settings.FERNET_KEY
+        if isinstance(base_key, str):
+            base_key = base_key.encode()
+
+        # Before: every call re-runs PBKDF2 (what _get_fernet() used to do).
+        start = time.perf_counter()
+        for _ in range(iterations):
+            Fernet(_derive_fernet_key(base_key, _machine_salt())).decrypt(
+                bytes(device.encrypted_password)
+            )
+        uncached = (time.perf_counter() - start) / iterations
+
+        # After: first call derives, the rest hit the cache.
+        clear_fernet_cache()
+        _get_fernet()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            device.get_password()
+        cached = (time.perf_counter() - start) / iterations
+
+        # What a fleet poll does: one get_password() per device connect.
+        start = time.perf_counter()
+        for d in fleet:
+            d.get_password()
+        bulk = time.perf_counter() - start
+
+        self.stdout.write(f"Uncached get_password: {uncached * 1000:9.3f} ms/connection")
+        self.stdout.write(f"Cached get_password:   {cached * 1000:9.3f} ms/connection")
+        self.stdout.write(self.style.SUCCESS(
+            f"Speedup: {uncached / max(cached, 1e-9):,.0f}x  |  "
+            f"{fleet_size}-device poll: {uncached * fleet_size:.2f}s -> {cached * fleet_size:.4f}s"
+        ))
+        self.stdout.write(f"Decrypt of {fleet_size} devices (get_password each): {bulk * 1000:.2f} ms")
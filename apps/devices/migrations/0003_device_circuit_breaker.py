@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0002_device_credentials_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='circuit_open_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='connect_failures',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='last_connect_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
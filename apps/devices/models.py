@@ -1,30 +1,70 @@
+import base64
 import hashlib
 import os
+import threading
+from datetime import timedelta
 
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.db import models
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
 from cryptography.fernet import Fernet
 
 
+_fernet_cache = {}
+_fernet_lock = threading.Lock()
+
+
+def _machine_salt():
+    # Salt with a machine-specific value (hostname + OS-level secret if available)
+    machine_id = os.environ.get("COMPUTERNAME", os.environ.get("HOSTNAME", "nokia-nsp"))
+    return hashlib.sha256(machine_id.encode()).digest()
+
+
+def _derive_fernet_key(base_key, salt):
+    """Derive a Fernet-compatible key (32 bytes, base64url-encoded) via PBKDF2."""
+    derived = hashlib.pbkdf2_hmac("sha256", base_key, salt, iterations=100_000)
+    return base64.urlsafe_b64encode(derived[:32])
+
+
 def _get_fernet():
     """Get Fernet instance with key derived from FERNET_KEY + machine-specific salt.
 
     This adds defense-in-depth: even if someone steals the .env file,
     they also need access to the same machine to derive the same key.
+
+    The PBKDF2 derivation is deliberately slow, so the resulting Fernet is
+    memoized per (FERNET_KEY, salt). A changed key or salt simply misses the
+    cache; ``clear_fernet_cache`` drops it explicitly.
     """
     base_key = settings.FERNET_KEY
     if isinstance(base_key, str):
         base_key = base_key.encode()
+    cache_key = (base_key, _machine_salt())
 
-    # Salt with a machine-specific value (hostname + OS-level secret if available)
-    machine_id = os.environ.get("COMPUTERNAME", os.environ.get("HOSTNAME", "nokia-nsp"))
-    salt = hashlib.sha256(machine_id.encode()).digest()
+    fernet = _fernet_cache.get(cache_key)
+    if fernet is None:
+        with _fernet_lock:
+            fernet = _fernet_cache.get(cache_key)
+            if fernet is None:
+                fernet = Fernet(_derive_fernet_key(*cache_key))
+                # Only the current key is ever needed; don't keep old ones around.
+                _fernet_cache.clear()
+                _fernet_cache[cache_key] = fernet
+    return fernet
 
-    # Derive a Fernet-compatible key (32 bytes, base64url-encoded)
-    import base64
-    derived = hashlib.pbkdf2_hmac("sha256", base_key, salt, iterations=100_000)
-    fernet_key = base64.urlsafe_b64encode(derived[:32])
-    return Fernet(fernet_key)
+
+def clear_fernet_cache(**kwargs):
+    with _fernet_lock:
+        _fernet_cache.clear()
+
+
+@receiver(setting_changed)
+def _fernet_setting_changed(sender, setting, **kwargs):
+    if setting == "FERNET_KEY":
+        clear_fernet_cache()
 
 
 class Device(models.Model):
@@ -53,6 +93,11 @@ class Device(models.Model):
     )
     credentials_updated_at = models.DateTimeField(null=True, blank=True)
 
+    # NETCONF circuit breaker state, shared by all workers through the database
+    connect_failures = models.IntegerField(default=0)
+    circuit_open_until = models.DateTimeField(null=True, blank=True)
+    last_connect_error = models.CharField(max_length=255, blank=True)
+
     class Meta:
         ordering = ["name"]
 
@@ -66,3 +111,75 @@ class Device(models.Model):
     def get_password(self):
         f = _get_fernet()
         return f.decrypt(bytes(self.encrypted_password)).decode()
+
+    # --- NETCONF circuit breaker ---
+
+    @property
+    def circuit_open(self):
+        return bool(self.circuit_open_until and self.circuit_open_until > timezone.now())
+
+    def check_circuit(self):
+        """Fail fast if this device's circuit is open.
+
+        Raises CircuitOpenError while the backoff is running. Once it expires,
+        exactly one caller (across all workers) is let through as the half-open
+        probe; the others keep failing fast until the probe reports back.
+        """
+        from netconf_lib.connection import CircuitOpenError
+
+        if self._state.adding:
+            return  # Unsaved (in-memory) devices have no breaker state.
+        row = Device.objects.filter(pk=self.pk).values(
+            "circuit_open_until", "last_connect_error",
+        ).first()
+        if row is None or row["circuit_open_until"] is None:
+            return
+
+        now = timezone.now()
+        open_until = row["circuit_open_until"]
+        if open_until > now:
+            raise CircuitOpenError(
+                f"{self.name} is unreachable (circuit open until "
+                f"{open_until:%H:%M:%S}): {row['last_connect_error']}"
+            )
+
+        # Half-open: claim the probe by pushing open_until past one connect
+        # timeout. Only the worker whose UPDATE matched gets to probe.
+        probe_window = timedelta(seconds=getattr(settings, "NETCONF_TIMEOUT", 30) + 5)
+        claimed = Device.objects.filter(pk=self.pk, circuit_open_until=open_until).update(
+            circuit_open_until=now + probe_window,
+        )
+        if not claimed:
+            raise CircuitOpenError(f"{self.name} is unreachable (probe in progress)")
+
+    def record_connect_success(self):
+        if self._state.adding:
+            return
+        # Only write when something changes; a healthy device costs no UPDATE.
+        Device.objects.filter(pk=self.pk).exclude(
+            connect_failures=0, circuit_open_until=None, status="online",
+        ).update(connect_failures=0, circuit_open_until=None, status="online")
+        self.connect_failures = 0
+        self.circuit_open_until = None
+        self.status = "online"
+
+    def record_connect_failure(self, error):
+        if self._state.adding:
+            return
+        Device.objects.filter(pk=self.pk).update(connect_failures=F("connect_failures") + 1)
+        failures = Device.objects.filter(pk=self.pk).values_list(
+            "connect_failures", flat=True,
+        ).first() or 0
+        threshold = getattr(settings, "NETCONF_BREAKER_THRESHOLD", 3)
+        update = {"last_connect_error": str(error)[:255]}
+        if failures >= threshold:
+            backoff = min(
+                getattr(settings, "NETCONF_BREAKER_BACKOFF", 30) * 2 ** (failures - threshold),
+                getattr(settings, "NETCONF_BREAKER_MAX_BACKOFF", 900),
+            )
+            update["circuit_open_until"] = timezone.now() + timedelta(seconds=backoff)
+            update["status"] = "offline"
+        Device.objects.filter(pk=self.pk).update(**update)
+        self.connect_failures = failures
+        for field, value in update.items():
+            setattr(self, field, value)
@@ -95,7 +95,8 @@ def device_test(request, pk):
     device = get_object_or_404(Device, pk=pk)
     try:
         from netconf_lib.connection import netconf_connect
-        with netconf_connect(device) as mgr:
+        # An explicit test always probes, even while the circuit breaker is open.
+        with netconf_connect(device, check_circuit=False) as mgr:
             device.status = "online"
             device.save(update_fields=["status"])
             return JsonResponse({"status": "success", "message": f"Connected to {device.hostname}"})
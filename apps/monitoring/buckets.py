@@ -0,0 +1,9 @@
+from datetime import timedelta, timezone as dt_timezone
+
+
+def truncate(moment, period):
+    """Start of the hour/day (UTC) containing ``moment``."""
+    moment = moment.astimezone(dt_timezone.utc)
+    if period >= timedelta(days=1):
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
@@ -0,0 +1,202 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from apps.monitoring.buckets import truncate
+from apps.monitoring.models import DeviceHealthRollup, DeviceHealthScore
+
+BATCH_SIZE = 500
+SEVERITY_FIELDS = ("critical_count", "major_count", "minor_count", "warning_count", "total_events")
+
+# How long a window each resolution is shown for in the detail view.
+RAW_WINDOW = timedelta(hours=48)
+HOURLY_WINDOW = timedelta(days=31)
+
+
+def roll_up(now=None):
+    """Compact completed hours of raw scores into "1h" rows and days of those into "1d".
+
+    Only periods after the newest existing rollup of each resolution are
+    built, so it is safe to run every poll cycle. Returns ``{resolution:
+    rows created}``.
+    """
+    now = now or timezone.now()
+    return {
+        DeviceHealthRollup.HOUR: _roll_up_hours(now),
+        DeviceHealthRollup.DAY: _roll_up_days(now),
+    }
+
+
+def _roll_up_hours(now):
+    period = timedelta(hours=1)
+    start = _next_bucket(DeviceHealthRollup.HOUR, period)
+    if start is None:
+        start = DeviceHealthScore.objects.aggregate(first=Min("checked_at"))["first"]
+    until = truncate(now, period)
+    if start is None or start >= until:
+        return 0
+    rows = (
+        DeviceHealthScore.objects
+        .filter(checked_at__gte=truncate(start, period), checked_at__lt=until)
+        .annotate(period=TruncHour("checked_at"))
+        .values("device_id", "period")
+        .annotate(
+            n=Count("id"), low=Min("score"), mean=Avg("score"), high=Max("score"),
+            **{f"sum_{name}": Sum(name) for name in SEVERITY_FIELDS},
+        )
+        .order_by()
+    )
+    return _save(DeviceHealthRollup.HOUR, rows)
+
+
+def _roll_up_days(now):
+    period = timedelta(days=1)
+    start = _next_bucket(DeviceHealthRollup.DAY, period)
+    if start is None:
+        start = DeviceHealthRollup.objects.filter(
+            resolution=DeviceHealthRollup.HOUR,
+        ).aggregate(first=Min("bucket"))["first"]
+    until = truncate(now, period)
+    if start is None or start >= until:
+        return 0
+    rows = (
+        DeviceHealthRollup.objects
+        .filter(resolution=DeviceHealthRollup.HOUR,
+                bucket__gte=truncate(start, period), bucket__lt=until)
+        .annotate(period=TruncDay("bucket"))
+        .values("device_id", "period")
+        .annotate(
+            n=Sum("samples"), low=Min("min_score"), high=Max("max_score"),
+            weighted=Sum(F("avg_score") * F("samples")),
+            **{f"sum_{name}": Sum(name) for name in SEVERITY_FIELDS},
+        )
+        .order_by()
+    )
+    return _save(DeviceHealthRollup.DAY, rows)
+
+
+def _next_bucket(resolution, period):
+    latest = DeviceHealthRollup.objects.filter(resolution=resolution).aggregate(
+        latest=Max("bucket"),
+    )["latest"]
+    return latest + period if latest else None
+
+
+def _save(resolution, rows):
+    rollups = []
+    for row in rows.iterator():
+        if "mean" in row:
+            mean = row["mean"]
+        else:  # daily: hourly averages weighted by their sample counts
+            mean = row["weighted"] / row["n"] if row["n"] else 0
+        rollups.append(DeviceHealthRollup(
+            device_id=row["device_id"], resolution=resolution, bucket=row["period"],
+            samples=row["n"], min_score=row["low"], avg_score=mean or 0, max_score=row["high"],
+            **{name: row[f"sum_{name}"] or 0 for name in SEVERITY_FIELDS},
+        ))
+    with transaction.atomic():
+        DeviceHealthRollup.objects.bulk_create(rollups, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(rollups)
+
+
+def prune(now=None):
+    """Delete raw scores and rollups past HEALTH_RETENTION_DAYS.
+
+    Nothing is deleted before it has been rolled up into the next
+    resolution. Returns ``{"raw"/"1h"/"1d": rows deleted}``.
+    """
+    now = now or timezone.now()
+    retention = _retention()
+    # Rolled up up to (excluding) these; None = nothing rolled up yet.
+    hourly_done = _next_bucket(DeviceHealthRollup.HOUR, timedelta(hours=1))
+    daily_done = _next_bucket(DeviceHealthRollup.DAY, timedelta(days=1))
+
+    deleted = {"raw": 0, DeviceHealthRollup.HOUR: 0, DeviceHealthRollup.DAY: 0}
+    if hourly_done:
+        cutoff = min(now - timedelta(days=retention["raw"]), hourly_done)
+        deleted["raw"], _ = DeviceHealthScore.objects.filter(checked_at__lt=cutoff).delete()
+    if daily_done:
+        cutoff = min(now - timedelta(days=retention[DeviceHealthRollup.HOUR]), daily_done)
+        deleted[DeviceHealthRollup.HOUR], _ = DeviceHealthRollup.objects.filter(
+            resolution=DeviceHealthRollup.HOUR, bucket__lt=cutoff,
+        ).delete()
+    deleted[DeviceHealthRollup.DAY], _ = DeviceHealthRollup.objects.filter(
+        resolution=DeviceHealthRollup.DAY,
+        bucket__lt=now - timedelta(days=retention[DeviceHealthRollup.DAY]),
+    ).delete()
+    return deleted
+
+
+def history(device, window, now=None):
+    """``(resolution, rows)`` of a device's health over the last ``window``.
+
+    Up to RAW_WINDOW the raw scores are returned ("raw"), up to
+    HOURLY_WINDOW the hourly rollups, beyond that the daily ones, led by a
+    partial bucket for the scores not rolled up yet (the current hour/day).
+    Rows are dicts with ``time``, ``score`` (average), ``min_score``,
+    ``max_score``, ``samples`` and the severity fields, newest first.
+    """
+    now = now or timezone.now()
+    start = now - window
+    if window <= RAW_WINDOW:
+        rows = DeviceHealthScore.objects.filter(device=device, checked_at__gte=start).values(
+            "checked_at", "score", *SEVERITY_FIELDS,
+        )
+        return "raw", [
+            dict(row, time=row["checked_at"], min_score=row["score"], max_score=row["score"], samples=1)
+            for row in rows
+        ]
+    resolution = DeviceHealthRollup.HOUR if window <= HOURLY_WINDOW else DeviceHealthRollup.DAY
+    rows = DeviceHealthRollup.objects.filter(
+        device=device, resolution=resolution, bucket__gte=start,
+    ).values("bucket", "avg_score", "min_score", "max_score", "samples", *SEVERITY_FIELDS)
+    rows = [dict(row, time=row["bucket"], score=round(row["avg_score"])) for row in rows]
+    partial = _partial_bucket(device, resolution, start)
+    return resolution, [partial, *rows] if partial else rows
+
+
+def _partial_bucket(device, resolution, start):
+    """The scores after the last rollup of ``resolution`` as one row, or None.
+
+    Raw scores after the last hourly rollup count for both resolutions; the
+    daily one also takes the hourly rollups after the last daily rollup.
+    """
+    sums = {f"sum_{name}": Sum(name) for name in SEVERITY_FIELDS}
+    period = timedelta(hours=1)
+    hourly_done = _next_bucket(DeviceHealthRollup.HOUR, period)
+    parts = [DeviceHealthScore.objects.filter(
+        device=device, checked_at__gte=max(start, hourly_done or start),
+    ).aggregate(
+        first=Min("checked_at"), n=Count("id"), low=Min("score"), high=Max("score"),
+        weighted=Sum("score"), **sums,
+    )]
+    if resolution == DeviceHealthRollup.DAY:
+        period = timedelta(days=1)
+        daily_done = _next_bucket(DeviceHealthRollup.DAY, period)
+        parts.append(DeviceHealthRollup.objects.filter(
+            device=device, resolution=DeviceHealthRollup.HOUR,
+            bucket__gte=max(start, daily_done or start),
+        ).aggregate(
+            first=Min("bucket"), n=Sum("samples"), low=Min("min_score"), high=Max("max_score"),
+            weighted=Sum(F("avg_score") * F("samples")), **sums,
+        ))
+    parts = [part for part in parts if part["n"]]
+    if not parts:
+        return None
+    samples = sum(part["n"] for part in parts)
+    mean = sum(part["weighted"] for part in parts) / samples
+    bucket = truncate(min(part["first"] for part in parts), period)
+    return dict(
+        time=bucket, bucket=bucket, score=round(mean), avg_score=mean,
+        min_score=min(part["low"] for part in parts),
+        max_score=max(part["high"] for part in parts), samples=samples,
+        **{name: sum(part[f"sum_{name}"] or 0 for part in parts) for name in SEVERITY_FIELDS},
+    )
+
+
+def _retention():
+    return getattr(settings, "HEALTH_RETENTION_DAYS", {"raw": 14, "1h": 90, "1d": 730})
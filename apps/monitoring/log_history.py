@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.monitoring.models import LogCursor, LogEvent
+from netconf_lib.nokia_logs import get_new_log_entries, score_from_counts
+
+BATCH_SIZE = 500
+
+
+def last_sequence(device, log_id=90):
+    """The newest sequence number already collected from a device log (0 = none)."""
+    return LogCursor.objects.filter(device=device, log_id=log_id).values_list(
+        "last_sequence", flat=True,
+    ).first() or 0
+
+
+def collect_log_events(device, log_id=90):
+    """Fetch the events added to a device log since the last poll and store them.
+
+    Returns the rolling health of the log (see apply_log_update), or
+    ``{"error": ...}`` when the device could not be read.
+    """
+    update = get_new_log_entries(device, log_id=log_id, after=last_sequence(device, log_id))
+    if update.get("error"):
+        return {"error": update["error"]}
+    return apply_log_update(device, update, log_id=log_id)
+
+
+def apply_log_update(device, update, log_id=90):
+    """Store new events from get_new_log_entries() and roll the log's score forward.
+
+    Events that dropped out of the device log since the last poll are
+    subtracted from the counts (one grouped query over just those events),
+    new ones added, so a poll costs O(changed events), not O(log size).
+    Returns ``{"score", "severity_counts", "total_events", "new_events",
+    "reset", "missed"}`` like calculate_health_score() plus the extras.
+    """
+    cursor, _ = LogCursor.objects.get_or_create(device=device, log_id=log_id)
+    with transaction.atomic():
+        # Write before reading: this takes the row lock, and on SQLite the
+        # database write lock, which a read-then-write transaction cannot
+        # wait for ("database is locked") while pollers write from threads.
+        LogCursor.objects.filter(pk=cursor.pk).update(updated_at=timezone.now())
+        cursor = LogCursor.objects.get(pk=cursor.pk)
+        counts = cursor.severity_counts
+        total = cursor.total_events
+        if update["reset"]:
+            cursor.epoch += 1
+            cursor.first_sequence = cursor.last_sequence = 0
+            counts = dict.fromkeys(counts, 0)
+            total = 0
+
+        # Events the device no longer holds leave the score.
+        first, last = update["first_sequence"], update["last_sequence"]
+        if cursor.last_sequence and first > cursor.first_sequence:
+            gone = LogEvent.objects.filter(
+                device=device, log_id=log_id, epoch=cursor.epoch,
+                sequence__gte=cursor.first_sequence, sequence__lt=first,
+            ).values("severity").annotate(n=Count("id")).order_by()
+            for row in gone:
+                if row["severity"] in counts:
+                    counts[row["severity"]] -= row["n"]
+                total -= row["n"]
+
+        # Another poll may have stored some of these already.
+        new = [e for e in update["entries"] if int(e["sequence"]) > cursor.last_sequence]
+        LogEvent.objects.bulk_create([
+            LogEvent(
+                device=device, log_id=log_id, epoch=cursor.epoch, sequence=int(e["sequence"]),
+                timestamp=e["timestamp"][:32], severity=e["severity"][:16],
+                application=e["application"][:32], event_id=e["event_id"][:16],
+                subject=e["subject"][:128], message=e["message"],
+            ) for e in new
+        ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+        for entry in new:
+            if entry["severity"] in counts:
+                counts[entry["severity"]] += 1
+        total += len(new)
+
+        cursor.first_sequence = max(first, cursor.first_sequence)
+        cursor.last_sequence = max(last, cursor.last_sequence)
+        cursor.critical_count = counts["critical"]
+        cursor.major_count = counts["major"]
+        cursor.minor_count = counts["minor"]
+        cursor.warning_count = counts["warning"]
+        cursor.total_events = max(total, 0)
+        cursor.save()
+
+    return {
+        "score": score_from_counts(counts),
+        "severity_counts": counts,
+        "total_events": cursor.total_events,
+        "new_events": len(new),
+        "reset": update["reset"],
+        "missed": update.get("missed", 0),
+    }
@@ -0,0 +1,204 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+
+from apps.monitoring.log_history import apply_log_update, last_sequence
+from apps.monitoring.models import DeviceHealthScore
+from netconf_lib.aio import async_netconf_connect
+from netconf_lib.nokia_logs import get_new_log_entries, parse_log_notification
+
+MAX_BACKOFF = 300
+
+
+class LogEventWriter:
+    """Batches log updates from every device into few short transactions.
+
+    Producers call put() from the event loop; run() collects what arrives
+    within ``flush_interval`` (or ``batch_size`` updates, whichever comes
+    first), merges each device's updates into one, applies them with
+    apply_log_update() and stores one DeviceHealthScore per device whose
+    counts changed. ``on_flush(device, health)`` is called for every device
+    written (from the writer's thread).
+    """
+
+    def __init__(self, log_id=90, batch_size=500, flush_interval=5.0, on_flush=None):
+        self.log_id = log_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.queue = asyncio.Queue()
+        self.written = 0
+        self._counts = {}  # device pk -> severity counts last recorded
+
+    def put(self, device, update):
+        self.queue.put_nowait((device, update))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+            await sync_to_async(self.write)(batch)
+
+    async def flush(self):
+        """Write whatever is queued now (e.g. on shutdown)."""
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        if batch:
+            await sync_to_async(self.write)(batch)
+
+    def write(self, batch):
+        devices, updates = {}, {}
+        for device, update in batch:
+            devices[device.pk] = device
+            updates.setdefault(device.pk, []).append(update)
+        for pk, device_updates in updates.items():
+            device = devices[pk]
+            for update in _merge(device_updates):
+                health = apply_log_update(device, update, log_id=self.log_id)
+                self.written += health["new_events"]
+            if health["severity_counts"] != self._counts.get(pk):
+                DeviceHealthScore.record(device, health)
+                self._counts[pk] = dict(health["severity_counts"])
+            if self.on_flush:
+                self.on_flush(device, health)
+
+
+def _merge(updates):
+    """Fold consecutive updates into one; a reset starts a new one."""
+    merged = []
+    for update in updates:
+        if merged and not update["reset"]:
+            current = merged[-1]
+            current["entries"].extend(update["entries"])
+            current["first_sequence"] = max(current["first_sequence"], update["first_sequence"])
+            current["last_sequence"] = max(current["last_sequence"], update["last_sequence"])
+            current["missed"] = current.get("missed", 0) + update.get("missed", 0)
+        else:
+            merged.append(dict(update, entries=list(update["entries"])))
+    for update in merged:
+        # A resync and the notifications around it can carry the same events.
+        seen = set()
+        update["entries"] = [
+            entry for entry in update["entries"]
+            if entry["sequence"] not in seen and not seen.add(entry["sequence"])
+        ]
+    return merged
+
+
+class LogSubscriber:
+    """Follows log ``log_id`` of many devices through NETCONF notifications.
+
+    Each device gets a create-subscription session; its events go to the
+    writer as they arrive. Every ``resync_interval`` seconds (and on every
+    (re)connect) the log is also read with get_new_log_entries(), which
+    catches events missed while disconnected, drops events that rolled out
+    of the device log from the score and notices a dead session. Devices
+    that cannot subscribe are polled every ``poll_interval`` seconds
+    instead. ``status`` maps device pk to "subscribed", "polling" or the
+    last error.
+    """
+
+    def __init__(self, writer, log_id=90, stream=None, poll_interval=300, resync_interval=3600):
+        self.writer = writer
+        self.log_id = log_id
+        self.stream = stream
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.status = {}
+        self.notifications = 0
+
+    async def follow(self, device):
+        """Keep ``device``'s events flowing until cancelled, reconnecting with backoff."""
+        failures = 0
+        while True:
+            try:
+                subscribed = await self._subscribe(device)
+                if not subscribed:
+                    self.status[device.pk] = "polling"
+                    await self._poll(device)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                self.status[device.pk] = str(e) or type(e).__name__
+            await asyncio.sleep(min(2 ** failures, MAX_BACKOFF))
+
+    async def _subscribe(self, device):
+        """Run one subscription; returns False if the device does not support it."""
+        async with async_netconf_connect(device) as session:
+            if not session.supports_notifications:
+                return False
+            await session.create_subscription(stream=self.stream)
+            self.status[device.pk] = "subscribed"
+            # Subscribe first, then read the log: events in between arrive
+            # twice rather than not at all, and the writer drops duplicates.
+            state = {"after": await self._catch_up(device, await _last_sequence(device, self.log_id))}
+            tasks = [
+                asyncio.create_task(self._read(device, session, state)),
+                asyncio.create_task(self._resync(device, state)),
+            ]
+            try:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+            for task in done:
+                task.result()
+            raise ConnectionError("notification session closed")
+
+    async def _read(self, device, session, state):
+        streamed = 0
+        async for notification in session.notifications():
+            entry = parse_log_notification(notification)
+            # Every log with a netconf destination shares the stream.
+            if entry is None or entry["log_id"] not in ("", str(self.log_id)):
+                continue
+            sequence = int(entry["sequence"])
+            if streamed and sequence <= streamed:
+                # Numbering went backwards: the log was cleared or the router
+                # restarted. get_new_log_entries() sorts out what is in it now.
+                state["after"] = await self._catch_up(device, state["after"])
+                streamed = 0
+                continue
+            streamed = sequence
+            if sequence <= state["after"]:
+                continue
+            state["after"] = sequence
+            self.notifications += 1
+            self.writer.put(device, {
+                "entries": [entry], "first_sequence": 0, "last_sequence": sequence,
+                "reset": False, "missed": 0,
+            })
+
+    async def _resync(self, device, state):
+        while True:
+            await asyncio.sleep(self.resync_interval)
+            state["after"] = max(state["after"], await self._catch_up(device, state["after"]))
+
+    async def _poll(self, device):
+        after = await _last_sequence(device, self.log_id)
+        while True:
+            after = await self._catch_up(device, after)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _catch_up(self, device, after):
+        """Read the log after ``after`` by polling; returns the newest sequence number."""
+        update = await sync_to_async(get_new_log_entries, thread_sensitive=False)(
+            device, log_id=self.log_id, after=after,
+        )
+        if update.get("error"):
+            raise ConnectionError(update["error"])
+        self.writer.put(device, update)
+        return update["last_sequence"]
+
+
+async def _last_sequence(device, log_id):
+    return await sync_to_async(last_sequence)(device, log_id)
@@ -1,15 +1,21 @@
+import concurrent.futures
+import heapq
+import random
+import statistics
 import time
 
 from django.core.management.base import BaseCommand
 
 from apps.devices.models import Device
+from apps.monitoring.health_history import prune, roll_up
+from apps.monitoring.log_history import apply_log_update, last_sequence
 from apps.monitoring.models import DeviceHealthScore
-from netconf_lib.nokia_logs import calculate_health_score, get_log_entries
+from netconf_lib.nokia_logs import get_new_log_entries
 
 
 class Command(BaseCommand):
-    help = "Poll all devices for log ID 90 entries and calculate health scores. " \
-           "Run with --daemon to poll continuously."
+    help = "Poll all devices for new log ID 90 entries, store them and update the " \
+           "rolling health scores. Run with --daemon to poll continuously."
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -18,65 +24,200 @@ class Command(BaseCommand):
         )
         parser.add_argument(
             "--daemon", action="store_true",
-            help="Run continuously, polling at the specified interval",
+            help="Run continuously, polling each device at the specified interval",
         )
         parser.add_argument(
             "--interval", type=int, default=300,
             help="Polling interval in seconds when running as daemon (default: 300 = 5 min)",
         )
+        parser.add_argument(
+            "--workers", type=int, default=10,
+            help="Devices polled at the same time (default: 10)",
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=0.1,
+            help="Random spread of each device's due time, as a fraction of the interval "
+                 "(default: 0.1)",
+        )
 
     def handle(self, *args, **options):
         log_id = options["log_id"]
-        daemon = options["daemon"]
         interval = options["interval"]
+        workers = max(options["workers"], 1)
 
-        if daemon:
-            self.stdout.write(f"Starting health poll daemon (log {log_id}, every {interval}s)...")
-            while True:
-                self._poll_all(log_id)
-                time.sleep(interval)
+        if options["daemon"]:
+            self.stdout.write(
+                f"Starting health poll daemon (log {log_id}, every {interval}s, "
+                f"{workers} workers)..."
+            )
+            self._run_scheduler(log_id, interval, workers, options["jitter"])
         else:
-            self._poll_all(log_id)
+            self._poll_all(log_id, workers)
 
-    def _poll_all(self, log_id):
-        devices = Device.objects.all()
-        if not devices.exists():
+    def _poll_all(self, log_id, workers):
+        devices = list(Device.objects.all())
+        if not devices:
             self.stdout.write(self.style.WARNING("No devices found."))
             return
 
-        for device in devices:
-            self.stdout.write(f"Polling {device.name} ({device.hostname})...")
-            result = get_log_entries(device, log_id=log_id)
-
-            if result.get("error"):
-                self.stdout.write(self.style.ERROR(
-                    f"  Error polling {device.name}: {result['error']}"
-                ))
-                continue
-
-            entries = result.get("entries", [])
-            health = calculate_health_score(entries)
-
-            DeviceHealthScore.objects.create(
-                device=device,
-                score=health["score"],
-                critical_count=health["severity_counts"]["critical"],
-                major_count=health["severity_counts"]["major"],
-                minor_count=health["severity_counts"]["minor"],
-                warning_count=health["severity_counts"]["warning"],
-                total_events=health["total_events"],
-            )
+        start = time.monotonic()
+        durations = {}
+        errors = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_fetch, device, log_id, last_sequence(device, log_id))
+                for device in devices
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                device, result, elapsed = future.result()
+                durations[device.name] = elapsed
+                if not self._record(device, result, log_id):
+                    errors += 1
 
-            score = health["score"]
-            style = self.style.SUCCESS if score >= 80 else (
-                self.style.WARNING if score >= 50 else self.style.ERROR
-            )
-            self.stdout.write(style(
-                f"  {device.name}: Score {score}/100 "
-                f"(C:{health['severity_counts']['critical']} "
-                f"Ma:{health['severity_counts']['major']} "
-                f"Mi:{health['severity_counts']['minor']} "
-                f"W:{health['severity_counts']['warning']})"
+        self._report(durations, errors, skipped=0, wall=time.monotonic() - start)
+        self._compact()
+        self.stdout.write(self.style.SUCCESS("Health poll complete."))
+
+    def _run_scheduler(self, log_id, interval, workers, jitter):
+        """Poll every device once per ``interval`` on its own schedule.
+
+        Each device has a next-due time in a heap; due devices go to a
+        bounded thread pool, and results are written from this thread (so
+        the DB writes stay serial). A device whose previous poll is still
+        queued or running when it comes due again skips that round instead
+        of piling up behind itself. Every ``interval`` seconds the cycle's
+        timing is reported.
+        """
+        spread = jitter * interval
+        schedule = []          # (due, device pk)
+        devices = {}
+        in_flight = {}         # future -> device pk
+        durations, errors, skipped = {}, 0, 0
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        now = time.monotonic()
+        cycle_start = now
+        next_refresh = now
+
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= next_refresh:
+                    # Pick up added/removed devices once per interval.
+                    current = {device.pk: device for device in Device.objects.all()}
+                    for pk in current.keys() - devices.keys():
+                        heapq.heappush(schedule, (now + random.uniform(0, spread), pk))
+                    devices = current
+                    next_refresh = now + interval
+                    if not devices:
+                        self.stdout.write(self.style.WARNING("No devices found."))
+
+                while schedule and schedule[0][0] <= now:
+                    due, pk = heapq.heappop(schedule)
+                    if pk not in devices:
+                        continue
+                    next_due = due + interval + random.uniform(-spread, spread) / 2
+                    if pk in in_flight.values():
+                        skipped += 1
+                        self.stdout.write(self.style.WARNING(
+                            f"  {devices[pk].name}: previous poll still running, skipped"
+                        ))
+                    else:
+                        device = devices[pk]
+                        in_flight[executor.submit(
+                            _fetch, device, log_id, last_sequence(device, log_id),
+                        )] = pk
+                    while next_due <= now:  # fell more than an interval behind
+                        next_due += interval
+                        skipped += 1
+                    heapq.heappush(schedule, (next_due, pk))
+
+                wake = min(next_refresh, schedule[0][0]) if schedule else next_refresh
+                timeout = max(wake - time.monotonic(), 0.01)
+                if in_flight:
+                    done, _ = concurrent.futures.wait(
+                        list(in_flight), timeout=timeout,
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                else:
+                    done = ()
+                    time.sleep(timeout)
+                for future in done:
+                    in_flight.pop(future)
+                    device, result, elapsed = future.result()
+                    durations[device.name] = elapsed
+                    if not self._record(device, result, log_id):
+                        errors += 1
+
+                if time.monotonic() - cycle_start >= interval:
+                    self._report(durations, errors, skipped, time.monotonic() - cycle_start,
+                                 busy=len(in_flight))
+                    self._compact()
+                    durations, errors, skipped = {}, 0, 0
+                    cycle_start = time.monotonic()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _record(self, device, result, log_id):
+        """Store and print one device's result; returns False if the poll failed."""
+        if result.get("error"):
+            self.stdout.write(self.style.ERROR(
+                f"  Error polling {device.name}: {result['error']}"
             ))
+            return False
 
-        self.stdout.write(self.style.SUCCESS("Health poll complete."))
+        health = apply_log_update(device, result, log_id=log_id)
+        if health["reset"]:
+            self.stdout.write(self.style.WARNING(
+                f"  {device.name}: log {log_id} was cleared or renumbered, restarting"
+            ))
+        if health["missed"]:
+            self.stdout.write(self.style.WARNING(
+                f"  {device.name}: {health['missed']} events rolled out of log {log_id} unseen"
+            ))
+
+        DeviceHealthScore.record(device, health)
+
+        score = health["score"]
+        style = self.style.SUCCESS if score >= 80 else (
+            self.style.WARNING if score >= 50 else self.style.ERROR
+        )
+        self.stdout.write(style(
+            f"  {device.name}: Score {score}/100 "
+            f"(C:{health['severity_counts']['critical']} "
+            f"Ma:{health['severity_counts']['major']} "
+            f"Mi:{health['severity_counts']['minor']} "
+            f"W:{health['severity_counts']['warning']}, {health['new_events']} new)"
+        ))
+        return True
+
+    def _compact(self):
+        """Roll finished hours/days of scores up and prune past HEALTH_RETENTION_DAYS."""
+        rolled = roll_up()
+        pruned = prune()
+        if any(rolled.values()) or any(pruned.values()):
+            self.stdout.write(
+                f"Health history: rolled up {rolled['1h']} hourly / {rolled['1d']} daily; pruned "
+                + " / ".join(f"{count} {resolution}" for resolution, count in pruned.items())
+            )
+
+    def _report(self, durations, errors, skipped, wall, busy=0):
+        if not durations:
+            self.stdout.write(f"Cycle: no polls finished in {wall:.1f}s ({busy} running)")
+            return
+        slowest = max(durations, key=durations.get)
+        self.stdout.write(
+            f"Cycle: {len(durations)} polled, {errors} errors, {skipped} skipped in {wall:.1f}s | "
+            f"median {statistics.median(durations.values()):.2f}s, slowest {slowest} "
+            f"{durations[slowest]:.2f}s, sum {sum(durations.values()):.1f}s"
+            + (f" | {busy} still running" if busy else "")
+        )
+
+
+def _fetch(device, log_id, after):
+    """Worker: fetch the log events after sequence ``after``; the caller stores them."""
+    start = time.monotonic()
+    try:
+        result = get_new_log_entries(device, log_id=log_id, after=after)
+    except Exception as e:
+        result = {"error": str(e), "entries": []}
+    return device, result, time.monotonic() - start
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.monitoring.health_history import prune, roll_up
+
+
+class Command(BaseCommand):
+    help = "Roll raw health scores up into hourly and daily min/avg/max rows and " \
+           "delete rows past HEALTH_RETENTION_DAYS. poll_health --daemon does this " \
+           "every cycle; run this from cron when polling one-shot."
+
+    def handle(self, *args, **options):
+        rolled = roll_up()
+        pruned = prune()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {rolled['1h']} hourly / {rolled['1d']} daily; pruned "
+            + " / ".join(f"{count} {resolution}" for resolution, count in pruned.items())
+        ))
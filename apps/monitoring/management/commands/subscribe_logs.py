@@ -0,0 +1,121 @@
+import asyncio
+import collections
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.devices.models import Device
+from apps.monitoring.health_history import prune, roll_up
+from apps.monitoring.log_subscriber import LogEventWriter, LogSubscriber
+
+
+class Command(BaseCommand):
+    help = "Follow log ID 90 of every device through NETCONF notifications and keep the " \
+           "rolling health scores current. Devices that cannot subscribe are polled " \
+           "every --interval seconds. Replaces poll_health --daemon."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log-id", type=int, default=90,
+            help="Log ID to follow (default: 90)",
+        )
+        parser.add_argument(
+            "--stream", default=getattr(settings, "LOG_NOTIFICATION_STREAM", ""),
+            help="NETCONF notification stream (default: LOG_NOTIFICATION_STREAM, "
+                 "empty = the device's default stream)",
+        )
+        parser.add_argument(
+            "--interval", type=int, default=300,
+            help="Polling interval for devices that cannot subscribe, and status report "
+                 "interval, in seconds (default: 300)",
+        )
+        parser.add_argument(
+            "--resync", type=int, default=getattr(settings, "LOG_RESYNC_INTERVAL", 3600),
+            help="Seconds between full log reads of subscribed devices "
+                 "(default: LOG_RESYNC_INTERVAL = 3600)",
+        )
+        parser.add_argument(
+            "--flush", type=float, default=getattr(settings, "LOG_FLUSH_INTERVAL", 5.0),
+            help="Seconds events are batched before they are stored "
+                 "(default: LOG_FLUSH_INTERVAL = 5)",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Following log {options['log_id']} "
+            f"(flush every {options['flush']}s, resync every {options['resync']}s)..."
+        )
+        try:
+            asyncio.run(self._run(options))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    async def _run(self, options):
+        writer = LogEventWriter(
+            log_id=options["log_id"], flush_interval=options["flush"], on_flush=self._written,
+        )
+        subscriber = LogSubscriber(
+            writer, log_id=options["log_id"], stream=options["stream"] or None,
+            poll_interval=options["interval"], resync_interval=options["resync"],
+        )
+        writer_task = asyncio.create_task(writer.run())
+        followers = {}  # device pk -> task
+        try:
+            while True:
+                # Pick up added/removed devices once per interval.
+                devices = {device.pk: device for device in await sync_to_async(list)(Device.objects.all())}
+                for pk in followers.keys() - devices.keys():
+                    followers.pop(pk).cancel()
+                for pk in devices.keys() - followers.keys():
+                    followers[pk] = asyncio.create_task(subscriber.follow(devices[pk]))
+                if not devices:
+                    self.stdout.write(self.style.WARNING("No devices found."))
+
+                await asyncio.sleep(options["interval"])
+                if writer_task.done():
+                    writer_task.result()  # the writer died: stop with its error
+                self._report(subscriber, writer, devices)
+                await sync_to_async(self._compact)()
+        finally:
+            for task in followers.values():
+                task.cancel()
+            writer_task.cancel()
+            await writer.flush()
+
+    def _written(self, device, health):
+        if health["new_events"]:
+            self.stdout.write(
+                f"  {device.name}: Score {health['score']}/100, {health['new_events']} new events"
+            )
+        if health["reset"]:
+            self.stdout.write(self.style.WARNING(
+                f"  {device.name}: log was cleared or renumbered, restarting"
+            ))
+        if health["missed"]:
+            self.stdout.write(self.style.WARNING(
+                f"  {device.name}: {health['missed']} events rolled out of the log unseen"
+            ))
+
+    def _report(self, subscriber, writer, devices):
+        states = collections.Counter(
+            state if state in ("subscribed", "polling") else "error"
+            for pk, state in subscriber.status.items() if pk in devices
+        )
+        self.stdout.write(
+            f"Status: {states['subscribed']} subscribed, {states['polling']} polling, "
+            f"{states['error']} failing | {subscriber.notifications} notifications, "
+            f"{writer.written} events stored"
+        )
+        for pk, state in subscriber.status.items():
+            if pk in devices and state not in ("subscribed", "polling"):
+                self.stdout.write(self.style.ERROR(f"  {devices[pk].name}: {state}"))
+
+    def _compact(self):
+        rolled = roll_up()
+        pruned = prune()
+        if any(rolled.values()) or any(pruned.values()):
+            self.stdout.write(
+                f"Health history: rolled up {rolled['1h']} hourly / {rolled['1d']} daily; pruned "
+                + " / ".join(f"{count} {resolution}" for resolution, count in pruned.items())
+            )
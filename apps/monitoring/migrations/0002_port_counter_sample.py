@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0003_device_circuit_breaker'),
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortCounterSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('port_id', models.CharField(max_length=64)),
+                ('resolution', models.CharField(choices=[('1m', 'Poll'), ('1h', 'Hourly'), ('1d', 'Daily')], default='1m', max_length=2)),
+                ('bucket', models.DateTimeField(help_text='Start of the interval')),
+                ('seconds', models.FloatField(help_text='Length of the interval the deltas cover')),
+                ('speed', models.IntegerField(default=0, help_text='Port speed in Mbit/s (0 = unknown)')),
+                ('in_octets', models.BigIntegerField(default=0)),
+                ('out_octets', models.BigIntegerField(default=0)),
+                ('in_packets', models.BigIntegerField(default=0)),
+                ('out_packets', models.BigIntegerField(default=0)),
+                ('in_errors', models.BigIntegerField(default=0)),
+                ('out_errors', models.BigIntegerField(default=0)),
+                ('in_discards', models.BigIntegerField(default=0)),
+                ('out_discards', models.BigIntegerField(default=0)),
+                ('in_bps', models.FloatField(default=0)),
+                ('out_bps', models.FloatField(default=0)),
+                ('peak_in_bps', models.FloatField(default=0)),
+                ('peak_out_bps', models.FloatField(default=0)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='port_samples', to='devices.device')),
+            ],
+            options={
+                'verbose_name': 'Port Counter Sample',
+                'ordering': ['bucket'],
+                'indexes': [models.Index(fields=['device', 'port_id', 'resolution', 'bucket'], name='monitoring__device__24ee4c_idx'), models.Index(fields=['resolution', 'bucket'], name='monitoring__resolut_920733_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0003_device_circuit_breaker'),
+        ('monitoring', '0002_port_counter_sample'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('log_id', models.IntegerField(default=90)),
+                ('epoch', models.IntegerField(default=0)),
+                ('first_sequence', models.BigIntegerField(default=0)),
+                ('last_sequence', models.BigIntegerField(default=0)),
+                ('critical_count', models.IntegerField(default=0)),
+                ('major_count', models.IntegerField(default=0)),
+                ('minor_count', models.IntegerField(default=0)),
+                ('warning_count', models.IntegerField(default=0)),
+                ('total_events', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_cursors', to='devices.device')),
+            ],
+            options={
+                'verbose_name': 'Log Cursor',
+                'constraints': [models.UniqueConstraint(fields=('device', 'log_id'), name='unique_log_cursor')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LogEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('log_id', models.IntegerField(default=90)),
+                ('epoch', models.IntegerField(default=0)),
+                ('sequence', models.BigIntegerField()),
+                ('timestamp', models.CharField(blank=True, help_text='Device timestamp, as reported', max_length=32)),
+                ('severity', models.CharField(blank=True, max_length=16)),
+                ('application', models.CharField(blank=True, max_length=32)),
+                ('event_id', models.CharField(blank=True, max_length=16)),
+                ('subject', models.CharField(blank=True, max_length=128)),
+                ('message', models.TextField(blank=True)),
+                ('collected_at', models.DateTimeField(auto_now_add=True)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_events', to='devices.device')),
+            ],
+            options={
+                'verbose_name': 'Log Event',
+                'ordering': ['-collected_at', '-sequence'],
+                'constraints': [models.UniqueConstraint(fields=('device', 'log_id', 'epoch', 'sequence'), name='unique_log_event')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_latest(apps, schema_editor):
+    DeviceHealthScore = apps.get_model("monitoring", "DeviceHealthScore")
+    DeviceHealthLatest = apps.get_model("monitoring", "DeviceHealthLatest")
+    latest = {}
+    for score in DeviceHealthScore.objects.order_by("device_id", "-checked_at").iterator():
+        latest.setdefault(score.device_id, score)
+    DeviceHealthLatest.objects.bulk_create([
+        DeviceHealthLatest(
+            device_id=device_id, score=score.score,
+            critical_count=score.critical_count, major_count=score.major_count,
+            minor_count=score.minor_count, warning_count=score.warning_count,
+            total_events=score.total_events, checked_at=score.checked_at,
+        ) for device_id, score in latest.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0003_device_circuit_breaker'),
+        ('monitoring', '0003_log_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceHealthLatest',
+            fields=[
+                ('device', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='health_latest', serialize=False, to='devices.device')),
+                ('score', models.IntegerField()),
+                ('critical_count', models.IntegerField(default=0)),
+                ('major_count', models.IntegerField(default=0)),
+                ('minor_count', models.IntegerField(default=0)),
+                ('warning_count', models.IntegerField(default=0)),
+                ('total_events', models.IntegerField(default=0)),
+                ('checked_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Device Health (Latest)',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='devicehealthscore',
+            index=models.Index(fields=['device', '-checked_at'], name='monitoring__device__056af2_idx'),
+        ),
+        migrations.RunPython(backfill_latest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0003_device_circuit_breaker'),
+        ('monitoring', '0004_device_health_latest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceHealthRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('1h', 'Hourly'), ('1d', 'Daily')], max_length=2)),
+                ('bucket', models.DateTimeField(help_text='Start of the hour/day')),
+                ('samples', models.IntegerField(default=0, help_text='Raw scores summarised')),
+                ('min_score', models.IntegerField()),
+                ('avg_score', models.FloatField()),
+                ('max_score', models.IntegerField()),
+                ('critical_count', models.IntegerField(default=0)),
+                ('major_count', models.IntegerField(default=0)),
+                ('minor_count', models.IntegerField(default=0)),
+                ('warning_count', models.IntegerField(default=0)),
+                ('total_events', models.IntegerField(default=0)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_rollups', to='devices.device')),
+            ],
+            options={
+                'verbose_name': 'Device Health Rollup',
+                'ordering': ['-bucket'],
+                'constraints': [models.UniqueConstraint(fields=('device', 'resolution', 'bucket'), name='unique_health_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0003_device_circuit_breaker'),
+        ('monitoring', '0005_device_health_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortCounterState',
+            fields=[
+                ('device', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='port_counter_state', serialize=False, to='devices.device')),
+                ('taken_at', models.DateTimeField()),
+                ('counters', models.JSONField()),
+            ],
+            options={
+                'verbose_name': 'Port Counter State',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:46
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicates(apps, schema_editor):
+    PortCounterSample = apps.get_model("monitoring", "PortCounterSample")
+    duplicates = (
+        PortCounterSample.objects.values("device_id", "port_id", "resolution", "bucket")
+        .annotate(keep=Min("id"), rows=Count("id")).filter(rows__gt=1).order_by()
+    )
+    for row in duplicates.iterator():
+        PortCounterSample.objects.filter(
+            device_id=row["device_id"], port_id=row["port_id"],
+            resolution=row["resolution"], bucket=row["bucket"],
+        ).exclude(id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0003_device_circuit_breaker'),
+        ('monitoring', '0006_port_counter_state'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='portcountersample',
+            name='monitoring__device__24ee4c_idx',
+        ),
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='portcountersample',
+            constraint=models.UniqueConstraint(fields=('device', 'port_id', 'resolution', 'bucket'), name='unique_port_counter_sample'),
+        ),
+    ]
@@ -15,15 +15,242 @@ class DeviceHealthScore(models.Model):
     class Meta:
         ordering = ["-checked_at"]
         verbose_name = "Device Health Score"
+        indexes = [models.Index(fields=["device", "-checked_at"])]
 
     def __str__(self):
         return f"{self.device.name}: {self.score}/100 at {self.checked_at}"
 
     @property
     def status_label(self):
-        if self.score >= 80:
-            return "healthy"
-        elif self.score >= 50:
-            return "degraded"
-        else:
-            return "critical"
+        return _status_label(self.score)
+
+    @classmethod
+    def record(cls, device, health):
+        """Store a health result (calculate_health_score() shape) and refresh
+        the device's DeviceHealthLatest row."""
+        counts = health["severity_counts"]
+        score = cls.objects.create(
+            device=device,
+            score=health["score"],
+            critical_count=counts["critical"],
+            major_count=counts["major"],
+            minor_count=counts["minor"],
+            warning_count=counts["warning"],
+            total_events=health["total_events"],
+        )
+        DeviceHealthLatest.objects.update_or_create(device=device, defaults={
+            "score": score.score,
+            "critical_count": score.critical_count,
+            "major_count": score.major_count,
+            "minor_count": score.minor_count,
+            "warning_count": score.warning_count,
+            "total_events": score.total_events,
+            "checked_at": score.checked_at,
+        })
+        return score
+
+
+class DeviceHealthLatest(models.Model):
+    """The newest DeviceHealthScore of each device, kept up to date by
+    DeviceHealthScore.record() so list pages can join it instead of
+    querying the history once per device."""
+    device = models.OneToOneField(
+        "devices.Device", on_delete=models.CASCADE, primary_key=True, related_name="health_latest",
+    )
+    score = models.IntegerField()
+    critical_count = models.IntegerField(default=0)
+    major_count = models.IntegerField(default=0)
+    minor_count = models.IntegerField(default=0)
+    warning_count = models.IntegerField(default=0)
+    total_events = models.IntegerField(default=0)
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Device Health (Latest)"
+
+    def __str__(self):
+        return f"{self.device_id}: {self.score}/100 at {self.checked_at}"
+
+    @property
+    def status_label(self):
+        return _status_label(self.score)
+
+
+def _status_label(score):
+    if score >= 80:
+        return "healthy"
+    elif score >= 50:
+        return "degraded"
+    else:
+        return "critical"
+
+
+class DeviceHealthRollup(models.Model):
+    """Health scores of one device compacted into an hour or a day.
+
+    Built from DeviceHealthScore ("1h") and from the hourly rows ("1d") by
+    ``rollup_health``, so raw scores can be pruned after a few days.
+    """
+    HOUR = "1h"
+    DAY = "1d"
+    RESOLUTION_CHOICES = [(HOUR, "Hourly"), (DAY, "Daily")]
+
+    device = models.ForeignKey("devices.Device", on_delete=models.CASCADE, related_name="health_rollups")
+    resolution = models.CharField(max_length=2, choices=RESOLUTION_CHOICES)
+    bucket = models.DateTimeField(help_text="Start of the hour/day")
+    samples = models.IntegerField(default=0, help_text="Raw scores summarised")
+    min_score = models.IntegerField()
+    avg_score = models.FloatField()
+    max_score = models.IntegerField()
+    critical_count = models.IntegerField(default=0)
+    major_count = models.IntegerField(default=0)
+    minor_count = models.IntegerField(default=0)
+    warning_count = models.IntegerField(default=0)
+    total_events = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-bucket"]
+        verbose_name = "Device Health Rollup"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["device", "resolution", "bucket"], name="unique_health_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.device_id} {self.resolution} {self.bucket}: avg {self.avg_score:.0f}"
+
+
+class LogEvent(models.Model):
+    """One event of a device log (e.g. log 90), stored once as it is collected.
+
+    ``epoch`` counts how often the device restarted the log's sequence
+    numbers (log cleared, counter wrap, reboot), so (device, log, epoch,
+    sequence) stays unique.
+    """
+    device = models.ForeignKey("devices.Device", on_delete=models.CASCADE, related_name="log_events")
+    log_id = models.IntegerField(default=90)
+    epoch = models.IntegerField(default=0)
+    sequence = models.BigIntegerField()
+    timestamp = models.CharField(max_length=32, blank=True, help_text="Device timestamp, as reported")
+    severity = models.CharField(max_length=16, blank=True)
+    application = models.CharField(max_length=32, blank=True)
+    event_id = models.CharField(max_length=16, blank=True)
+    subject = models.CharField(max_length=128, blank=True)
+    message = models.TextField(blank=True)
+    collected_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-collected_at", "-sequence"]
+        verbose_name = "Log Event"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["device", "log_id", "epoch", "sequence"], name="unique_log_event",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.device.name} log {self.log_id} #{self.sequence} {self.severity}"
+
+
+class LogCursor(models.Model):
+    """Where incremental collection of one device log stands, plus its rolling score.
+
+    ``first_sequence``..``last_sequence`` is the range the device log held at
+    the last poll; the severity counts cover exactly the events in that
+    range, so the health score matches scoring the whole log without
+    re-reading it.
+    """
+    device = models.ForeignKey("devices.Device", on_delete=models.CASCADE, related_name="log_cursors")
+    log_id = models.IntegerField(default=90)
+    epoch = models.IntegerField(default=0)
+    first_sequence = models.BigIntegerField(default=0)
+    last_sequence = models.BigIntegerField(default=0)
+    critical_count = models.IntegerField(default=0)
+    major_count = models.IntegerField(default=0)
+    minor_count = models.IntegerField(default=0)
+    warning_count = models.IntegerField(default=0)
+    total_events = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Log Cursor"
+        constraints = [
+            models.UniqueConstraint(fields=["device", "log_id"], name="unique_log_cursor"),
+        ]
+
+    def __str__(self):
+        return f"{self.device.name} log {self.log_id} at #{self.last_sequence}"
+
+    @property
+    def severity_counts(self):
+        return {
+            "critical": self.critical_count,
+            "major": self.major_count,
+            "minor": self.minor_count,
+            "warning": self.warning_count,
+        }
+
+
+class PortCounterSample(models.Model):
+    """Port traffic over one interval: counter deltas plus the average bit rates.
+
+    ``sample_port_counters`` writes one "1m" row per port per poll and rolls
+    them up into "1h" and "1d" rows (sums of the deltas, average and peak
+    rates), pruning each resolution after its retention period.
+    """
+    MINUTE = "1m"
+    HOUR = "1h"
+    DAY = "1d"
+    RESOLUTION_CHOICES = [(MINUTE, "Poll"), (HOUR, "Hourly"), (DAY, "Daily")]
+
+    device = models.ForeignKey("devices.Device", on_delete=models.CASCADE, related_name="port_samples")
+    port_id = models.CharField(max_length=64)
+    resolution = models.CharField(max_length=2, choices=RESOLUTION_CHOICES, default=MINUTE)
+    bucket = models.DateTimeField(help_text="Start of the interval")
+    seconds = models.FloatField(help_text="Length of the interval the deltas cover")
+    speed = models.IntegerField(default=0, help_text="Port speed in Mbit/s (0 = unknown)")
+    in_octets = models.BigIntegerField(default=0)
+    out_octets = models.BigIntegerField(default=0)
+    in_packets = models.BigIntegerField(default=0)
+    out_packets = models.BigIntegerField(default=0)
+    in_errors = models.BigIntegerField(default=0)
+    out_errors = models.BigIntegerField(default=0)
+    in_discards = models.BigIntegerField(default=0)
+    out_discards = models.BigIntegerField(default=0)
+    in_bps = models.FloatField(default=0)
+    out_bps = models.FloatField(default=0)
+    peak_in_bps = models.FloatField(default=0)
+    peak_out_bps = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ["bucket"]
+        verbose_name = "Port Counter Sample"
+        indexes = [
+            models.Index(fields=["resolution", "bucket"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["device", "port_id", "resolution", "bucket"], name="unique_port_counter_sample",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.device.name} {self.port_id} {self.resolution} at {self.bucket}"
+
+
+class PortCounterState(models.Model):
+    """The raw port counters of a device's last sample_port_counters poll
+    (PortCounterSnapshot.to_json()), which the next poll takes its deltas
+    against, whichever process runs it."""
+    device = models.OneToOneField(
+        "devices.Device", on_delete=models.CASCADE, primary_key=True, related_name="port_counter_state",
+    )
+    taken_at = models.DateTimeField()
+    counters = models.JSONField()
+
+    class Meta:
+        verbose_name = "Port Counter State"
+
+    def __str__(self):
+        return f"{self.device_id}: {len(self.counters.get('port_ids', []))} ports at {self.taken_at}"
@@ -0,0 +1,200 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from apps.monitoring.buckets import truncate
+from apps.monitoring.models import PortCounterSample, PortCounterState
+from netconf_lib.counters import COUNTERS, PortCounterSnapshot
+
+BATCH_SIZE = 500
+# Age limit of a previous snapshot that samples are built from: long enough
+# to survive a missed poll, short enough that a stale snapshot does not turn
+# hours of traffic into one averaged sample.
+SNAPSHOT_TTL = 15 * 60
+
+# target resolution -> (source resolution, period, truncation)
+ROLLUPS = [
+    (PortCounterSample.HOUR, PortCounterSample.MINUTE, timedelta(hours=1), TruncHour),
+    (PortCounterSample.DAY, PortCounterSample.HOUR, timedelta(days=1), TruncDay),
+]
+
+
+def build_samples(device, snapshot, previous):
+    """Unsaved "1m" PortCounterSample rows for the traffic between two snapshots.
+
+    Ports that are not in ``previous`` are skipped (no delta yet).
+    """
+    deltas = snapshot.deltas(previous)
+    if deltas is None:
+        return []
+    elapsed = deltas["elapsed"]
+    bucket = datetime.fromtimestamp(previous.taken_at, tz=dt_timezone.utc)
+    columns = [deltas[name].tolist() for name in COUNTERS]
+    speeds = snapshot.speeds.tolist()
+    samples = []
+    for i, port_id in enumerate(deltas["port_ids"]):
+        if port_id in deltas["unknown"]:
+            continue
+        values = dict(zip(COUNTERS, (column[i] for column in columns)))
+        in_bps = values["in_octets"] * 8 / elapsed
+        out_bps = values["out_octets"] * 8 / elapsed
+        samples.append(PortCounterSample(
+            device=device, port_id=port_id, resolution=PortCounterSample.MINUTE,
+            bucket=bucket, seconds=elapsed, speed=speeds[i],
+            in_bps=in_bps, out_bps=out_bps, peak_in_bps=in_bps, peak_out_bps=out_bps,
+            **values,
+        ))
+    return samples
+
+
+def previous_snapshots(devices, max_age):
+    """{device pk: PortCounterSnapshot} of the devices' last polls, if younger than ``max_age`` seconds."""
+    states = PortCounterState.objects.filter(
+        device__in=devices, taken_at__gte=timezone.now() - timedelta(seconds=max_age),
+    ).values_list("device_id", "counters")
+    return {pk: PortCounterSnapshot.from_json(counters) for pk, counters in states}
+
+
+def save_snapshots(snapshots):
+    """Keep ``{device pk: PortCounterSnapshot}`` as the devices' last polls."""
+    PortCounterState.objects.bulk_create(
+        [
+            PortCounterState(
+                device_id=pk, counters=snapshot.to_json(),
+                taken_at=datetime.fromtimestamp(snapshot.taken_at, tz=dt_timezone.utc),
+            )
+            for pk, snapshot in snapshots.items()
+        ],
+        batch_size=BATCH_SIZE, update_conflicts=True, unique_fields=["device"],
+        update_fields=["taken_at", "counters"],
+    )
+
+
+def save_samples(samples):
+    """Insert ``samples``, skipping any already stored (same device, port,
+    resolution and bucket), e.g. by a concurrent sampler or roll-up."""
+    with transaction.atomic():
+        PortCounterSample.objects.bulk_create(samples, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(samples)
+
+
+def roll_up(now=None):
+    """Aggregate completed hours of "1m" rows into "1h" rows, and days of "1h" into "1d".
+
+    Only periods after the newest existing row of the target resolution are
+    built, so running it every poll adds each hour/day exactly once.
+    Returns ``{resolution: rows created}``.
+    """
+    now = now or timezone.now()
+    created = {}
+    for target, source, period, trunc in ROLLUPS:
+        until = truncate(now, period)
+        latest = PortCounterSample.objects.filter(resolution=target).aggregate(
+            latest=Max("bucket"),
+        )["latest"]
+        start = latest + period if latest else PortCounterSample.objects.filter(
+            resolution=source,
+        ).aggregate(first=Min("bucket"))["first"]
+        if start is None or start >= until:
+            created[target] = 0
+            continue
+
+        totals = {f"total_{name}": Sum(name) for name in COUNTERS}
+        rows = (
+            PortCounterSample.objects
+            .filter(resolution=source, bucket__gte=truncate(start, period), bucket__lt=until)
+            .annotate(period=trunc("bucket"))
+            .values("device_id", "port_id", "period")
+            .annotate(
+                total_seconds=Sum("seconds"), max_speed=Max("speed"),
+                max_in_bps=Max("peak_in_bps"), max_out_bps=Max("peak_out_bps"), **totals,
+            )
+            .order_by()
+        )
+        samples = []
+        for row in rows.iterator():
+            seconds = row["total_seconds"] or 0
+            values = {name: row[f"total_{name}"] or 0 for name in COUNTERS}
+            samples.append(PortCounterSample(
+                device_id=row["device_id"], port_id=row["port_id"], resolution=target,
+                bucket=row["period"], seconds=seconds, speed=row["max_speed"] or 0,
+                in_bps=values["in_octets"] * 8 / seconds if seconds else 0,
+                out_bps=values["out_octets"] * 8 / seconds if seconds else 0,
+                peak_in_bps=row["max_in_bps"] or 0, peak_out_bps=row["max_out_bps"] or 0,
+                **values,
+            ))
+        created[target] = save_samples(samples)
+    return created
+
+
+def prune(now=None):
+    """Delete rows older than PORT_SAMPLE_RETENTION_DAYS; returns ``{resolution: deleted}``."""
+    now = now or timezone.now()
+    deleted = {}
+    for resolution, days in _retention().items():
+        deleted[resolution], _ = PortCounterSample.objects.filter(
+            resolution=resolution, bucket__lt=now - timedelta(days=days),
+        ).delete()
+    return deleted
+
+
+def pick_resolution(start, end):
+    """The finest resolution that still covers ``start`` and keeps a graph readable."""
+    retention = _retention()
+    span = end - start
+    oldest = timezone.now() - start
+    if span <= timedelta(hours=6) and oldest <= timedelta(days=retention[PortCounterSample.MINUTE]):
+        return PortCounterSample.MINUTE
+    if span <= timedelta(days=14) and oldest <= timedelta(days=retention[PortCounterSample.HOUR]):
+        return PortCounterSample.HOUR
+    return PortCounterSample.DAY
+
+
+def series(device, port_id, start, end=None, resolution=None):
+    """Traffic of one port between ``start`` and ``end`` as columns for a chart.
+
+    Returns ``{"resolution", "times": [iso strings], "in_bps", "out_bps",
+    "peak_in_bps", "peak_out_bps", "in_util", "out_util" (% of speed, None
+    when unknown), "in_errors_ps", "out_errors_ps", "in_discards_ps",
+    "out_discards_ps"}``. One indexed range scan, no model instances.
+    """
+    end = end or timezone.now()
+    resolution = resolution or pick_resolution(start, end)
+    rows = PortCounterSample.objects.filter(
+        device=device, port_id=port_id, resolution=resolution,
+        bucket__gte=start, bucket__lt=end,
+    ).order_by("bucket").values_list(
+        "bucket", "seconds", "speed", "in_bps", "out_bps", "peak_in_bps", "peak_out_bps",
+        "in_errors", "out_errors", "in_discards", "out_discards",
+    )
+    result = {name: [] for name in (
+        "times", "in_bps", "out_bps", "peak_in_bps", "peak_out_bps", "in_util", "out_util",
+        "in_errors_ps", "out_errors_ps", "in_discards_ps", "out_discards_ps",
+    )}
+    result["resolution"] = resolution
+    for (bucket, seconds, speed, in_bps, out_bps, peak_in, peak_out,
+         in_errors, out_errors, in_discards, out_discards) in rows:
+        result["times"].append(bucket.isoformat())
+        result["in_bps"].append(round(in_bps, 2))
+        result["out_bps"].append(round(out_bps, 2))
+        result["peak_in_bps"].append(round(peak_in, 2))
+        result["peak_out_bps"].append(round(peak_out, 2))
+        capacity = speed * 1e6
+        result["in_util"].append(round(in_bps * 100 / capacity, 2) if capacity else None)
+        result["out_util"].append(round(out_bps * 100 / capacity, 2) if capacity else None)
+        seconds = seconds or 1
+        result["in_errors_ps"].append(round(in_errors / seconds, 4))
+        result["out_errors_ps"].append(round(out_errors / seconds, 4))
+        result["in_discards_ps"].append(round(in_discards / seconds, 4))
+        result["out_discards_ps"].append(round(out_discards / seconds, 4))
+    return result
+
+
+def _retention():
+    return getattr(settings, "PORT_SAMPLE_RETENTION_DAYS", {
+        PortCounterSample.MINUTE: 2, PortCounterSample.HOUR: 30, PortCounterSample.DAY: 365,
+    })
@@ -0,0 +1,168 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.devices.models import Device
+from netconf_lib.parsing import parse_xml
+from netconf_lib.simulator import SimulatedFleetData, SrosSimulator
+from .log_subscriber import LogEventWriter, LogSubscriber, _merge
+from .models import DeviceHealthScore, LogCursor, LogEvent
+
+
+class HealthQueryBudgetTests(TestCase):
+    """The dashboard and health overview must not query once per device."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user("viewer", password="viewer")
+        self.client.force_login(user)
+
+    def add_devices(self, count):
+        start = Device.objects.count()
+        for i in range(start, start + count):
+            device = Device.objects.create(name=f"pe-{i}", hostname=f"10.0.0.{i}", username="admin")
+            for score in (100, 90, 75):
+                DeviceHealthScore.record(device, {
+                    "score": score,
+                    "severity_counts": {"critical": 0, "major": 1, "minor": 2, "warning": 3},
+                    "total_events": 6,
+                })
+
+    def query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_constant_queries(self, url):
+        self.add_devices(3)
+        small = self.query_count(url)
+        self.add_devices(22)
+        with self.assertNumQueries(small):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_dashboard(self):
+        response = self.assert_constant_queries(reverse("dashboard"))
+        self.assertEqual(len(response.context["devices_with_health"]), 10)
+        self.assertEqual(response.context["devices_with_health"][0]["health"].score, 75)
+
+    def test_device_health(self):
+        response = self.assert_constant_queries(reverse("device_health"))
+        rows = response.context["device_scores"]
+        self.assertEqual(len(rows), 25)
+        self.assertTrue(all(row["history"] == [75, 90, 100] for row in rows))
+        self.assertTrue(all(row["latest"].score == 75 for row in rows))
+
+
+def _entry(sequence, severity="minor"):
+    return {
+        "sequence": str(sequence), "timestamp": "", "severity": severity,
+        "application": "PORT", "event_id": "2001", "subject": "1/1/1", "message": "",
+    }
+
+
+def _update(sequences, reset=False):
+    return {
+        "entries": [_entry(sequence) for sequence in sequences], "reset": reset, "missed": 0,
+        "first_sequence": 1, "last_sequence": max(sequences, default=0),
+    }
+
+
+def _notification(sequence, log_id):
+    return parse_xml(
+        '<notification xmlns="urn:ietf:params:xml:ns:netconf:notification:1.0">'
+        "<eventTime>2026-01-01T00:00:00Z</eventTime>"
+        '<sros-log-generic-event xmlns="urn:nokia.com:sros:ns:yang:sr:notifications">'
+        f"<log-id>{log_id}</log-id><sequence-number>{sequence}</sequence-number>"
+        "<severity>MAJOR</severity></sros-log-generic-event></notification>"
+    )
+
+
+class LogUpdateTests(SimpleTestCase):
+    """How log updates are merged and notifications filtered, without a device."""
+
+    def test_merge_drops_repeated_events(self):
+        merged = _merge([_update([1, 2, 3]), _update([3, 4]), _update([4, 5])])
+        self.assertEqual(len(merged), 1)
+        self.assertEqual([e["sequence"] for e in merged[0]["entries"]], ["1", "2", "3", "4", "5"])
+        self.assertEqual(merged[0]["last_sequence"], 5)
+
+    def test_reset_starts_a_new_update(self):
+        merged = _merge([_update([7, 8]), _update([1, 2], reset=True), _update([2, 3])])
+        self.assertEqual([update["reset"] for update in merged], [False, True])
+        self.assertEqual([e["sequence"] for e in merged[1]["entries"]], ["1", "2", "3"])
+
+    def test_read_skips_other_logs(self):
+        class Session:
+            async def notifications(self):
+                for sequence, log_id in ((1, 90), (2, 99), (3, 90)):
+                    yield _notification(sequence, log_id)
+
+        class Writer:
+            def __init__(self):
+                self.updates = []
+
+            def put(self, device, update):
+                self.updates.append(update)
+
+        writer = Writer()
+        asyncio.run(LogSubscriber(writer, log_id=90)._read(None, Session(), {"after": 0}))
+        self.assertEqual([update["last_sequence"] for update in writer.updates], [1, 3])
+
+
+@override_settings(NETCONF_POOL_ENABLED=False)
+class LogSubscriberTests(TransactionTestCase):
+    """LogSubscriber against the simulator's notification stream."""
+
+    def setUp(self):
+        self.data = SimulatedFleetData(devices=1, ports=4, macs=1, routes=1, services=1, log_events=20)
+        self.server = SrosSimulator(self.data)
+        port = self.server.start_in_thread("127.0.0.1", [0])[0]
+        self.addCleanup(self.server.stop_thread)
+        self.device = Device.objects.create(name="sim", hostname="127.0.0.1", port=port, username="admin")
+        self.device.set_password("admin")
+        self.device.save()
+
+    def cursor(self):
+        return LogCursor.objects.get(device=self.device, log_id=90)
+
+    def test_notifications_and_catch_up_after_reset(self):
+        async def wait_for(check, timeout=10):
+            deadline = time.monotonic() + timeout
+            while not await sync_to_async(check)():
+                self.assertLess(time.monotonic(), deadline, "subscriber did not catch up")
+                await asyncio.sleep(0.05)
+
+        async def run():
+            writer = LogEventWriter(flush_interval=0.1)
+            subscriber = LogSubscriber(writer, resync_interval=3600)
+            tasks = [asyncio.create_task(writer.run()), asyncio.create_task(subscriber.follow(self.device))]
+            try:
+                # The log is read once on subscribing...
+                await wait_for(lambda: LogCursor.objects.filter(last_sequence=20).exists())
+                # ...and new events arrive as notifications, each stored once.
+                self.server.emit_log_events(5)
+                await wait_for(lambda: self.cursor().last_sequence == 25)
+                self.assertEqual(subscriber.notifications, 5)
+                # Numbering restarts: the subscriber reads the log again.
+                self.data.clear_log()
+                self.server.emit_log_events(3)
+                await wait_for(lambda: self.cursor().epoch == 1 and self.cursor().last_sequence == 3)
+                await asyncio.sleep(0.3)
+                self.assertEqual(subscriber.status[self.device.pk], "subscribed")
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run(run())
+        self.assertEqual(LogEvent.objects.filter(device=self.device, epoch=0).count(), 25)
+        self.assertEqual(LogEvent.objects.filter(device=self.device, epoch=1).count(), 3)
+        self.assertEqual(self.cursor().total_events, 3)
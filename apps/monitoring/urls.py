@@ -10,4 +10,5 @@ urlpatterns = [
     path("health/", views.device_health, name="device_health"),
     path("health/<int:pk>/", views.device_health_detail, name="device_health_detail"),
     path("health/<int:pk>/check/", views.device_health_ajax, name="device_health_ajax"),
+    path("ports/<int:pk>/history/", views.port_history_data, name="port_history_data"),
 ]
@@ -1,25 +1,35 @@
 import csv
-
+import heapq
+import itertools
+import json
+import logging
+import re
+from operator import itemgetter
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, JsonResponse
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
 
 from apps.devices.models import Device
 from apps.services.models import DeploymentLog, VPLSService
-from .models import DeviceHealthScore
+from .models import DeviceHealthLatest, DeviceHealthScore
+
+logger = logging.getLogger(__name__)
 
 
 @login_required
 def dashboard(request):
-    devices = Device.objects.all()[:10]
+    devices = Device.objects.select_related("health_latest")[:10]
 
     # Build device list with health scores attached
     devices_with_health = []
     for device in devices:
-        latest_health = device.health_scores.first()
         devices_with_health.append({
             "device": device,
-            "health": latest_health,
+            "health": _latest_health(device),
         })
 
     context = {
@@ -33,18 +43,27 @@ def dashboard(request):
     return render(request, "monitoring/dashboard.html", context)
 
 
+HEALTH_HISTORY = 10
+SPARK_BARS = "▁▂▃▄▅▆▇█"
+# device_health_detail ?range= choices, in hours
+HEALTH_RANGES = {"24h": 24, "48h": 48, "7d": 24 * 7, "30d": 24 * 30, "1y": 24 * 365}
+
+
 @login_required
 def device_health(request):
     """Device health overview page showing all devices and their scores."""
-    devices = Device.objects.all()
+    devices = Device.objects.select_related("health_latest")
+    history = _recent_scores(HEALTH_HISTORY)
     device_scores = []
     for device in devices:
-        latest = device.health_scores.first()
-        history = list(device.health_scores.all()[:10])
+        scores = history.get(device.pk, [])
         device_scores.append({
             "device": device,
-            "latest": latest,
-            "history": history,
+            "latest": _latest_health(device),
+            "history": scores,
+            "sparkline": "".join(
+                SPARK_BARS[score * len(SPARK_BARS) // 101] for score in reversed(scores)
+            ),
         })
 
     return render(request, "monitoring/device_health.html", {
@@ -52,40 +71,70 @@ def device_health(request):
     })
 
 
+def _latest_health(device):
+    """The device's DeviceHealthLatest row (joined by select_related), or None."""
+    try:
+        return device.health_latest
+    except DeviceHealthLatest.DoesNotExist:
+        return None
+
+
+def _recent_scores(limit):
+    """``{device pk: [score, ...newest first]}`` for the last ``limit`` checks of
+    every device, in one windowed query."""
+    rank = Window(RowNumber(), partition_by=[F("device_id")], order_by=F("checked_at").desc())
+    rows = (
+        DeviceHealthScore.objects.annotate(rank=rank).filter(rank__lte=limit)
+        .order_by("device_id", "-checked_at").values_list("device_id", "score")
+    )
+    history = {}
+    for device_id, score in rows:
+        history.setdefault(device_id, []).append(score)
+    return history
+
+
 @login_required
 def device_health_detail(request, pk):
-    """Detailed health history for a single device."""
-    device = get_object_or_404(Device, pk=pk)
-    scores = device.health_scores.all()[:50]
+    """Detailed health history for a single device.
+
+    ``?range=`` (one of HEALTH_RANGES, default 24h) picks the window; raw
+    scores, hourly or daily rollups are shown depending on its length.
+    """
+    from datetime import timedelta
+
+    from .health_history import history
+
+    device = get_object_or_404(Device.objects.select_related("health_latest"), pk=pk)
+    selected = request.GET.get("range")
+    if selected not in HEALTH_RANGES:
+        selected = "24h"
+    resolution, scores = history(device, timedelta(hours=HEALTH_RANGES[selected]))
     return render(request, "monitoring/device_health_detail.html", {
         "device": device,
+        "latest": _latest_health(device),
         "scores": scores,
+        "resolution": resolution,
+        "ranges": list(HEALTH_RANGES),
+        "selected_range": selected,
     })
 
 
 @login_required
 def device_health_ajax(request, pk):
-    """AJAX endpoint to trigger a live health check for a device."""
+    """AJAX endpoint to trigger a live health check for a device.
+
+    Only the log events added since the last check are fetched; the score is
+    the rolling aggregate kept on the device's LogCursor.
+    """
     device = get_object_or_404(Device, pk=pk)
     try:
-        from netconf_lib.nokia_logs import calculate_health_score, get_log_entries
-        result = get_log_entries(device, log_id=90)
-        if result.get("error"):
-            return JsonResponse({"error": result["error"]}, status=500)
-
-        entries = result.get("entries", [])
-        health = calculate_health_score(entries)
+        from .log_history import collect_log_events
+        health = collect_log_events(device, log_id=90)
+        if health.get("error"):
+            return JsonResponse({"error": health["error"]}, status=500)
 
         # Save the score
-        DeviceHealthScore.objects.create(
-            device=device,
-            score=health["score"],
-            critical_count=health["severity_counts"]["critical"],
-            major_count=health["severity_counts"]["major"],
-            minor_count=health["severity_counts"]["minor"],
-            warning_count=health["severity_counts"]["warning"],
-            total_events=health["total_events"],
-        )
+        DeviceHealthScore.record(device, health)
 
         return JsonResponse({
             "score": health["score"],
@@ -94,114 +143,180 @@ def device_health_ajax(request, pk):
             "minor": health["severity_counts"]["minor"],
             "warning": health["severity_counts"]["warning"],
             "total_events": health["total_events"],
+            "new_events": health["new_events"],
         })
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+FDB_COLUMNS = ("mac_address", "sap", "interface_desc", "service_id", "type")
+FDB_MAX_PAGE = 1000
+# Columns sorted by their numbers rather than as text: SAP (port and VLAN) and service ID
+FDB_NATURAL_SORT = {1, 3}
+
+
 @login_required
 def fdb_table(request):
+    # The table itself is filled page by page by fdb_table_ajax (server-side mode).
     devices = Device.objects.all()
     selected_device_id = request.GET.get("device")
-    entries = []
-    interfaces = []
-    error = None
+    if selected_device_id:
+        get_object_or_404(Device, pk=selected_device_id)
+    selected_service_id = request.GET.get("service_id", "").strip()
 
-    selected_service_id = request.GET.get("service_id", "").strip() or None
+    return render(request, "monitoring/fdb_table.html", {
+        "devices": devices,
+        "selected_device_id": selected_device_id,
+        "selected_service_id": selected_service_id,
+    })
 
-    if selected_device_id:
-        device = get_object_or_404(Device, pk=selected_device_id)
-        try:
-            from netconf_lib.nokia_fdb import get_fdb_table
-            from netconf_lib.nokia_interfaces import get_interfaces
 
-            fdb_result = get_fdb_table(device, service_id=selected_service_id)
-            iface_result = get_interfaces(device)
+def _fdb_rows(device, service_id=None):
+    """Stream FDB rows (in FDB_COLUMNS order) with the SAP port's description joined in."""
+    from netconf_lib.nokia_fdb import iter_fdb_table
+    from netconf_lib.nokia_interfaces import get_interfaces
 
-            entries = fdb_result.get("entries", [])
-            interfaces = iface_result.get("interfaces", [])
-            services_found = fdb_result.get("services", [])
-            error = fdb_result.get("error") or iface_result.get("error")
+    interfaces = get_interfaces(device).get("interfaces", [])
+    desc_map = {i["name"]: i["description"] for i in interfaces}
+    for entry in iter_fdb_table(device, service_id=service_id):
+        sap_port = entry.sap.split(":")[0]
+        yield (entry.mac_address, entry.sap, desc_map.get(sap_port, ""), entry.service_id, entry.type)
 
-            # Build interface description lookup
-            desc_map = {i["name"]: i["description"] for i in interfaces}
-            for entry in entries:
-                sap_port = entry.get("sap", "").split(":")[0] if entry.get("sap") else ""
-                entry["interface_desc"] = desc_map.get(sap_port, "")
 
-        except Exception as e:
-            error = str(e)
-            services_found = []
-    else:
-        services_found = []
+def _cached_fdb_rows(device, service_id=None, refresh=False):
+    """_fdb_rows() as a list, kept for FDB_CACHE_TTL seconds per device and
+    service so paging, sorting and searching do not poll the router again."""
+    from django.core.cache import cache
+
+    key = f"fdb-rows:{device.pk}:{service_id or ''}"
+    rows = None if refresh else cache.get(key)
+    if rows is None:
+        rows = list(_fdb_rows(device, service_id))
+        cache.set(key, rows, getattr(settings, "FDB_CACHE_TTL", 30))
+    return rows
+
+
+def _natural_key(value):
+    """Sort key comparing the digit runs in ``value`` as numbers ("1/1/9" < "1/1/10")."""
+    return [(0, int(part)) if part.isdigit() else (1, part) for part in re.split(r"(\d+)", value)]
+
+
+def _fdb_sort_key(column):
+    if column in FDB_NATURAL_SORT:
+        return lambda row: _natural_key(row[column])
+    return itemgetter(column)
 
-    return render(request, "monitoring/fdb_table.html", {
-        "devices": devices,
-        "selected_device_id": selected_device_id,
-        "selected_service_id": selected_service_id or "",
-        "entries": entries,
-        "interfaces": interfaces,
-        "services_found": services_found,
-        "error": error,
-    })
+
+def _normalize_mac(value):
+    return "".join(c for c in value.lower() if c in "0123456789abcdef")
 
 
 @login_required
 def fdb_table_ajax(request, pk):
-    """AJAX endpoint for refreshing FDB table data."""
+    """Server-side DataTables endpoint for the FDB table.
+
+    Accepts the DataTables parameters (draw, start, length, search[value],
+    order[0][column], order[0][dir]) plus ``mac`` and ``sap`` filters, and
+    returns only the requested page. Entries are fetched from the device
+    once per FDB_CACHE_TTL (``refresh=1`` fetches them again); sorting keeps
+    just the first start+length rows in a heap, comparing SAPs and service
+    IDs by their numbers.
+    """
     device = get_object_or_404(Device, pk=pk)
     service_id = request.GET.get("service_id", "").strip() or None
     try:
-        from netconf_lib.nokia_fdb import get_fdb_table
-        from netconf_lib.nokia_interfaces import get_interfaces
+        draw = int(request.GET.get("draw", 0))
+        start = max(int(request.GET.get("start", 0)), 0)
+        length = int(request.GET.get("length", 25))
+        order_column = int(request.GET.get("order[0][column]", -1))
+    except ValueError:
+        return JsonResponse({"error": "Invalid paging parameters"}, status=400)
+    if length < 0 or length > FDB_MAX_PAGE:
+        length = FDB_MAX_PAGE
+    descending = request.GET.get("order[0][dir]") == "desc"
+    search = request.GET.get("search[value]", "").strip().lower()
+    mac_filter = _normalize_mac(request.GET.get("mac", ""))
+    sap_filter = request.GET.get("sap", "").strip().lower()
+
+    counts = {"total": 0, "filtered": 0}
+    services = set()
+
+    def matching(rows):
+        for row in rows:
+            counts["total"] += 1
+            services.add(row[3])
+            if mac_filter and mac_filter not in _normalize_mac(row[0]):
+                continue
+            if sap_filter and sap_filter not in row[1].lower():
+                continue
+            if search and not any(search in value.lower() for value in row):
+                continue
+            counts["filtered"] += 1
+            yield row
 
-        fdb_result = get_fdb_table(device, service_id=service_id)
-        iface_result = get_interfaces(device)
+    try:
+        refresh = request.GET.get("refresh") == "1"
+        rows = matching(_cached_fdb_rows(device, service_id, refresh=refresh))
+        if 0 <= order_column < len(FDB_COLUMNS):
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            page = pick(start + length, rows, key=_fdb_sort_key(order_column))[start:]
+        else:
+            page = list(itertools.islice(rows, start, start + length))
+            for _ in rows:  # the rest still counts towards the totals
+                pass
+    except Exception as e:
+        return JsonResponse({"error": str(e), "draw": draw}, status=500)
+
+    return JsonResponse({
+        "draw": draw,
+        "recordsTotal": counts["total"],
+        "recordsFiltered": counts["filtered"],
+        "data": [dict(zip(FDB_COLUMNS, row)) for row in page],
+        "services": sorted(services),
+    })
 
-        entries = fdb_result.get("entries", [])
-        interfaces = iface_result.get("interfaces", [])
 
-        desc_map = {i["name"]: i["description"] for i in interfaces}
-        for entry in entries:
-            sap_port = entry.get("sap", "").split(":")[0] if entry.get("sap") else ""
-            entry["interface_desc"] = desc_map.get(sap_port, "")
+class Echo:
+    """File-like object whose write() hands the value back (for csv.writer streaming)."""
 
-        return JsonResponse({"entries": entries, "interfaces": interfaces})
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+    def write(self, value):
+        return value
 
 
 @login_required
 def fdb_export_csv(request, pk):
-    """Export FDB table as CSV."""
+    """Export FDB table as CSV, or NDJSON with ?format=ndjson, streamed row by row."""
     device = get_object_or_404(Device, pk=pk)
-    try:
-        from netconf_lib.nokia_fdb import get_fdb_table
-        from netconf_lib.nokia_interfaces import get_interfaces
-
-        fdb_result = get_fdb_table(device)
-        iface_result = get_interfaces(device)
-
-        entries = fdb_result.get("entries", [])
-        interfaces = iface_result.get("interfaces", [])
-        desc_map = {i["name"]: i["description"] for i in interfaces}
-    except Exception:
-        entries = []
-        desc_map = {}
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="fdb_{device.name}.csv"'
-    writer = csv.writer(response)
-    writer.writerow(["Interface (SAP)", "Description", "MAC Address", "Service ID", "Type"])
-    for entry in entries:
-        sap_port = entry.get("sap", "").split(":")[0] if entry.get("sap") else ""
-        writer.writerow([
-            entry.get("sap", ""),
-            desc_map.get(sap_port, ""),
-            entry.get("mac_address", ""),
-            entry.get("service_id", ""),
-            entry.get("type", ""),
-        ])
+    service_id = request.GET.get("service_id", "").strip() or None
+    ndjson = request.GET.get("format") == "ndjson"
+
+    def csv_lines():
+        writer = csv.writer(Echo())
+        yield writer.writerow(["Interface (SAP)", "Description", "MAC Address", "Service ID", "Type"])
+        try:
+            for mac, sap, desc, svc, entry_type in _fdb_rows(device, service_id):
+                yield writer.writerow([sap, desc, mac, svc, entry_type])
+        except Exception as e:
+            # Headers are already sent; end with an error row so the export
+            # does not look complete.
+            logger.exception("FDB export of %s failed", device)
+            yield writer.writerow([f"ERROR: {e}"])
+
+    def ndjson_lines():
+        try:
+            for row in _fdb_rows(device, service_id):
+                yield json.dumps(dict(zip(FDB_COLUMNS, row))) + "\n"
+        except Exception as e:
+            logger.exception("FDB export of %s failed", device)
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    if ndjson:
+        response = StreamingHttpResponse(ndjson_lines(), content_type="application/x-ndjson")
+        filename = f"fdb_{device.name}.ndjson"
+    else:
+        response = StreamingHttpResponse(csv_lines(), content_type="text/csv")
+        filename = f"fdb_{device.name}.csv"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
 
@@ -228,3 +343,34 @@ def interface_list(request):
         "interfaces": interfaces,
         "error": error,
     })
+
+
+@login_required
+def port_history_data(request, pk):
+    """JSON time series of one port's traffic for graphs.
+
+    Query params: port (required), hours (default 24), resolution
+    (1m/1h/1d; default picks one from the span).
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from .port_history import series
+
+    device = get_object_or_404(Device, pk=pk)
+    port_id = request.GET.get("port", "").strip()
+    if not port_id:
+        return JsonResponse({"error": "port is required"}, status=400)
+    try:
+        hours = float(request.GET.get("hours", 24))
+    except ValueError:
+        return JsonResponse({"error": "hours must be a number"}, status=400)
+    resolution = request.GET.get("resolution") or None
+    if resolution not in (None, "1m", "1h", "1d"):
+        return JsonResponse({"error": "resolution must be 1m, 1h or 1d"}, status=400)
+
+    end = timezone.now()
+    result = series(device, port_id, end - timedelta(hours=hours), end, resolution=resolution)
+    result.update({"device": device.name, "port": port_id})
+    return JsonResponse(result)
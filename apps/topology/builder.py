@@ -1,16 +1,22 @@
 import concurrent.futures
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 
 from apps.devices.models import Device
-from netconf_lib.nokia_interfaces import get_lldp_neighbors
-from netconf_lib.nokia_ldp import get_ldp_sessions
-from netconf_lib.nokia_mpls import get_mpls_lsps, get_mpls_tunnels
-from netconf_lib.nokia_routing import get_system_ip
+from apps.topology.models import DevicePollResult
+from netconf_lib.nokia_snapshot import get_device_snapshot
 
 
-def build_topology(device_ids=None):
+def build_topology(device_ids=None, refresh=None, ttl=None):
     """Build a full network topology graph from all (or selected) devices.
 
-    Polls devices in parallel using ThreadPoolExecutor.
+    Each device's last successful poll is kept in DevicePollResult; only
+    devices whose result is older than ``ttl`` seconds (default
+    TOPOLOGY_POLL_TTL), that have none, or that are in ``refresh`` (PKs, or
+    True for all) are polled again, in parallel. The graph is assembled
+    from the cached and fresh results together.
     Returns a vis.js compatible graph: {nodes: [...], edges: [...], stats: {...}}
     """
     if device_ids:
@@ -21,30 +27,70 @@ def build_topology(device_ids=None):
     if not devices:
         return {"nodes": [], "edges": [], "stats": {}}
 
-    # Poll all devices in parallel
-    device_data = {}
+    device_data = _cached_polls(devices, refresh, ttl)
+    stale = [device for device in devices if device.pk not in device_data]
+
+    # Poll the stale devices in parallel
+    fresh = {}
     with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
         futures = {
             executor.submit(_poll_device, device): device
-            for device in devices
+            for device in stale
         }
         for future in concurrent.futures.as_completed(futures):
             device = futures[future]
             try:
-                device_data[device.pk] = future.result()
+                fresh[device.pk] = future.result()
             except Exception as e:
-                device_data[device.pk] = {"error": str(e), "device": device}
+                fresh[device.pk] = {"error": str(e), "device": device}
+    _store_polls(fresh)
+    device_data.update(fresh)
+
+    # Assemble in inventory order so the same data always gives the same graph.
+    device_data = {device.pk: device_data[device.pk] for device in devices}
+    graph = _assemble_graph(devices, device_data)
+    graph["stats"]["polled_devices"] = len(stale)
+    graph["stats"]["cached_devices"] = len(devices) - len(stale)
+    return graph
+
+
+def _cached_polls(devices, refresh, ttl):
+    """{device pk: poll data} of the devices whose stored poll can be reused."""
+    if refresh is True:
+        return {}
+    ttl = getattr(settings, "TOPOLOGY_POLL_TTL", 300) if ttl is None else ttl
+    by_pk = {device.pk: device for device in devices}
+    results = DevicePollResult.objects.filter(
+        device_id__in=by_pk.keys() - set(refresh or ()),
+        polled_at__gte=timezone.now() - timedelta(seconds=ttl),
+    ).values_list("device_id", "data")
+    return {pk: dict(data, device=by_pk[pk]) for pk, data in results}
+
 
-    return _assemble_graph(devices, device_data)
+def _store_polls(device_data):
+    """Keep the successful polls; failed devices are polled again next time."""
+    now = timezone.now()
+    results = [
+        DevicePollResult(
+            device_id=pk, polled_at=now,
+            data={key: value for key, value in data.items() if key != "device"},
+        )
+        for pk, data in device_data.items()
+        if "error" not in data and all(error is None for error in data["errors"].values())
+    ]
+    DevicePollResult.objects.bulk_create(
+        results, update_conflicts=True, unique_fields=["device"], update_fields=["polled_at", "data"],
+    )
 
 
 def _poll_device(device):
-    """Poll a single device for all topology-relevant data."""
-    system_ip_result = get_system_ip(device)
-    ldp_result = get_ldp_sessions(device)
-    mpls_result = get_mpls_lsps(device)
-    tunnel_result = get_mpls_tunnels(device)
-    lldp_result = get_lldp_neighbors(device)
+    """Poll a single device for all topology-relevant data (one <get> RPC)."""
+    snapshot = get_device_snapshot(device)
+    system_ip_result = snapshot["system_ip"]
+    ldp_result = snapshot["ldp"]
+    mpls_result = snapshot["mpls"]
+    tunnel_result = snapshot["tunnels"]
+    lldp_result = snapshot["lldp"]
 
     return {
         "device": device,
@@ -64,19 +110,53 @@ def _poll_device(device):
     }
 
 
+# Edge kinds, the first element of the edge dedupe keys.
+PHYSICAL, LDP, LSP = 0, 1, 2
+
+# vis.js styling of each edge type
+EDGE_STYLES = {
+    "physical": {"color": {"color": "#6c757d"}, "width": 3, "dashes": False},
+    "ldp": {"color": {"color": "#0d6efd"}, "width": 2, "dashes": [5, 5]},
+    "lsp": {"color": {"color": "#198754"}, "width": 2, "dashes": [10, 5], "arrows": "to"},
+}
+
+
+def _lookup_indexes(devices, device_data):
+    """Both remote-device lookups, from one pass over the devices and their polls.
+
+    Returns ``(by_name, ip_to_device)``: LLDP system name -> the first device
+    whose name or hostname matches it, and system IP or hostname -> device
+    for resolving LDP peer and LSP destination addresses (a later device
+    overrides an earlier one).
+    """
+    by_name = {}
+    ip_to_device = {}
+    for device in devices:
+        by_name.setdefault(device.name, device)
+        by_name.setdefault(device.hostname, device)
+        data = device_data.get(device.pk)
+        if data is None:
+            continue
+        if data.get("system_ip"):
+            ip_to_device[data["system_ip"]] = data["device"]
+        ip_to_device[data["device"].hostname] = data["device"]
+    return by_name, ip_to_device
+
+
 def _assemble_graph(devices, device_data):
-    """Assemble vis.js graph from polled device data."""
+    """Assemble vis.js graph from polled device data.
+
+    Remote devices are found through dicts built once per call (name and
+    hostname for LLDP neighbours, system IP and hostname for LDP/LSP peers)
+    and edges are deduplicated on integer tuples, so assembly is linear in
+    devices plus adjacencies.
+    """
     nodes = []
     edges = []
-    edge_set = set()  # Prevent duplicate edges
+    edge_set = set()  # (kind, pk, pk[, lsp name]) of the edges added so far
+    edge_counts = {PHYSICAL: 0, LDP: 0, LSP: 0}
 
-    # Build system IP -> device mapping for resolving LDP peer addresses
-    ip_to_device = {}
-    for pk, data in device_data.items():
-        if "error" not in data or data.get("system_ip"):
-            ip_to_device[data.get("system_ip", "")] = data["device"]
-        # Also map by hostname
-        ip_to_device[data["device"].hostname] = data["device"]
+    by_name, ip_to_device = _lookup_indexes(devices, device_data)
 
     # Create nodes
     for device in devices:
@@ -110,20 +190,16 @@ def _assemble_graph(devices, device_data):
         for neighbor in data.get("lldp_neighbors", []):
             remote_name = neighbor.get("remote_system_name", "")
             # Find the remote device in our inventory
-            remote_device = None
-            for d in devices:
-                if d.name == remote_name or d.hostname == remote_name:
-                    remote_device = d
-                    break
+            remote_device = by_name.get(remote_name)
             if not remote_device:
                 continue
 
-            edge_key = tuple(sorted([device.pk, remote_device.pk]))
-            edge_id = f"phys-{edge_key[0]}-{edge_key[1]}"
-            if edge_id not in edge_set:
-                edge_set.add(edge_id)
+            edge_key = (PHYSICAL, *sorted((device.pk, remote_device.pk)))
+            if edge_key not in edge_set:
+                edge_set.add(edge_key)
+                edge_counts[PHYSICAL] += 1
                 edges.append({
-                    "id": edge_id,
+                    "id": f"phys-{edge_key[1]}-{edge_key[2]}",
                     "from": f"device-{device.pk}",
                     "to": f"device-{remote_device.pk}",
                     "label": neighbor.get("local_port", ""),
@@ -134,9 +210,7 @@ def _assemble_graph(devices, device_data):
                         f"Remote System: {remote_name}"
                     ),
                     "type": "physical",
-                    "color": {"color": "#6c757d"},
-                    "width": 3,
-                    "dashes": False,
+                    **EDGE_STYLES["physical"],
                 })
 
     # Create edges from LDP sessions
@@ -150,12 +224,12 @@ def _assemble_graph(devices, device_data):
             if not remote_device:
                 continue
 
-            edge_key = tuple(sorted([device.pk, remote_device.pk]))
-            edge_id = f"ldp-{edge_key[0]}-{edge_key[1]}"
-            if edge_id not in edge_set:
-                edge_set.add(edge_id)
+            edge_key = (LDP, *sorted((device.pk, remote_device.pk)))
+            if edge_key not in edge_set:
+                edge_set.add(edge_key)
+                edge_counts[LDP] += 1
                 edges.append({
-                    "id": edge_id,
+                    "id": f"ldp-{edge_key[1]}-{edge_key[2]}",
                     "from": f"device-{device.pk}",
                     "to": f"device-{remote_device.pk}",
                     "label": "LDP",
@@ -168,9 +242,7 @@ def _assemble_graph(devices, device_data):
                         f"Recv Labels: {session.get('received_labels', 0)}"
                     ),
                     "type": "ldp",
-                    "color": {"color": "#0d6efd"},
-                    "width": 2,
-                    "dashes": [5, 5],
+                    **EDGE_STYLES["ldp"],
                 })
 
     # Create edges from MPLS LSPs
@@ -184,13 +256,14 @@ def _assemble_graph(devices, device_data):
             if not remote_device:
                 continue
 
-            edge_id = f"lsp-{device.pk}-{remote_device.pk}-{lsp.get('lsp_name', '')}"
-            if edge_id not in edge_set:
-                edge_set.add(edge_id)
+            edge_key = (LSP, device.pk, remote_device.pk, lsp.get("lsp_name", ""))
+            if edge_key not in edge_set:
+                edge_set.add(edge_key)
+                edge_counts[LSP] += 1
                 octets = lsp.get("forwarded_octets", 0)
                 packets = lsp.get("forwarded_packets", 0)
                 edges.append({
-                    "id": edge_id,
+                    "id": f"lsp-{device.pk}-{remote_device.pk}-{edge_key[3]}",
                     "from": f"device-{device.pk}",
                     "to": f"device-{remote_device.pk}",
                     "label": lsp.get("lsp_name", "LSP"),
@@ -204,10 +277,7 @@ def _assemble_graph(devices, device_data):
                         f"Fwd Octets: {octets:,}"
                     ),
                     "type": "lsp",
-                    "color": {"color": "#198754"},
-                    "width": 2,
-                    "dashes": [10, 5],
-                    "arrows": "to",
+                    **EDGE_STYLES["lsp"],
                 })
 
     tunnel_count = sum(len(d.get("ldp_sessions", [])) for d in device_data.values())
@@ -218,9 +288,9 @@ def _assemble_graph(devices, device_data):
         "edges": edges,
         "stats": {
             "device_count": len(devices),
-            "physical_links": sum(1 for e in edges if e["type"] == "physical"),
-            "ldp_tunnels": sum(1 for e in edges if e["type"] == "ldp"),
-            "mpls_lsps": sum(1 for e in edges if e["type"] == "lsp"),
+            "physical_links": edge_counts[PHYSICAL],
+            "ldp_tunnels": edge_counts[LDP],
+            "mpls_lsps": edge_counts[LSP],
             "total_ldp_sessions": tunnel_count,
             "total_lsps": lsp_count,
         },
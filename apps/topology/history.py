@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.topology.builder import EDGE_STYLES
+from apps.topology.models import TopologySnapshot
+
+KINDS = ("nodes", "edges")
+# Not stored: tooltips (re-rendered on every poll with uptimes and counters)
+# and edge styling (follows from the edge type, see EDGE_STYLES).
+UNSTORED = {"id", "title", "color", "width", "dashes", "arrows"}
+
+
+def structure(graph):
+    """``{"nodes": {id: attrs}, "edges": {id: attrs}}`` of a vis.js graph,
+    without tooltips and styling."""
+    return {
+        kind: {
+            item["id"]: {key: value for key, value in item.items() if key not in UNSTORED}
+            for item in graph.get(kind, [])
+        }
+        for kind in KINDS
+    }
+
+
+def diff(old, new):
+    """What changed from structure ``old`` to ``new``.
+
+    Returns ``{kind: {"added": {id: attrs}, "removed": [id, ...], "changed":
+    {id: {attr: new value}}}}`` for each kind with changes (an attribute
+    that went away is None). Empty when nothing changed.
+    """
+    delta = {}
+    for kind in KINDS:
+        before, after = old.get(kind, {}), new.get(kind, {})
+        added = {key: attrs for key, attrs in after.items() if key not in before}
+        removed = [key for key in before if key not in after]
+        changed = {}
+        for key, attrs in after.items():
+            previous = before.get(key)
+            if previous is None or previous == attrs:
+                continue
+            changes = {attr: value for attr, value in attrs.items() if previous.get(attr) != value}
+            changes.update((attr, None) for attr in previous if attr not in attrs)
+            changed[key] = changes
+        if added or removed or changed:
+            delta[kind] = {"added": added, "removed": removed, "changed": changed}
+    return delta
+
+
+def apply(base, delta):
+    """The structure ``base`` with ``delta`` (from diff()) applied; ``base`` is modified."""
+    for kind, changes in delta.items():
+        items = base.setdefault(kind, {})
+        for key in changes["removed"]:
+            items.pop(key, None)
+        items.update(changes["added"])
+        for key, attrs in changes["changed"].items():
+            item = items[key] = dict(items.get(key, {}))
+            for attr, value in attrs.items():
+                if value is None:
+                    item.pop(attr, None)
+                else:
+                    item[attr] = value
+    return base
+
+
+def save_snapshot(graph):
+    """Store a topology refresh as a delta against the latest snapshot.
+
+    A new base snapshot is started when there is none yet or the current
+    one already has TOPOLOGY_SNAPSHOT_BASE_EVERY deltas, which bounds the
+    work of rebuilding a past graph. Nothing is stored when the structure
+    has not changed; the latest snapshot is returned then.
+    """
+    current = structure(graph)
+    stats = graph.get("stats", {})
+    fields = {
+        "stats": stats,
+        "device_count": stats.get("device_count", 0),
+        "tunnel_count": stats.get("total_ldp_sessions", 0),
+    }
+    with transaction.atomic():
+        latest = TopologySnapshot.objects.first()
+        if latest is not None:
+            delta = diff(_rebuild(latest), current)
+            if not delta:
+                return latest
+            base_id = latest.base_id or latest.pk
+            if TopologySnapshot.objects.filter(base_id=base_id).count() < _base_every():
+                return TopologySnapshot.objects.create(base_id=base_id, data=delta, **fields)
+        return TopologySnapshot.objects.create(data=current, **fields)
+
+
+def prune(now=None):
+    """Delete snapshots past TOPOLOGY_SNAPSHOT_RETENTION_DAYS in one DELETE.
+
+    Everything before the base of the snapshot in force at the cutoff goes,
+    so the graph at any retained time can still be rebuilt. Returns the
+    number of rows deleted.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=getattr(settings, "TOPOLOGY_SNAPSHOT_RETENTION_DAYS", 30))
+    in_force = TopologySnapshot.objects.filter(created_at__lte=cutoff).values_list(
+        "pk", "base_id",
+    ).first()
+    if in_force is None:
+        return 0
+    pk, base_id = in_force
+    deleted, _ = TopologySnapshot.objects.filter(pk__lt=base_id or pk).delete()
+    return deleted
+
+
+def structure_at(when):
+    """``(snapshot, structure)`` of the topology as of ``when``, or ``(None, None)``."""
+    snapshot = TopologySnapshot.objects.filter(created_at__lte=when).first()
+    if snapshot is None:
+        return None, None
+    return snapshot, _rebuild(snapshot)
+
+
+def graph_at(when):
+    """The vis.js graph as of ``when`` (without tooltips), or None before the first snapshot."""
+    snapshot, current = structure_at(when)
+    if snapshot is None:
+        return None
+    return {
+        "nodes": [{"id": key, **attrs} for key, attrs in current["nodes"].items()],
+        "edges": [
+            {"id": key, **attrs, **EDGE_STYLES.get(attrs.get("type"), {})}
+            for key, attrs in current["edges"].items()
+        ],
+        "stats": snapshot.stats,
+        "snapshot_at": snapshot.created_at.isoformat(),
+    }
+
+
+def changes_between(start, end):
+    """diff() of the topology at ``start`` and at ``end`` plus the snapshot times used."""
+    old_snapshot, old = structure_at(start)
+    new_snapshot, new = structure_at(end)
+    return {
+        "from": old_snapshot.created_at.isoformat() if old_snapshot else None,
+        "to": new_snapshot.created_at.isoformat() if new_snapshot else None,
+        "changes": diff(old or {}, new or {}),
+    }
+
+
+def _rebuild(snapshot):
+    """The full structure as of ``snapshot``: its base plus the deltas up to it."""
+    if snapshot.base_id is None:
+        return snapshot.data
+    current = TopologySnapshot.objects.values_list("data", flat=True).get(pk=snapshot.base_id)
+    deltas = TopologySnapshot.objects.filter(
+        base_id=snapshot.base_id, pk__lte=snapshot.pk,
+    ).order_by("pk").values_list("data", flat=True)
+    for delta in deltas.iterator():
+        apply(current, delta)
+    return current
+
+
+def _base_every():
+    return getattr(settings, "TOPOLOGY_SNAPSHOT_BASE_EVERY", 50)
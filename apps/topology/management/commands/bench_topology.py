@@ -0,0 +1,107 @@
+import gc
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.devices.models import Device
+from apps.topology.builder import _assemble_graph
+from netconf_lib.simulator import port_id, system_ip
+
+
+class Command(BaseCommand):
+    help = "Benchmark topology graph assembly (_assemble_graph) on a synthetic fleet " \
+           "and fail if it takes longer than --budget seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--nodes", type=int, default=5000, help="Routers (default: 5000)",
+        )
+        parser.add_argument(
+            "--adjacencies", type=int, default=50000,
+            help="LLDP neighbours over the whole fleet; every one also has an LDP session "
+                 "(default: 50000)",
+        )
+        parser.add_argument(
+            "--lsps", type=int, default=2, help="MPLS LSPs per router (default: 2)",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3,
+            help="Timed runs; the fastest is reported (default: 3)",
+        )
+        parser.add_argument(
+            "--budget", type=float, default=2.0,
+            help="Maximum seconds for one assembly (default: 2.0)",
+        )
+
+    def handle(self, *args, **options):
+        nodes = options["nodes"]
+        if nodes < 2:
+            raise CommandError("--nodes must be at least 2")
+        devices, device_data = synthetic_fleet(nodes, options["adjacencies"], options["lsps"])
+        adjacencies = sum(len(data["lldp_neighbors"]) for data in device_data.values())
+        self.stdout.write(
+            f"Assembling {nodes} routers, {adjacencies} LLDP adjacencies, "
+            f"{adjacencies} LDP sessions, {nodes * options['lsps']} LSPs"
+        )
+
+        best = None
+        for _ in range(max(options["repeat"], 1)):
+            gc.collect()
+            start = time.perf_counter()
+            graph = _assemble_graph(devices, device_data)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        stats = graph["stats"]
+        self.stdout.write(
+            f"  {best:.3f}s: {len(graph['nodes'])} nodes, {len(graph['edges'])} edges "
+            f"({stats['physical_links']} physical, {stats['ldp_tunnels']} LDP, "
+            f"{stats['mpls_lsps']} LSP)"
+        )
+        # Every adjacency is reported from both ends, so half of them are unique links.
+        if stats["physical_links"] != adjacencies // 2 or stats["ldp_tunnels"] != adjacencies // 2:
+            raise CommandError("Assembled graph does not match the synthetic fleet")
+        if best > options["budget"]:
+            raise CommandError(f"Assembly took {best:.3f}s, over the {options['budget']}s budget")
+        self.stdout.write(self.style.SUCCESS(f"Within the {options['budget']}s budget."))
+
+
+def synthetic_fleet(nodes, adjacencies, lsps_per_node=2):
+    """In-memory devices and poll results shaped like builder._poll_device's.
+
+    Routers form a ring lattice: each is linked to its ``adjacencies /
+    nodes / 2`` nearest routers on either side (fewer in a small ring, so
+    no pair is linked twice), over LLDP (by name) and LDP (by system IP);
+    LSPs run to the routers further along the ring.
+    """
+    per_side = max(min(adjacencies // nodes // 2, (nodes - 1) // 2), 1)
+    devices = [
+        Device(pk=i + 1, name=f"pe-{i}", hostname=f"pe-{i}.example.net", status="online")
+        for i in range(nodes)
+    ]
+    device_data = {}
+    for i, device in enumerate(devices):
+        neighbours = [(i + offset) % nodes for offset in range(-per_side, per_side + 1) if offset]
+        device_data[device.pk] = {
+            "device": device,
+            "system_ip": system_ip(i),
+            "ldp_sessions": [
+                {"peer_address": system_ip(j), "state": "established", "adjacency_type": "link",
+                 "uptime": "86400", "sent_labels": 10, "received_labels": 10}
+                for j in neighbours
+            ],
+            "ldp_stats": {},
+            "mpls_lsps": [
+                {"lsp_name": f"to-pe-{j}", "to_address": system_ip(j), "from_address": system_ip(i),
+                 "oper_state": "up", "path_hops": [system_ip(j)],
+                 "forwarded_packets": 0, "forwarded_octets": 0}
+                for j in ((i + per_side + k + 1) % nodes for k in range(lsps_per_node))
+            ],
+            "tunnels": [],
+            "lldp_neighbors": [
+                {"local_port": port_id(n), "remote_system_name": f"pe-{j}", "remote_port_id": port_id(n)}
+                for n, j in enumerate(neighbours)
+            ],
+            "errors": {},
+        }
+    return devices, device_data
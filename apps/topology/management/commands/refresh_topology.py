@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.topology.refresher import rebuild
+
+
+class Command(BaseCommand):
+    help = "Keep the topology graph served by /topology/data/ warm: rebuild it every " \
+           "--interval seconds, polling only devices whose last poll is older than " \
+           "TOPOLOGY_POLL_TTL, and record the changes as topology snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=int, default=getattr(settings, "TOPOLOGY_REFRESH_INTERVAL", 60),
+            help="Seconds between rebuilds (default: TOPOLOGY_REFRESH_INTERVAL = 60)",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Rebuild once and exit (e.g. from cron)",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            self._refresh(None)
+            return
+        self.stdout.write(f"Refreshing the topology every {options['interval']}s...")
+        etag = None
+        try:
+            while True:
+                started = time.monotonic()
+                etag = self._refresh(etag)
+                time.sleep(max(options["interval"] - (time.monotonic() - started), 0))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    def _refresh(self, etag):
+        """One rebuild; returns the new graph's ETag (``etag`` again if it failed)."""
+        start = time.monotonic()
+        try:
+            warm = rebuild()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Topology rebuild failed: {e}"))
+            return etag
+        stats = warm.stats
+        self.stdout.write(
+            f"Topology: {stats.get('device_count', 0)} devices "
+            f"({stats.get('polled_devices', 0)} polled, {stats.get('cached_devices', 0)} cached) "
+            f"in {time.monotonic() - start:.1f}s"
+            + ("" if warm.etag != etag else ", unchanged")
+        )
+        return warm.etag
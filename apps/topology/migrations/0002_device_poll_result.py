@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0003_device_circuit_breaker'),
+        ('topology', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DevicePollResult',
+            fields=[
+                ('device', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='topology_poll', serialize=False, to='devices.device')),
+                ('polled_at', models.DateTimeField()),
+                ('data', models.JSONField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+UNSTORED = {"id", "title", "color", "width", "dashes", "arrows"}
+
+
+def graphs_to_structure(apps, schema_editor):
+    """Keep existing snapshots as base snapshots of their graph structure."""
+    TopologySnapshot = apps.get_model("topology", "TopologySnapshot")
+    for snapshot in TopologySnapshot.objects.iterator():
+        graph = snapshot.topology_json or {}
+        snapshot.data = {
+            kind: {
+                item["id"]: {key: value for key, value in item.items() if key not in UNSTORED}
+                for item in graph.get(kind, [])
+            }
+            for kind in ("nodes", "edges")
+        }
+        snapshot.stats = graph.get("stats", {})
+        snapshot.save(update_fields=["data", "stats"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topology', '0002_device_poll_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topologysnapshot',
+            name='base',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='deltas', to='topology.topologysnapshot'),
+        ),
+        migrations.AddField(
+            model_name='topologysnapshot',
+            name='data',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='topologysnapshot',
+            name='stats',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(graphs_to_structure, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='topologysnapshot',
+            name='topology_json',
+        ),
+        migrations.AddIndex(
+            model_name='topologysnapshot',
+            index=models.Index(fields=['created_at'], name='topology_to_created_401c7e_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topology', '0003_snapshot_deltas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopologyGraph',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', models.TextField(default='')),
+                ('etag', models.CharField(blank=True, max_length=64)),
+                ('stats', models.JSONField(default=dict)),
+                ('built_at', models.DateTimeField(blank=True, null=True)),
+                ('building_since', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -2,14 +2,63 @@ from django.db import models
 
 
 class TopologySnapshot(models.Model):
-    """Cached topology graph data to avoid polling all devices on every page load."""
+    """One topology refresh, stored as structure only (see apps/topology/history.py).
+
+    A base snapshot (``base`` is None) holds the whole graph structure in
+    ``data``; the snapshots after it hold only what changed since the
+    previous one (added/removed nodes and edges, changed attributes) and
+    point at their base.
+    """
     created_at = models.DateTimeField(auto_now_add=True)
-    topology_json = models.JSONField()
+    # No cascade, so retention is one DELETE; a base is only ever deleted
+    # together with its deltas (they are all older than the next base).
+    base = models.ForeignKey(
+        "self", on_delete=models.DO_NOTHING, null=True, blank=True, related_name="deltas",
+    )
+    data = models.JSONField(default=dict)
+    stats = models.JSONField(default=dict)
     device_count = models.IntegerField(default=0)
     tunnel_count = models.IntegerField(default=0)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["created_at"])]
 
     def __str__(self):
         return f"Topology snapshot at {self.created_at} ({self.device_count} devices, {self.tunnel_count} tunnels)"
+
+
+class DevicePollResult(models.Model):
+    """The last successful topology poll of one device (see builder.build_topology).
+
+    ``data`` holds what builder._poll_device returned, minus the device
+    itself. Results younger than TOPOLOGY_POLL_TTL are reused instead of
+    polling the device again.
+    """
+    device = models.OneToOneField(
+        "devices.Device", on_delete=models.CASCADE, primary_key=True, related_name="topology_poll",
+    )
+    polled_at = models.DateTimeField()
+    data = models.JSONField()
+
+    def __str__(self):
+        return f"{self.device} polled at {self.polled_at}"
+
+
+class TopologyGraph(models.Model):
+    """The current full topology graph (one row, pk=1; see apps/topology/refresher.py).
+
+    ``body`` is the graph as served by topology_data, ``etag`` the SHA-256
+    of the body without the polled/cached device counts and ``stats`` a copy
+    of its stats.
+    ``building_since`` is set while a rebuild is running, so concurrent
+    rebuild requests from any worker wait for it instead of polling too.
+    """
+    body = models.TextField(default="")
+    etag = models.CharField(max_length=64, blank=True)
+    stats = models.JSONField(default=dict)
+    built_at = models.DateTimeField(null=True, blank=True)
+    building_since = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Topology graph built at {self.built_at}"
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.topology.builder import build_topology
+from apps.topology.history import prune, save_snapshot
+from apps.topology.models import TopologyGraph
+
+WAIT_INTERVAL = 0.5
+# Stats that say how a build went rather than what the graph is.
+VOLATILE_STATS = ("polled_devices", "cached_devices")
+
+
+def current(max_age=None):
+    """The warm TopologyGraph (``body`` loaded on access), or None if there is
+    none yet or it was built more than ``max_age`` seconds ago."""
+    graphs = TopologyGraph.objects.defer("body").filter(pk=1, built_at__isnull=False)
+    if max_age is not None:
+        graphs = graphs.filter(built_at__gte=timezone.now() - timedelta(seconds=max_age))
+    return graphs.first()
+
+
+def rebuild(refresh=None, timeout=None):
+    """Build the full topology and make it the warm graph; returns the TopologyGraph.
+
+    Only one rebuild runs at a time, across all processes: the caller that
+    takes the lease (``building_since``) polls the devices, and everyone
+    arriving meanwhile waits for that build and gets its result instead of
+    polling again. A lease older than ``timeout`` seconds (default
+    TOPOLOGY_BUILD_TIMEOUT) is taken over, as its holder has died.
+    ``refresh`` is passed on to build_topology().
+    """
+    timeout = getattr(settings, "TOPOLOGY_BUILD_TIMEOUT", 120) if timeout is None else timeout
+    TopologyGraph.objects.get_or_create(pk=1)
+    arrived = timezone.now()
+    while True:
+        now = timezone.now()
+        taken = TopologyGraph.objects.filter(pk=1).filter(
+            Q(building_since__isnull=True) | Q(building_since__lt=now - timedelta(seconds=timeout)),
+        ).update(building_since=now)
+        if taken:
+            try:
+                return _build(refresh)
+            finally:
+                TopologyGraph.objects.filter(pk=1, building_since=now).update(building_since=None)
+        # Someone else is building: use their graph once it is done. If
+        # their build fails, the lease is released and the next turn takes it.
+        time.sleep(WAIT_INTERVAL)
+        graph = TopologyGraph.objects.filter(pk=1, built_at__gte=arrived).first()
+        if graph is not None:
+            return graph
+
+
+def _build(refresh):
+    graph = build_topology(refresh=refresh)
+    save_snapshot(graph)
+    prune()
+    body = json.dumps(graph, cls=DjangoJSONEncoder)
+    # The ETag covers the body as served, tooltips included, except for the
+    # polled/cached device counts, so a rebuild from the same polls keeps it.
+    stable = dict(graph, stats={
+        name: value for name, value in graph["stats"].items() if name not in VOLATILE_STATS
+    })
+    digest = json.dumps(stable, sort_keys=True, cls=DjangoJSONEncoder)
+    fields = {
+        "body": body, "etag": hashlib.sha256(digest.encode()).hexdigest(),
+        "stats": graph["stats"], "built_at": timezone.now(),
+    }
+    TopologyGraph.objects.filter(pk=1).update(**fields)
+    return TopologyGraph(pk=1, **fields)
@@ -5,4 +5,6 @@ from . import views
 urlpatterns = [
     path("", views.topology_map, name="topology_map"),
     path("data/", views.topology_data, name="topology_data"),
+    path("history/", views.topology_history, name="topology_history"),
+    path("changes/", views.topology_changes, name="topology_changes"),
 ]
@@ -1,12 +1,16 @@
-import json
-
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
 
 from apps.devices.models import Device
 from .builder import build_topology
+from .history import changes_between, graph_at
 from .models import TopologySnapshot
+from .refresher import current, rebuild
 
 
 @login_required
@@ -24,16 +28,28 @@ def topology_map(request):
 def topology_data(request):
     """AJAX endpoint returning topology graph as JSON.
 
+    The full graph is served from the warm copy kept by refresh_topology
+    (with an ETag, so unchanged graphs are answered 304 Not Modified) while
+    it is younger than TOPOLOGY_POLL_TTL; otherwise it is rebuilt, and
+    concurrent rebuilds are merged into one (see refresher.rebuild).
+
     Optional query params:
-    - device: comma-separated device PKs to include (default: all)
-    - cached: "1" to return last snapshot instead of live poll
+    - device: comma-separated device PKs to include (default: all); such a
+      partial graph is always polled live and not kept
+    - cached: "1" to return the warm graph however old it is, or the last
+      snapshot (without tooltips) if there is none, instead of rebuilding
+    - refresh: comma-separated device PKs to poll even if their last poll is
+      younger than TOPOLOGY_POLL_TTL, or "all" (default: only stale devices)
     """
     use_cached = request.GET.get("cached") == "1"
 
     if use_cached:
-        snapshot = TopologySnapshot.objects.first()
-        if snapshot:
-            return JsonResponse(snapshot.topology_json)
+        warm = current()
+        if warm:
+            return _graph_response(request, warm)
+        graph = graph_at(timezone.now())
+        if graph:
+            return JsonResponse(graph)
         # Fall through to live poll if no cache
 
     device_param = request.GET.get("device", "")
@@ -44,21 +60,82 @@ def topology_data(request):
         except ValueError:
             pass
 
+    refresh_param = request.GET.get("refresh", "")
+    refresh = None
+    if refresh_param == "all":
+        refresh = True
+    elif refresh_param:
+        try:
+            refresh = [int(pk) for pk in refresh_param.split(",") if pk.strip()]
+        except ValueError:
+            pass
+
     try:
-        graph = build_topology(device_ids=device_ids)
+        if device_ids:
+            return JsonResponse(build_topology(device_ids=device_ids, refresh=refresh))
+        warm = None
+        if refresh is None:
+            warm = current(max_age=getattr(settings, "TOPOLOGY_POLL_TTL", 300))
+        if warm is None:
+            # Saves the snapshot (as a delta) and drops history past retention
+            warm = rebuild(refresh=refresh)
+        return _graph_response(request, warm)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
 
-        # Save snapshot
-        TopologySnapshot.objects.create(
-            topology_json=graph,
-            device_count=graph["stats"]["device_count"],
-            tunnel_count=graph["stats"]["total_ldp_sessions"],
-        )
 
-        # Keep only last 10 snapshots
-        old_snapshots = TopologySnapshot.objects.all()[10:]
-        for s in old_snapshots:
-            s.delete()
+def _graph_response(request, warm):
+    """The warm graph's body, or 304 if the client already has it.
 
-        return JsonResponse(graph)
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+    The ETag is weak: it leaves out the polled/cached device counts.
+    """
+    etag = f'W/"{warm.etag}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(warm.body, content_type="application/json")
+    response["ETag"] = etag
+    # Revalidated on every request: open tabs get 304s until the graph changes.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def topology_history(request):
+    """The topology graph as it was at ``?at=<ISO time>`` (default: now),
+    rebuilt from the stored snapshots."""
+    when = _parse_time(request.GET.get("at"))
+    if when is None:
+        return JsonResponse({"error": "at must be an ISO 8601 date/time"}, status=400)
+    graph = graph_at(when)
+    if graph is None:
+        return JsonResponse({"error": "No topology snapshot at or before that time"}, status=404)
+    return JsonResponse(graph)
+
+
+@login_required
+def topology_changes(request):
+    """Nodes and edges added, removed and changed between ``?from=`` and
+    ``?to=`` (ISO times; ``to`` defaults to now)."""
+    start = _parse_time(request.GET.get("from", ""))
+    end = _parse_time(request.GET.get("to"))
+    if start is None or end is None:
+        return JsonResponse({"error": "from and to must be ISO 8601 dates/times"}, status=400)
+    return JsonResponse(changes_between(start, end))
+
+
+def _parse_time(value):
+    """An aware datetime from an ISO string (None = now); None if unparseable."""
+    if value is None:
+        return timezone.now()
+    value = value.strip()
+    try:
+        when = parse_datetime(value)
+        if when is None and " " in value:
+            # An unencoded "+hh:mm" offset arrives as " hh:mm".
+            head, _, offset = value.rpartition(" ")
+            when = parse_datetime(f"{head}+{offset}")
+    except ValueError:
+        return None
+    if when is not None and timezone.is_naive(when):
+        when = timezone.make_aware(when)
+    return when
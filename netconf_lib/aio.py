@@ -0,0 +1,274 @@
+import asyncio
+import collections
+import itertools
+from contextlib import asynccontextmanager
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+from .parsing import parse_xml
+from .planner import DATASETS, _dispatch, _error_result, plan
+
+NS_BASE = "urn:ietf:params:xml:ns:netconf:base:1.0"
+BASE_10 = "urn:ietf:params:netconf:base:1.0"
+BASE_11 = "urn:ietf:params:netconf:base:1.1"
+NS_NOTIFICATION = "urn:ietf:params:xml:ns:netconf:notification:1.0"
+NOTIFICATION_10 = "urn:ietf:params:netconf:capability:notification:1.0"
+EOM = b"]]>]]>"
+
+CLIENT_HELLO = (
+    f'<?xml version="1.0" encoding="UTF-8"?>'
+    f'<hello xmlns="{NS_BASE}"><capabilities>'
+    f"<capability>{BASE_10}</capability>"
+    f"<capability>{BASE_11}</capability>"
+    f"</capabilities></hello>"
+)
+
+
+class AsyncRPCError(Exception):
+    """The device answered an RPC with <rpc-error>."""
+
+
+def frame(message, chunked):
+    """Encode one NETCONF message for the wire (RFC 6242)."""
+    data = message.encode() if isinstance(message, str) else message
+    if chunked:
+        return b"\n#%d\n%s\n##\n" % (len(data), data)
+    return data + EOM
+
+
+async def read_message(reader, chunked):
+    """Read one NETCONF message; returns None on a clean EOF."""
+    try:
+        if not chunked:
+            data = await reader.readuntil(EOM)
+            return data[:-len(EOM)]
+        parts = []
+        while True:
+            marker = await reader.readuntil(b"#")
+            if marker.strip(b"\n") != b"#":
+                raise ConnectionError(f"Bad NETCONF chunk header: {marker[:40]!r}")
+            size_line = await reader.readuntil(b"\n")
+            if size_line == b"#\n":
+                return b"".join(parts)
+            parts.append(await reader.readexactly(int(size_line)))
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise ConnectionError("NETCONF session closed mid-message") from e
+
+
+def _capabilities(hello):
+    root = ElementTree.fromstring(hello)
+    return {(c.text or "").strip() for c in root.iter(f"{{{NS_BASE}}}capability")}
+
+
+class AsyncNetconfSession:
+    """A NETCONF-over-SSH session driven by asyncio (asyncssh).
+
+    Only the operations netconf_lib needs are implemented: get, get-config,
+    create-subscription and close-session. RPCs on one session are
+    serialized; open more sessions for concurrency. Notifications that
+    arrive while waiting for a reply are kept for notifications().
+    """
+
+    def __init__(self, conn, process, timeout):
+        self._conn = conn
+        self._process = process
+        self._timeout = timeout
+        self._chunked = False
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._notifications = collections.deque()
+        self.server_capabilities = set()
+
+    @classmethod
+    async def connect(cls, host, port, username, password, timeout=30):
+        import asyncssh
+
+        conn = await asyncio.wait_for(
+            asyncssh.connect(
+                host, port=port, username=username, password=password,
+                known_hosts=None, client_keys=None, agent_path=None,
+            ),
+            timeout,
+        )
+        try:
+            process = await conn.create_process(subsystem="netconf", encoding=None)
+            session = cls(conn, process, timeout)
+            await asyncio.wait_for(session._hello(), timeout)
+        except BaseException:
+            conn.close()
+            raise
+        return session
+
+    async def _hello(self):
+        self._process.stdin.write(frame(CLIENT_HELLO, chunked=False))
+        hello = await read_message(self._process.stdout, chunked=False)
+        if hello is None:
+            raise ConnectionError("NETCONF server closed the session before <hello>")
+        self.server_capabilities = _capabilities(hello)
+        self._chunked = BASE_11 in self.server_capabilities
+
+    async def rpc(self, body):
+        """Send one <rpc> and return the parsed <rpc-reply> element."""
+        async with self._lock:
+            message_id = str(next(self._ids))
+            message = f'<rpc message-id="{message_id}" xmlns="{NS_BASE}">{body}</rpc>'
+            self._process.stdin.write(frame(message, self._chunked))
+            while True:
+                raw = await asyncio.wait_for(
+                    read_message(self._process.stdout, self._chunked), self._timeout,
+                )
+                if raw is None:
+                    raise ConnectionError("NETCONF session closed while waiting for a reply")
+                reply = parse_xml(raw)
+                if reply.tag != f"{{{NS_NOTIFICATION}}}notification":
+                    break
+                self._notifications.append(reply)
+        error = reply.find(f"{{{NS_BASE}}}rpc-error")
+        if error is not None:
+            message = error.findtext(f"{{{NS_BASE}}}error-message") or "rpc-error"
+            raise AsyncRPCError(message.strip())
+        return reply
+
+    async def get(self, filter_xml):
+        reply = await self.rpc(f'<get><filter type="subtree">{filter_xml}</filter></get>')
+        return reply.find(f"{{{NS_BASE}}}data")
+
+    async def get_config(self, source, filter_xml):
+        reply = await self.rpc(
+            f"<get-config><source><{escape(source)}/></source>"
+            f'<filter type="subtree">{filter_xml}</filter></get-config>'
+        )
+        return reply.find(f"{{{NS_BASE}}}data")
+
+    @property
+    def supports_notifications(self):
+        return NOTIFICATION_10 in self.server_capabilities
+
+    async def create_subscription(self, stream=None, filter_xml=None):
+        """Start receiving event notifications on this session (RFC 5277).
+
+        After this the session should only be read with notifications().
+        """
+        body = "".join((
+            f'<create-subscription xmlns="{NS_NOTIFICATION}">',
+            f"<stream>{escape(stream)}</stream>" if stream else "",
+            f'<filter type="subtree">{filter_xml}</filter>' if filter_xml else "",
+            "</create-subscription>",
+        ))
+        await self.rpc(body)
+
+    async def notifications(self):
+        """Yield each <notification> element as it arrives; stops when the
+        device closes the session. Waits without a timeout."""
+        while True:
+            while self._notifications:
+                yield self._notifications.popleft()
+            raw = await read_message(self._process.stdout, self._chunked)
+            if raw is None:
+                return
+            message = parse_xml(raw)
+            if message.tag == f"{{{NS_NOTIFICATION}}}notification":
+                yield message
+
+    async def close(self):
+        try:
+            await asyncio.wait_for(self.rpc("<close-session/>"), 5)
+        except Exception:
+            pass
+        finally:
+            self._conn.close()
+
+
+@asynccontextmanager
+async def async_netconf_connect(device):
+    """Async counterpart of connection.netconf_connect (one session per block).
+
+    Honours the device's circuit breaker the same way the sync path does.
+    """
+    from asgiref.sync import sync_to_async
+
+    breaker = hasattr(device, "check_circuit")
+    if breaker:
+        await sync_to_async(device.check_circuit)()
+    try:
+        session = await AsyncNetconfSession.connect(
+            device.hostname, device.port, device.username, device.get_password(),
+            timeout=getattr(settings, "NETCONF_TIMEOUT", 30),
+        )
+    except Exception as e:
+        if breaker:
+            await sync_to_async(device.record_connect_failure)(e)
+        raise
+    if breaker:
+        await sync_to_async(device.record_connect_success)()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def async_fetch_datasets(device, names):
+    """Async counterpart of planner.fetch_datasets with identical results."""
+    try:
+        async with async_netconf_connect(device) as session:
+            results = {}
+            for source, filter_xml, members in plan(names):
+                try:
+                    if source == "running":
+                        data = await session.get_config("running", filter_xml)
+                    else:
+                        data = await session.get(filter_xml)
+                except AsyncRPCError:
+                    for name in members:
+                        results[name] = await _async_fetch_one(session, name)
+                    continue
+                if data is None:
+                    data = ElementTree.Element("data")
+                results.update(_dispatch(data, members))
+            return results
+    except Exception as e:
+        return {name: _error_result(name, str(e) or type(e).__name__) for name in dict.fromkeys(names)}
+
+
+async def _async_fetch_one(session, name):
+    dataset = DATASETS[name]
+    try:
+        if dataset.source == "running":
+            data = await session.get_config("running", dataset.filter_xml)
+        else:
+            data = await session.get(dataset.filter_xml)
+    except AsyncRPCError as e:
+        return _error_result(name, str(e))
+    return dataset.parser(data if data is not None else ElementTree.Element("data"))
+
+
+async def gather_bounded(func, items, limit=200):
+    """Run ``await func(item)`` for every item with at most ``limit`` in flight.
+
+    Results come back in the order of ``items``.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+def fetch_fleet(devices, names, limit=200):
+    """Fetch ``names`` from every device concurrently from synchronous code.
+
+    Returns {device.pk: {name: parsed result}}.
+    """
+    devices = list(devices)
+
+    async def fetch(device):
+        return await async_fetch_datasets(device, names)
+
+    results = asyncio.run(gather_bounded(fetch, devices, limit=limit))
+    return {device.pk: result for device, result in zip(devices, results)}
@@ -0,0 +1,111 @@
+NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
+
+# Synthetic SR OS replies for the parser benchmarks. Each generator returns the
+# <data> XML string a `mgr.get(...).data_xml` would hold for the matching filter.
+
+
+def _wrap(body):
+    return f'<data><state xmlns="{NS_STATE}">{body}</state></data>'
+
+
+def _router(body):
+    return _wrap(f"<router><router-name>Base</router-name>{body}</router>")
+
+
+def _ipv4(n, base=1):
+    n += base << 24
+    return f"{n >> 24 & 255}.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+def _mac(n):
+    return ":".join(f"{b:02x}" for b in (0x02, 0, n >> 24 & 255, n >> 16 & 255, n >> 8 & 255, n & 255))
+
+
+def route_table_xml(routes=100000):
+    """A BGP-heavy Base IPv4 table: /24s spread over the unicast space."""
+    parts = []
+    for n in range(routes):
+        prefix = f"{_ipv4(n << 8)}/24" if n % 10 else f"{_ipv4(n)}/32"
+        parts.append(
+            f"<route><ip-prefix>{prefix}</ip-prefix>"
+            f"<next-hop><ip-address>{_ipv4(n % 16, base=10)}</ip-address></next-hop>"
+            f"<route-type>{'bgp' if n % 10 else 'isis'}</route-type>"
+            f"<preference>{170 if n % 10 else 18}</preference><metric>{n % 1000}</metric>"
+            f"<active>{'true' if n % 50 else 'false'}</active></route>"
+        )
+    return _router(f"<route-table><unicast><ipv4>{''.join(parts)}</ipv4></unicast></route-table>")
+
+
+def fdb_xml(macs=200000, services=1):
+    """``macs`` learned MACs spread evenly over ``services`` VPLS instances."""
+    per_service = -(-macs // services)
+    parts = []
+    for s in range(services):
+        parts.append(f"<vpls><service-name>vpls-{1000 + s}</service-name><service-id>{1000 + s}</service-id><fdb>")
+        for n in range(s * per_service, min(macs, (s + 1) * per_service)):
+            parts.append(
+                f"<mac><address>{_mac(n)}</address><sap>1/{n % 10 + 1}/{n % 36 + 1}:{100 + s}</sap>"
+                f"<type>learned</type><age>{n % 300}</age></mac>"
+            )
+        parts.append("</fdb></vpls>")
+    return _wrap(f"<service>{''.join(parts)}</service>")
+
+
+def port_stats_xml(ports=1000):
+    parts = []
+    for n in range(ports):
+        parts.append(
+            f"<port><port-id>{n // 360 + 1}/{n // 36 % 10 + 1}/{n % 36 + 1}</port-id>"
+            f"<description>port {n}</description><admin-state>enable</admin-state>"
+            f"<oper-state>{'up' if n % 10 else 'down'}</oper-state>"
+            f"<ethernet><speed>10000</speed></ethernet><statistics>"
+            f"<in-octets>{n * 987654321}</in-octets><out-octets>{n * 123456789}</out-octets>"
+            f"<in-packets>{n * 654321}</in-packets><out-packets>{n * 123456}</out-packets>"
+            f"<in-errors>{n % 7}</in-errors><out-errors>0</out-errors>"
+            f"<in-discards>{n % 3}</in-discards><out-discards>0</out-discards>"
+            f"</statistics></port>"
+        )
+    return _wrap("".join(parts))
+
+
+def ldp_bindings_xml(bindings=20000):
+    parts = []
+    for n in range(bindings):
+        peer = _ipv4(n % 64, base=10)
+        parts.append(
+            f"<active><fec-prefix>{_ipv4(n, base=10)}/32</fec-prefix>"
+            f"<ingress-label>{131072 + n}</ingress-label><egress-label>{262144 + n}</egress-label>"
+            f"<next-hop>{peer}</next-hop><peer>{peer}</peer></active>"
+        )
+    return _router(f"<ldp><bindings>{''.join(parts)}</bindings></ldp>")
+
+
+def mpls_lsps_xml(lsps=2000, hops=6):
+    parts = []
+    for n in range(lsps):
+        path = "".join(
+            f"<hop><hop-index>{h + 1}</hop-index><address>{_ipv4(n * hops + h, base=10)}</address></hop>"
+            for h in range(hops)
+        )
+        parts.append(
+            f"<lsp><lsp-name>lsp-{n}</lsp-name><from>10.0.0.1</from><to>{_ipv4(n, base=10)}</to>"
+            f"<admin-state>enable</admin-state><oper-state>up</oper-state><metric>{n % 100}</metric>"
+            f"<path><path-name>primary</path-name>{path}</path>"
+            f"<statistics><forwarded-packets>{n * 1000}</forwarded-packets>"
+            f"<forwarded-octets>{n * 1500000}</forwarded-octets></statistics></lsp>"
+        )
+    return _router(f"<mpls>{''.join(parts)}</mpls>")
+
+
+def log_entries_xml(events=10000):
+    severities = ("critical", "major", "minor", "warning", "info", "info", "info", "info")
+    parts = []
+    for n in range(events):
+        parts.append(
+            f"<event><sequence-number>{n + 1}</sequence-number>"
+            f"<timestamp>2024/01/01 00:{n // 60 % 60:02d}:{n % 60:02d}</timestamp>"
+            f"<severity>{severities[n % 8]}</severity><application>PORT</application>"
+            f"<event-id>{2000 + n % 50}</event-id><subject>1/1/{n % 36 + 1}</subject>"
+            f"<message>Interface 1/1/{n % 36 + 1} is not operational (event {n + 1})</message></event>"
+        )
+    return _wrap(f"<log><log-id><name>90</name>{''.join(parts)}</log-id></log>")
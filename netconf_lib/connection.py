@@ -1,21 +1,301 @@
+import atexit
+import os
+import threading
+import time
 from contextlib import contextmanager
 
+from django.conf import settings
 from ncclient import manager
+from ncclient.operations.rpc import RPCError
+
+NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
+
+# Cheapest state read we can issue to prove a session is still alive.
+KEEPALIVE_FILTER = f"""
+<state xmlns="{NS_STATE}">
+  <system>
+    <up-time/>
+  </system>
+</state>
+"""
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled session becomes available in time."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of connecting to a device whose circuit breaker is open."""
+
+
+def _open_session(device, check_circuit=True):
+    """Open a brand new NETCONF session (SSH handshake + hello exchange).
+
+    Goes through the device's circuit breaker when it has one: after
+    NETCONF_BREAKER_THRESHOLD consecutive connect failures calls fail fast
+    with CircuitOpenError until the backoff expires and a probe succeeds.
+    """
+    breaker = hasattr(device, "check_circuit")
+    if breaker and check_circuit:
+        device.check_circuit()
+    try:
+        conn = manager.connect(
+            host=device.hostname,
+            port=device.port,
+            username=device.username,
+            password=device.get_password(),
+            hostkey_verify=False,
+            device_params={"name": "alu"},
+            timeout=getattr(settings, "NETCONF_TIMEOUT", 30),
+        )
+    except Exception as e:
+        if breaker:
+            device.record_connect_failure(e)
+        raise
+    if breaker:
+        device.record_connect_success()
+    return conn
+
+
+def _close_quietly(conn):
+    try:
+        if conn.connected:
+            conn.close_session()
+    except Exception:
+        pass
+
+
+class _PooledSession:
+    def __init__(self, key, conn):
+        self.key = key
+        self.conn = conn
+        self.last_used = time.monotonic()
+        self.last_keepalive = self.last_used
+
+
+class SessionPool:
+    """Keeps warm NETCONF sessions per device.
+
+    Sessions are checked out for the duration of a ``netconf_connect`` block and
+    returned afterwards. A background reaper closes sessions that have been idle
+    longer than ``idle_timeout`` and sends a keepalive RPC on the remaining ones
+    every ``keepalive_interval`` seconds. At most ``max_per_device`` sessions are
+    open to a single device; extra callers wait up to ``checkout_timeout``.
+    """
+
+    def __init__(self, max_per_device=4, idle_timeout=300, keepalive_interval=60,
+                 checkout_timeout=30):
+        self.max_per_device = max_per_device
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.checkout_timeout = checkout_timeout
+        self._cond = threading.Condition()
+        self._idle = {}     # key -> [_PooledSession], most recently used last
+        self._in_use = {}   # key -> number of checked-out (or opening) sessions
+        self._pid = os.getpid()
+        self._reaper = None
+
+    @staticmethod
+    def _key(device):
+        # Credentials are part of the key so an edited device never reuses a
+        # session opened with the old username/password.
+        return (
+            device.pk, device.hostname, device.port, device.username,
+            bytes(device.encrypted_password or b""),
+        )
+
+    def _check_fork(self):
+        # Sessions inherited from a parent process (gunicorn preload) share its
+        # sockets; forget them instead of closing them under the parent's feet.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle = {}
+            self._in_use = {}
+            self._reaper = None
+
+    def _ensure_reaper(self):
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(
+                target=self._reap_forever, name="netconf-pool-reaper", daemon=True,
+            )
+            self._reaper.start()
+
+    def checkout(self, device, check_circuit=True):
+        key = self._key(device)
+        deadline = time.monotonic() + self.checkout_timeout
+        dead = []
+        try:
+            with self._cond:
+                self._check_fork()
+                self._ensure_reaper()
+                while True:
+                    idle = self._idle.get(key)
+                    while idle:
+                        session = idle.pop()
+                        if session.conn.connected:
+                            self._in_use[key] = self._in_use.get(key, 0) + 1
+                            return session
+                        dead.append(session)
+                    if self._in_use.get(key, 0) < self.max_per_device:
+                        # Reserve the slot now, connect outside the lock.
+                        self._in_use[key] = self._in_use.get(key, 0) + 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"No NETCONF session to {device.hostname} available "
+                            f"after {self.checkout_timeout}s "
+                            f"({self.max_per_device} already in use)"
+                        )
+                    self._cond.wait(remaining)
+        finally:
+            for session in dead:
+                _close_quietly(session.conn)
+
+        try:
+            conn = _open_session(device, check_circuit)
+        except BaseException:
+            self._release_slot(key)
+            raise
+        return _PooledSession(key, conn)
+
+    def checkin(self, session, broken=False, touch=True):
+        close = broken or not session.conn.connected
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._in_use[session.key] = max(self._in_use.get(session.key, 1) - 1, 0)
+            if not close:
+                if touch:
+                    session.last_used = session.last_keepalive = time.monotonic()
+                self._idle.setdefault(session.key, []).append(session)
+            self._cond.notify_all()
+        if close:
+            _close_quietly(session.conn)
+
+    def _release_slot(self, key):
+        with self._cond:
+            self._in_use[key] = max(self._in_use.get(key, 1) - 1, 0)
+            self._cond.notify_all()
+
+    def close_all(self):
+        with self._cond:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle = {}
+            self._cond.notify_all()
+        for session in sessions:
+            _close_quietly(session.conn)
+
+    def stats(self):
+        """Return {key: (idle, in_use)} for diagnostics."""
+        with self._cond:
+            keys = set(self._idle) | set(self._in_use)
+            return {
+                key[:4]: (len(self._idle.get(key, [])), self._in_use.get(key, 0))
+                for key in keys
+            }
+
+    def _reap_forever(self):
+        tick = max(min(self.keepalive_interval, self.idle_timeout) / 4, 1)
+        while True:
+            time.sleep(tick)
+            try:
+                self._reap_once()
+            except Exception:
+                pass
+
+    def _reap_once(self):
+        now = time.monotonic()
+        expired = []
+        due = []
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            for key, idle in list(self._idle.items()):
+                keep = []
+                for session in idle:
+                    if not session.conn.connected or now - session.last_used > self.idle_timeout:
+                        expired.append(session)
+                    elif now - session.last_keepalive > self.keepalive_interval:
+                        # Hold the session as in-use while the keepalive runs.
+                        self._in_use[key] = self._in_use.get(key, 0) + 1
+                        due.append(session)
+                    else:
+                        keep.append(session)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+            if expired:
+                self._cond.notify_all()
+
+        for session in expired:
+            _close_quietly(session.conn)
+
+        for session in due:
+            alive = True
+            try:
+                session.conn.get(filter=("subtree", KEEPALIVE_FILTER))
+            except RPCError:
+                pass  # The device answered, so the transport is fine.
+            except Exception:
+                alive = False
+            session.last_keepalive = time.monotonic()
+            # A keepalive is not real use; don't let it extend the idle timer.
+            self.checkin(session, broken=not alive, touch=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide session pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SessionPool(
+                    max_per_device=getattr(settings, "NETCONF_POOL_MAX_PER_DEVICE", 4),
+                    idle_timeout=getattr(settings, "NETCONF_POOL_IDLE_TIMEOUT", 300),
+                    keepalive_interval=getattr(settings, "NETCONF_POOL_KEEPALIVE_INTERVAL", 60),
+                    checkout_timeout=getattr(settings, "NETCONF_TIMEOUT", 30),
+                )
+                atexit.register(_pool.close_all)
+    return _pool
 
 
 @contextmanager
-def netconf_connect(device):
-    """Context manager for NETCONF sessions to Nokia SR OS devices."""
-    conn = manager.connect(
-        host=device.hostname,
-        port=device.port,
-        username=device.username,
-        password=device.get_password(),
-        hostkey_verify=False,
-        device_params={"name": "alu"},
-        timeout=30,
-    )
+def netconf_connect(device, check_circuit=True):
+    """Context manager for NETCONF sessions to Nokia SR OS devices.
+
+    Sessions come from a per-device pool and are handed back on exit, so
+    back-to-back calls against the same router skip the SSH handshake and
+    NETCONF hello. A session is dropped instead of returned if the block raised
+    anything other than an ``RPCError`` (the device answered, so the transport
+    is still good). Set ``NETCONF_POOL_ENABLED = False`` to get one session per
+    call again.
+
+    Pass ``check_circuit=False`` to connect even if the device's circuit
+    breaker is open (e.g. an operator-initiated connectivity test).
+    """
+    if not getattr(settings, "NETCONF_POOL_ENABLED", True):
+        conn = _open_session(device, check_circuit)
+        try:
+            yield conn
+        finally:
+            conn.close_session()
+        return
+
+    pool = get_pool()
+    session = pool.checkout(device, check_circuit)
+    broken = False
     try:
-        yield conn
+        yield session.conn
+    except RPCError:
+        raise
+    except BaseException:
+        broken = True
+        raise
     finally:
-        conn.close_session()
+        pool.checkin(session, broken=broken)
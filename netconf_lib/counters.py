@@ -0,0 +1,190 @@
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:  # optional; the array('Q') path gives the same numbers
+    numpy = None
+
+COUNTERS = (
+    "in_octets", "out_octets", "in_packets", "out_packets",
+    "in_errors", "out_errors", "in_discards", "out_discards",
+)
+
+# SR OS port counters are 64-bit. A delta this large cannot be traffic, so the
+# counter was cleared (or the card rebooted) and the current value is the delta.
+_WRAP = 1 << 64
+_RESET = 1 << 63
+
+
+class PortCounterSnapshot:
+    """Cumulative counters of every port on one device at one moment.
+
+    Each counter is a column (``numpy.uint64`` array when numpy is
+    installed, ``array('Q')`` otherwise) in ``port_ids`` order, with
+    ``index`` mapping a port id to its row. ``speeds`` holds the port speed
+    in Mbit/s (0 when unknown). Snapshots pickle, so the previous one can
+    sit in the Django cache between polls, and round-trip through
+    to_json()/from_json() for storage in the database.
+    """
+
+    def __init__(self, port_ids, columns, speeds, taken_at):
+        self.port_ids = port_ids
+        self.index = {port_id: i for i, port_id in enumerate(port_ids)}
+        self.columns = columns
+        self.speeds = speeds
+        self.taken_at = taken_at
+
+    @classmethod
+    def from_ports(cls, ports, taken_at=None):
+        """Build a snapshot from get_port_utilization()'s ``ports`` rows."""
+        port_ids = [port.port_id for port in ports]
+        columns = {name: _column([getattr(port, name) for port in ports]) for name in COUNTERS}
+        speeds = _column([_speed(port.speed) for port in ports])
+        return cls(port_ids, columns, speeds, time.time() if taken_at is None else taken_at)
+
+    @classmethod
+    def from_json(cls, data):
+        """Rebuild a snapshot from to_json()'s data."""
+        return cls(
+            list(data["port_ids"]), {name: _column(data[name]) for name in COUNTERS},
+            _column(data["speeds"]), data["taken_at"],
+        )
+
+    def to_json(self):
+        """``{"taken_at", "port_ids", "speeds", "<counter>": [...]}`` with plain ints."""
+        data = {"taken_at": self.taken_at, "port_ids": self.port_ids, "speeds": _tolist(self.speeds)}
+        data.update((name, _tolist(self.columns[name])) for name in COUNTERS)
+        return data
+
+    def __len__(self):
+        return len(self.port_ids)
+
+    def aligned(self, port_ids):
+        """Reorder this snapshot's columns to ``port_ids``.
+
+        Returns ``(columns, known)``; ports this snapshot does not have get a
+        zero and ``known[i]`` False.
+        """
+        if port_ids == self.port_ids:
+            return self.columns, None
+        rows = [self.index.get(port_id) for port_id in port_ids]
+        known = [row is not None for row in rows]
+        rows = [0 if row is None else row for row in rows]
+        if numpy is not None:
+            take = numpy.array(rows, dtype=numpy.intp)
+            columns = {name: column[take] if len(column) else _column([0] * len(rows))
+                       for name, column in self.columns.items()}
+        else:
+            columns = {name: _column([column[row] if len(column) else 0 for row in rows])
+                       for name, column in self.columns.items()}
+        return columns, known
+
+    def deltas(self, previous):
+        """Counter increments since ``previous`` for every port in this snapshot.
+
+        Returns ``{"elapsed": seconds, "port_ids": [...], "unknown": {port ids
+        missing from previous}, "<counter>": column}``. Increments are taken
+        modulo 2**64. One of 2**63 or more means the counter went backwards
+        (by up to 2**63): it was reset, and the current value is the delta. A
+        bigger backward move wraps to a smaller increment and counts as a wrap
+        past 2**64. Returns None when ``previous`` is not older than this
+        snapshot.
+        """
+        elapsed = self.taken_at - previous.taken_at
+        if elapsed <= 0:
+            return None
+        before, known = previous.aligned(self.port_ids)
+        result = {"elapsed": elapsed, "port_ids": self.port_ids}
+        for name in COUNTERS:
+            result[name] = _delta(self.columns[name], before[name])
+        result["unknown"] = set() if known is None else {
+            port_id for port_id, seen in zip(self.port_ids, known) if not seen
+        }
+        return result
+
+    def rates(self, previous):
+        """Per-second rates since ``previous`` (see deltas()).
+
+        Returns ``{"elapsed", "port_ids", "unknown", "<counter>_ps": column,
+        "in_bps"/"out_bps": column, "in_util"/"out_util": column of % of
+        speed}``; utilization is ``nan`` where the port speed is unknown.
+        Returns None when ``previous`` is not older than this snapshot.
+        """
+        deltas = self.deltas(previous)
+        if deltas is None:
+            return None
+        elapsed = deltas["elapsed"]
+        result = {name: deltas[name] for name in ("elapsed", "port_ids", "unknown")}
+        for name in COUNTERS:
+            result[f"{name}_ps"] = _scale(deltas[name], 1 / elapsed)
+        result["in_bps"] = _scale(deltas["in_octets"], 8 / elapsed)
+        result["out_bps"] = _scale(deltas["out_octets"], 8 / elapsed)
+        result["in_util"] = _utilization(result["in_bps"], self.speeds)
+        result["out_util"] = _utilization(result["out_bps"], self.speeds)
+        return result
+
+
+def rate_rows(rates, digits=2):
+    """``{port_id: {"in_bps": ..., ...}}`` from rates(), rounded, for templates/JSON.
+
+    Ports without a previous sample map to None values.
+    """
+    names = [name for name in rates if name not in ("elapsed", "port_ids", "unknown")]
+    columns = [_tolist(rates[name]) for name in names]
+    rows = {}
+    for i, port_id in enumerate(rates["port_ids"]):
+        if port_id in rates["unknown"]:
+            rows[port_id] = dict.fromkeys(names)
+            continue
+        rows[port_id] = {
+            name: None if column[i] != column[i] else round(column[i], digits)
+            for name, column in zip(names, columns)
+        }
+    return rows
+
+
+def _speed(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _column(values):
+    if numpy is not None:
+        return numpy.array(values, dtype=numpy.uint64)
+    return array("Q", values)
+
+
+def _tolist(column):
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+def _delta(current, previous):
+    if numpy is not None:
+        delta = current - previous  # uint64 arithmetic wraps modulo 2**64
+        return numpy.where(delta >= _RESET, current, delta)
+    deltas = array("Q")
+    for now, before in zip(current, previous):
+        delta = (now - before) % _WRAP
+        deltas.append(now if delta >= _RESET else delta)
+    return deltas
+
+
+def _scale(column, factor):
+    if numpy is not None:
+        return column.astype(numpy.float64) * factor
+    return [value * factor for value in column]
+
+
+def _utilization(bps, speeds):
+    """Percent of port speed (Mbit/s); nan where the speed is unknown."""
+    if numpy is not None:
+        capacity = speeds.astype(numpy.float64) * 1e6
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return numpy.where(capacity > 0, bps * 100 / capacity, numpy.nan)
+    return [
+        value * 100 / (speed * 1e6) if speed else float("nan")
+        for value, speed in zip(bps, speeds)
+    ]
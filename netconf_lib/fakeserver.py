@@ -0,0 +1,183 @@
+import asyncio
+import threading
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from .aio import BASE_10, BASE_11, NS_BASE, frame, read_message
+
+NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
+
+# A small but complete answer to the topology snapshot filter.
+DEFAULT_DATA = f"""
+<state xmlns="{NS_STATE}">
+  <router>
+    <router-name>Base</router-name>
+    <interface>
+      <interface-name>system</interface-name>
+      <ipv4><primary><address>192.0.2.1</address></primary></ipv4>
+    </interface>
+    <ldp>
+      <session><peer-address>192.0.2.2</peer-address><session-state>operational</session-state></session>
+      <statistics><active-sessions>1</active-sessions></statistics>
+    </ldp>
+    <mpls>
+      <lsp><lsp-name>to-pe2</lsp-name><to>192.0.2.2</to><oper-state>up</oper-state></lsp>
+    </mpls>
+    <tunnel-table>
+      <tunnel><destination>192.0.2.2/32</destination><protocol>ldp</protocol></tunnel>
+    </tunnel-table>
+  </router>
+  <port>
+    <port-id>1/1/1</port-id>
+    <ethernet><lldp><remote-system><system-name>pe2</system-name></remote-system></lldp></ethernet>
+  </port>
+</state>
+"""
+
+
+class FakeNetconfServer:
+    """In-process NETCONF-over-SSH server for benchmarks.
+
+    Accepts any username/password, speaks base:1.0 and base:1.1 framing and
+    answers every <get>/<get-config> with ``data_xml`` after sleeping
+    ``latency`` seconds (to stand in for device processing time). Subclasses
+    override ``handle_rpc`` to answer differently.
+    """
+
+    capabilities = (BASE_10, BASE_11)
+
+    def __init__(self, data_xml=DEFAULT_DATA, latency=0.0):
+        self.data_xml = data_xml
+        self.latency = latency
+        self.sessions = 0
+        self.rpcs = 0
+        self._acceptors = []
+        self._loop = None
+        self._thread = None
+
+    def handle_rpc(self, operation, context):
+        """Return the inner XML of the <rpc-reply> for one operation element."""
+        op = operation.tag.split("}")[-1]
+        if op in ("get", "get-config"):
+            return f"<data>{self.data_xml}</data>"
+        return "<ok/>"
+
+    async def _serve_process(self, process):
+        self.sessions += 1
+        reader, writer = process.stdin, process.stdout
+        session_id = self.sessions
+        hello = (
+            f'<hello xmlns="{NS_BASE}"><capabilities>'
+            + "".join(f"<capability>{c}</capability>" for c in self.capabilities)
+            + f"</capabilities><session-id>{session_id}</session-id></hello>"
+        )
+        writer.write(frame(hello, chunked=False))
+        context = {
+            "session_id": session_id,
+            "process": process,
+            "port": process.get_extra_info("sockname")[1],
+        }
+        try:
+            client_hello = await read_message(reader, chunked=False)
+            if client_hello is None:
+                return
+            chunked = BASE_11 in client_hello.decode(errors="replace")
+            context["chunked"] = chunked
+            while True:
+                raw = await read_message(reader, chunked)
+                if raw is None:
+                    break
+                rpc = ElementTree.fromstring(raw)
+                message_id = rpc.get("message-id", "")
+                operation = rpc[0] if len(rpc) else ElementTree.Element("none")
+                self.rpcs += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                try:
+                    body = self.handle_rpc(operation, context)
+                except Exception as e:
+                    body = (
+                        "<rpc-error><error-type>application</error-type>"
+                        "<error-tag>operation-failed</error-tag><error-severity>error</error-severity>"
+                        f"<error-message>{escape(str(e))}</error-message></rpc-error>"
+                    )
+                writer.write(frame(
+                    f'<rpc-reply message-id="{message_id}" xmlns="{NS_BASE}">{body}</rpc-reply>',
+                    chunked,
+                ))
+                if operation.tag == f"{{{NS_BASE}}}close-session":
+                    break
+        except (ConnectionError, ElementTree.ParseError):
+            pass
+        finally:
+            process.exit(0)
+
+    async def start(self, host="127.0.0.1", ports=(0,)):
+        """Listen on every port in ``ports`` (0 = any free port); returns the bound ports."""
+        import asyncssh
+
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        bound = []
+        for port in ports:
+            acceptor = await asyncssh.create_server(
+                _server_factory, host, port,
+                server_host_keys=[host_key],
+                process_factory=self._serve_process,
+                encoding=None,
+            )
+            self._acceptors.append(acceptor)
+            bound.append(acceptor.sockets[0].getsockname()[1])
+        return bound
+
+    async def stop(self):
+        for acceptor in self._acceptors:
+            acceptor.close()
+            await acceptor.wait_closed()
+        self._acceptors = []
+
+    def start_in_thread(self, host="127.0.0.1", ports=(0,)):
+        """Run the server on a private event loop in a daemon thread."""
+        ready = threading.Event()
+        result = {}
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                result["ports"] = self._loop.run_until_complete(self.start(host, ports))
+            except Exception as e:
+                result["error"] = e
+            ready.set()
+            if "error" not in result:
+                self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-netconf-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if "error" in result:
+            raise result["error"]
+        return result["ports"]
+
+    def stop_thread(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def _server_factory():
+    import asyncssh
+
+    class AcceptAnyone(asyncssh.SSHServer):
+        def begin_auth(self, username):
+            return True
+
+        def password_auth_supported(self):
+            return True
+
+        def validate_password(self, username, password):
+            return True
+
+    return AcceptAnyone()
+
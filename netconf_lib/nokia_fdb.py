@@ -1,9 +1,8 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
-
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
-NS_CONF = "urn:nokia.com:sros:ns:yang:sr:conf"
+from .parsing import FieldMap, as_root, reply_data, shared, stream_elements
+from .records import FdbEntry
 
 
 def _get_all_vpls_service_ids(mgr):
@@ -16,15 +15,11 @@ def _get_all_vpls_service_ids(mgr):
     </configure>
     """
     result = mgr.get_config(source="running", filter=("subtree", filter_xml))
-    root = ElementTree.fromstring(result.data_xml)
-    service_ids = []
-    for vpls_el in root.iter(f"{{{NS_CONF}}}vpls"):
-        sid_el = vpls_el.find(f"{{{NS_CONF}}}service-name")
-        if sid_el is None:
-            sid_el = vpls_el.find(f"{{{NS_CONF}}}service-id")
-        if sid_el is not None and sid_el.text:
-            service_ids.append(sid_el.text)
-    return service_ids
+    return [
+        vpls["service_name"] or vpls["service_id"]
+        for vpls in VPLS_SERVICE.iter(as_root(reply_data(result)))
+        if vpls["service_name"] or vpls["service_id"]
+    ]
 
 
 def _get_fdb_for_service(mgr, service_name):
@@ -40,7 +35,28 @@ def _get_fdb_for_service(mgr, service_name):
     </state>
     """
     result = mgr.get(filter=("subtree", filter_xml))
-    return result.data_xml
+    return reply_data(result)
+
+
+FDB_MAC = FieldMap("mac", {
+    "address": "mac_address",
+    "sap": "sap",
+    "service-id": "service_id",
+    "type": ("type", shared),
+    "age": "age",
+}, record=FdbEntry)
+
+VPLS_SERVICE = FieldMap("vpls", {"service-name": "service_name", "service-id": "service_id"})
+
+FDB_ALL_FILTER = """
+    <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
+      <service>
+        <vpls>
+          <fdb/>
+        </vpls>
+      </service>
+    </state>
+    """
 
 
 def get_fdb_table(device, service_id=None):
@@ -59,17 +75,8 @@ def get_fdb_table(device, service_id=None):
 
             # No service_id: try broad query first (works on some SR OS versions)
             try:
-                filter_xml = """
-                <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
-                  <service>
-                    <vpls>
-                      <fdb/>
-                    </vpls>
-                  </service>
-                </state>
-                """
-                result = mgr.get(filter=("subtree", filter_xml))
-                parsed = _parse_fdb(result.data_xml)
+                result = mgr.get(filter=("subtree", FDB_ALL_FILTER))
+                parsed = _parse_fdb(reply_data(result))
                 if parsed["entries"]:
                     return parsed
             except Exception:
@@ -95,69 +102,84 @@ def get_fdb_table(device, service_id=None):
         return {"error": str(e), "entries": []}
 
 
+def iter_fdb_table(device, service_id=None):
+    """Stream FdbEntry records for ``device`` (one service or all of them).
+
+    Same discovery logic as get_fdb_table, but entries are yielded while each
+    reply is walked instead of being collected into a list, so a 100k-MAC
+    VPLS never exists as 100k dicts. The NETCONF session stays checked out
+    until the generator is exhausted or closed.
+    """
+    with netconf_connect(device) as mgr:
+        if service_id:
+            yield from iter_fdb(_get_fdb_for_service(mgr, str(service_id)), str(service_id))
+            return
+
+        found = False
+        try:
+            xml_data = reply_data(mgr.get(filter=("subtree", FDB_ALL_FILTER)))
+            for entry in iter_fdb(xml_data):
+                found = True
+                yield entry
+        except Exception:
+            if found:
+                raise
+        if found:
+            return
+
+        for sid in _get_all_vpls_service_ids(mgr):
+            try:
+                xml_data = _get_fdb_for_service(mgr, sid)
+            except Exception:
+                continue
+            yield from iter_fdb(xml_data, sid)
+
+
 def _parse_fdb(xml_data, default_service_id=None):
     """Parse FDB XML into structured data."""
     entries = []
     try:
-        root = ElementTree.fromstring(xml_data)
-
-        # Walk all VPLS elements to capture service context
-        for vpls_el in root.iter(f"{{{NS_STATE}}}vpls"):
-            # Try to get the service-name/service-id from the vpls parent
-            svc_id = default_service_id or ""
-            svc_name_el = vpls_el.find(f"{{{NS_STATE}}}service-name")
-            svc_id_el = vpls_el.find(f"{{{NS_STATE}}}service-id")
-            if svc_name_el is not None and svc_name_el.text:
-                svc_id = svc_name_el.text
-            elif svc_id_el is not None and svc_id_el.text:
-                svc_id = svc_id_el.text
-
-            for mac_entry in vpls_el.iter(f"{{{NS_STATE}}}mac"):
-                entry = {
-                    "mac_address": "",
-                    "sap": "",
-                    "service_id": svc_id,
-                    "type": "",
-                    "age": "",
-                }
-                for child in mac_entry:
-                    tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                    if tag == "address":
-                        entry["mac_address"] = child.text or ""
-                    elif tag == "sap":
-                        entry["sap"] = child.text or ""
-                    elif tag == "service-id":
-                        entry["service_id"] = child.text or ""
-                    elif tag == "type":
-                        entry["type"] = child.text or ""
-                    elif tag == "age":
-                        entry["age"] = child.text or ""
-                entries.append(entry)
-
-        # Fallback: if no vpls-scoped macs found, try flat mac iteration
-        if not entries:
-            for mac_entry in root.iter(f"{{{NS_STATE}}}mac"):
-                entry = {
-                    "mac_address": "",
-                    "sap": "",
-                    "service_id": default_service_id or "",
-                    "type": "",
-                    "age": "",
-                }
-                for child in mac_entry:
-                    tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                    if tag == "address":
-                        entry["mac_address"] = child.text or ""
-                    elif tag == "sap":
-                        entry["sap"] = child.text or ""
-                    elif tag == "service-id":
-                        entry["service_id"] = child.text or ""
-                    elif tag == "type":
-                        entry["type"] = child.text or ""
-                    elif tag == "age":
-                        entry["age"] = child.text or ""
-                entries.append(entry)
-
+        entries = list(iter_fdb(xml_data, default_service_id))
     except ElementTree.ParseError:
         pass
     return {"entries": entries}
+
+
+def iter_fdb(xml_data, default_service_id=None):
+    """Yield an FdbEntry for every <mac> in an FDB reply.
+
+    Reply strings are streamed (see parsing.stream_elements); each MAC takes
+    its service from the enclosing <vpls> (service-name, else service-id),
+    falling back to ``default_service_id``.
+    """
+    if isinstance(xml_data, (str, bytes)):
+        macs = stream_elements(xml_data, "mac", container="vpls")
+    else:
+        macs = _walk_macs(as_root(xml_data))
+
+    parse = FDB_MAC.parse
+    service_of = {}
+    for mac_entry, vpls_el in macs:
+        if vpls_el is None:
+            svc_id = default_service_id or ""
+        else:
+            svc_id = service_of.get(vpls_el)
+            if svc_id is None:
+                svc_id = service_of[vpls_el] = _vpls_service_id(vpls_el, default_service_id)
+        yield parse(mac_entry, service_id=svc_id)
+
+
+def _walk_macs(root):
+    vpls_found = False
+    for vpls_el in VPLS_SERVICE.elements(root):
+        vpls_found = True
+        for mac_entry in FDB_MAC.elements(vpls_el):
+            yield mac_entry, vpls_el
+    if not vpls_found:
+        for mac_entry in FDB_MAC.elements(root):
+            yield mac_entry, None
+
+
+def _vpls_service_id(vpls_el, default_service_id=None):
+    vpls = VPLS_SERVICE.parse(vpls_el)
+    return vpls["service_name"] or vpls["service_id"] or default_service_id or ""
@@ -1,7 +1,7 @@
 from difflib import SequenceMatcher
 
-from .nokia_interfaces import get_interface_descriptions
-from .nokia_lag import get_lag_config, get_lag_state
+from .nokia_interfaces import merge_port_info
+from .planner import fetch_datasets
 
 
 def build_interface_index(device):
@@ -11,13 +11,14 @@ def build_interface_index(device):
     Returns list of dicts with: id, type, description, admin_state, oper_state,
     speed, members (for LAGs), member_descriptions.
     """
-    # Fetch port data
-    ports = get_interface_descriptions(device)
+    # Port and LAG config/state in one session: one <get> plus one <get-config>
+    data = fetch_datasets(device, ["port_config", "ports", "lag_config", "lag_state"])
+
+    ports = merge_port_info(data["port_config"]["ports"], data["ports"]["interfaces"])
     port_map = {p["port_id"]: p for p in ports}
 
-    # Fetch LAG data
-    lag_config = get_lag_config(device).get("lags", [])
-    lag_state = get_lag_state(device).get("lags", [])
+    lag_config = data["lag_config"].get("lags", [])
+    lag_state = data["lag_state"].get("lags", [])
     lag_state_map = {l["lag_id"]: l for l in lag_state}
 
     index = []
@@ -1,55 +1,40 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
+from .parsing import FieldMap, ListOf, as_root, reply_data
 
-NS_CONF = "urn:nokia.com:sros:ns:yang:sr:conf"
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
 
-
-def get_interfaces(device):
-    """Fetch interface descriptions and operational status from state."""
-    filter_xml = """
+INTERFACES_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <port/>
     </state>
     """
+
+
+def get_interfaces(device):
+    """Fetch interface descriptions and operational status from state."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_interfaces(result.data_xml)
+            result = mgr.get(filter=("subtree", INTERFACES_FILTER))
+            return _parse_interfaces(reply_data(result))
     except Exception as e:
         return {"error": str(e), "interfaces": []}
 
 
+PORT = FieldMap("port", {
+    "port-id": "name",
+    "description": "description",
+    "admin-state": "admin_status",
+    "oper-state": "oper_status",
+    "ethernet/speed": "speed",
+})
+
+
 def _parse_interfaces(xml_data):
     """Parse interface XML into structured data."""
     interfaces = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for port in root.iter(f"{{{NS_STATE}}}port"):
-            iface = {
-                "name": "",
-                "description": "",
-                "admin_status": "",
-                "oper_status": "",
-                "speed": "",
-            }
-            for child in port:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "port-id":
-                    iface["name"] = child.text or ""
-                elif tag == "description":
-                    iface["description"] = child.text or ""
-                elif tag == "admin-state":
-                    iface["admin_status"] = child.text or ""
-                elif tag == "oper-state":
-                    iface["oper_status"] = child.text or ""
-                elif tag == "ethernet":
-                    for eth_child in child:
-                        eth_tag = eth_child.tag.split("}")[-1] if "}" in eth_child.tag else eth_child.tag
-                        if eth_tag == "speed":
-                            iface["speed"] = eth_child.text or ""
-            interfaces.append(iface)
+        interfaces = list(PORT.iter(as_root(xml_data)))
     except ElementTree.ParseError:
         pass
     return {"interfaces": interfaces}
@@ -63,7 +48,11 @@ def get_interface_descriptions(device):
     """
     config_ports = _get_port_config(device)
     state_ports = get_interfaces(device).get("interfaces", [])
+    return merge_port_info(config_ports, state_ports)
 
+
+def merge_port_info(config_ports, state_ports):
+    """Merge _parse_port_config and _parse_interfaces output per port."""
     # Build lookup: port_id -> config data
     config_map = {p["port_id"]: p for p in config_ports}
     state_map = {p["name"]: p for p in state_ports}
@@ -85,54 +74,41 @@ def get_interface_descriptions(device):
     return merged
 
 
-def _get_port_config(device):
-    """Fetch port configuration (descriptions, LAG membership)."""
-    filter_xml = """
+PORT_CONFIG_FILTER = """
     <configure xmlns="urn:nokia.com:sros:ns:yang:sr:conf">
       <port/>
     </configure>
     """
+
+
+def _get_port_config(device):
+    """Fetch port configuration (descriptions, LAG membership)."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get_config(source="running", filter=("subtree", filter_xml))
-            return _parse_port_config(result.data_xml)
+            result = mgr.get_config(source="running", filter=("subtree", PORT_CONFIG_FILTER))
+            return _parse_port_config(reply_data(result))
     except Exception:
         return []
 
 
+PORT_CONFIG = FieldMap("port", {
+    "port-id": "port_id",
+    "description": "description",
+    "admin-state": "admin_state",
+    "ethernet/lag": "lag_member_of",
+})
+
+
 def _parse_port_config(xml_data):
     ports = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for port in root.iter(f"{{{NS_CONF}}}port"):
-            entry = {
-                "port_id": "",
-                "description": "",
-                "admin_state": "",
-                "lag_member_of": "",
-            }
-            for child in port:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "port-id":
-                    entry["port_id"] = child.text or ""
-                elif tag == "description":
-                    entry["description"] = child.text or ""
-                elif tag == "admin-state":
-                    entry["admin_state"] = child.text or ""
-                elif tag == "ethernet":
-                    for ec in child:
-                        etag = ec.tag.split("}")[-1] if "}" in ec.tag else ec.tag
-                        if etag == "lag":
-                            entry["lag_member_of"] = ec.text or ""
-            ports.append(entry)
+        ports = list(PORT_CONFIG.iter(as_root(xml_data)))
     except ElementTree.ParseError:
         pass
     return ports
 
 
-def get_lldp_neighbors(device):
-    """Fetch LLDP neighbor info for topology discovery."""
-    filter_xml = """
+LLDP_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <port>
         <ethernet>
@@ -143,49 +119,37 @@ def get_lldp_neighbors(device):
       </port>
     </state>
     """
+
+
+def get_lldp_neighbors(device):
+    """Fetch LLDP neighbor info for topology discovery."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_lldp(result.data_xml)
+            result = mgr.get(filter=("subtree", LLDP_FILTER))
+            return _parse_lldp(reply_data(result))
     except Exception as e:
         return {"error": str(e), "neighbors": []}
 
 
+LLDP_REMOTE_SYSTEM = FieldMap("remote-system", {
+    "system-name": "remote_system_name",
+    "port-id": "remote_port_id",
+    "port-description": "remote_port_desc",
+    "system-description": "remote_system_desc",
+})
+
+LLDP_PORT = FieldMap("port", {
+    "port-id": "port_id",
+    "ethernet/lldp/remote-system": ("remote_systems", ListOf(LLDP_REMOTE_SYSTEM)),
+})
+
+
 def _parse_lldp(xml_data):
     neighbors = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        current_port = ""
-        for port in root.iter(f"{{{NS_STATE}}}port"):
-            for child in port:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "port-id":
-                    current_port = child.text or ""
-                elif tag == "ethernet":
-                    for ec in child:
-                        etag = ec.tag.split("}")[-1] if "}" in ec.tag else ec.tag
-                        if etag == "lldp":
-                            for lldp_child in ec:
-                                ltag = lldp_child.tag.split("}")[-1] if "}" in lldp_child.tag else lldp_child.tag
-                                if ltag == "remote-system":
-                                    neighbor = {
-                                        "local_port": current_port,
-                                        "remote_system_name": "",
-                                        "remote_port_id": "",
-                                        "remote_port_desc": "",
-                                        "remote_system_desc": "",
-                                    }
-                                    for rc in lldp_child:
-                                        rtag = rc.tag.split("}")[-1] if "}" in rc.tag else rc.tag
-                                        if rtag == "system-name":
-                                            neighbor["remote_system_name"] = rc.text or ""
-                                        elif rtag == "port-id":
-                                            neighbor["remote_port_id"] = rc.text or ""
-                                        elif rtag == "port-description":
-                                            neighbor["remote_port_desc"] = rc.text or ""
-                                        elif rtag == "system-description":
-                                            neighbor["remote_system_desc"] = rc.text or ""
-                                    neighbors.append(neighbor)
+        for port in LLDP_PORT.iter(as_root(xml_data)):
+            for remote in port["remote_systems"]:
+                neighbors.append({"local_port": port["port_id"], **remote})
     except ElementTree.ParseError:
         pass
     return {"neighbors": neighbors}
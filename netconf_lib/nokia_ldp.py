@@ -1,13 +1,11 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
+from .parsing import FieldMap, ListOf, as_root, integer, reply_data, shared
+from .records import LdpBinding
 
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
 
-
-def get_ldp_sessions(device):
-    """Fetch LDP session information from device."""
-    filter_xml = """
+LDP_SESSIONS_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <router>
         <router-name>Base</router-name>
@@ -18,70 +16,54 @@ def get_ldp_sessions(device):
       </router>
     </state>
     """
+
+
+def get_ldp_sessions(device):
+    """Fetch LDP session information from device."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_ldp_sessions(result.data_xml)
+            result = mgr.get(filter=("subtree", LDP_SESSIONS_FILTER))
+            return _parse_ldp_sessions(reply_data(result))
     except Exception as e:
         return {"error": str(e), "sessions": [], "statistics": {}}
 
 
+LDP_SESSION = FieldMap("session", {
+    "peer-address": "peer_address",
+    "local-address": "local_address",
+    "session-state": "state",
+    "adjacency-type": "adjacency_type",
+    "up-time": "uptime",
+    "statistics/sent-label-bindings": ("sent_labels", integer),
+    "statistics/received-label-bindings": ("received_labels", integer),
+})
+
+LDP_STATISTICS = FieldMap("statistics", {
+    "active-sessions": ("active_sessions", integer),
+    "active-targeted-sessions": ("active_targeted", integer),
+    "active-link-adjacencies": ("active_link_adj", integer),
+})
+
+LDP = FieldMap("ldp", {"statistics": ("statistics", ListOf(LDP_STATISTICS))})
+
+
 def _parse_ldp_sessions(xml_data):
     sessions = []
     statistics = {}
     try:
-        root = ElementTree.fromstring(xml_data)
-
-        for session in root.iter(f"{{{NS_STATE}}}session"):
-            entry = {
-                "peer_address": "",
-                "local_address": "",
-                "state": "",
-                "adjacency_type": "",
-                "uptime": "",
-                "sent_labels": 0,
-                "received_labels": 0,
-            }
-            for child in session:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "peer-address":
-                    entry["peer_address"] = child.text or ""
-                elif tag == "local-address":
-                    entry["local_address"] = child.text or ""
-                elif tag == "session-state":
-                    entry["state"] = child.text or ""
-                elif tag == "adjacency-type":
-                    entry["adjacency_type"] = child.text or ""
-                elif tag == "up-time":
-                    entry["uptime"] = child.text or ""
-                elif tag == "statistics":
-                    for stat in child:
-                        stat_tag = stat.tag.split("}")[-1] if "}" in stat.tag else stat.tag
-                        if stat_tag == "sent-label-bindings":
-                            entry["sent_labels"] = int(stat.text or 0)
-                        elif stat_tag == "received-label-bindings":
-                            entry["received_labels"] = int(stat.text or 0)
-            sessions.append(entry)
-
-        for stats_elem in root.iter(f"{{{NS_STATE}}}statistics"):
-            for child in stats_elem:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "active-sessions":
-                    statistics["active_sessions"] = int(child.text or 0)
-                elif tag == "active-targeted-sessions":
-                    statistics["active_targeted"] = int(child.text or 0)
-                elif tag == "active-link-adjacencies":
-                    statistics["active_link_adj"] = int(child.text or 0)
-            break  # Only the top-level statistics element
-
+        root = as_root(xml_data)
+        sessions = list(LDP_SESSION.iter(root))
+        # Only the instance-wide <ldp><statistics>, not the per-session ones.
+        for ldp in LDP.iter(root):
+            if ldp["statistics"]:
+                statistics = ldp["statistics"][0]
+                break
     except ElementTree.ParseError:
         pass
     return {"sessions": sessions, "statistics": statistics}
 
 
-def get_ldp_bindings(device):
-    """Fetch active LDP FEC-to-label bindings."""
-    filter_xml = """
+LDP_BINDINGS_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <router>
         <router-name>Base</router-name>
@@ -93,39 +75,31 @@ def get_ldp_bindings(device):
       </router>
     </state>
     """
+
+
+def get_ldp_bindings(device):
+    """Fetch active LDP FEC-to-label bindings."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_ldp_bindings(result.data_xml)
+            result = mgr.get(filter=("subtree", LDP_BINDINGS_FILTER))
+            return _parse_ldp_bindings(reply_data(result))
     except Exception as e:
         return {"error": str(e), "bindings": []}
 
 
+LDP_BINDING = FieldMap("active", {
+    "fec-prefix": "fec_prefix",
+    "ingress-label": "ingress_label",
+    "egress-label": "egress_label",
+    "next-hop": ("next_hop", shared),
+    "peer": ("peer", shared),
+}, record=LdpBinding)
+
+
 def _parse_ldp_bindings(xml_data):
     bindings = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for binding in root.iter(f"{{{NS_STATE}}}active"):
-            entry = {
-                "fec_prefix": "",
-                "ingress_label": "",
-                "egress_label": "",
-                "next_hop": "",
-                "peer": "",
-            }
-            for child in binding:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "fec-prefix":
-                    entry["fec_prefix"] = child.text or ""
-                elif tag == "ingress-label":
-                    entry["ingress_label"] = child.text or ""
-                elif tag == "egress-label":
-                    entry["egress_label"] = child.text or ""
-                elif tag == "next-hop":
-                    entry["next_hop"] = child.text or ""
-                elif tag == "peer":
-                    entry["peer"] = child.text or ""
-            bindings.append(entry)
+        bindings = list(LDP_BINDING.iter(as_root(xml_data)))
     except ElementTree.ParseError:
         pass
     return {"bindings": bindings}
@@ -1,6 +1,7 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
+from .parsing import FieldMap, as_root, integer, local_name, lowercase, reply_data
 
 NS = {"nokia": "urn:nokia.com:sros:ns:yang:sr:state"}
 
@@ -13,62 +14,158 @@ SEVERITY_WEIGHTS = {
 }
 
 
-def get_log_entries(device, log_id=90):
-    """Fetch log entries for a specific log ID from device via NETCONF."""
-    filter_xml = f"""
+# Above this many new events the whole log is fetched instead of the events by key.
+FULL_FETCH_THRESHOLD = 500
+
+
+def _log_filter(log_id, events=""):
+    return f"""
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <log>
         <log-id>
-          <name>{log_id}</name>
+          <name>{log_id}</name>{events}
         </log-id>
       </log>
     </state>
     """
+
+
+def get_log_entries(device, log_id=90):
+    """Fetch log entries for a specific log ID from device via NETCONF."""
+    try:
+        with netconf_connect(device) as mgr:
+            result = mgr.get(filter=("subtree", _log_filter(log_id)))
+            return _parse_log_entries(reply_data(result))
+    except Exception as e:
+        return {"error": str(e), "entries": []}
+
+
+def get_new_log_entries(device, log_id=90, after=0):
+    """Fetch only the events of a log newer than sequence number ``after``.
+
+    Asks for the sequence numbers in the log first, then for the new events
+    by key (or for the whole log when more than FULL_FETCH_THRESHOLD are
+    new). Returns ``{"entries", "first_sequence", "last_sequence", "reset",
+    "missed"}``: ``reset`` is True when the log was cleared or its numbering
+    restarted (wrap, reboot), in which case every event in it counts as new;
+    ``missed`` counts events that rolled out of the log before they were seen.
+    """
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_log_entries(result.data_xml)
+            result = mgr.get(filter=(
+                "subtree", _log_filter(log_id, "<event><sequence-number/></event>"),
+            ))
+            sequences = sorted(
+                event["sequence"] for event in LOG_SEQUENCE.iter(as_root(reply_data(result)))
+            )
+            update = _sequence_update(sequences, after)
+            new = [seq for seq in sequences if seq > update["after"]]
+            if len(new) > FULL_FETCH_THRESHOLD:
+                result = mgr.get(filter=("subtree", _log_filter(log_id)))
+            elif new:
+                keys = "".join(
+                    f"<event><sequence-number>{seq}</sequence-number></event>" for seq in new
+                )
+                result = mgr.get(filter=("subtree", _log_filter(log_id, keys)))
+            entries = []
+            if new:
+                entries = _parse_log_entries(reply_data(result), after=update["after"])["entries"]
+            del update["after"]
+            update["entries"] = entries
+            return update
     except Exception as e:
         return {"error": str(e), "entries": []}
 
 
-def _parse_log_entries(xml_data):
-    """Parse log XML into structured entries."""
+def _sequence_update(sequences, after):
+    """Work out where to resume given the sequence numbers now in the log."""
+    first = sequences[0] if sequences else 0
+    last = sequences[-1] if sequences else 0
+    # The last event we saw should still be there unless it rolled out the
+    # bottom of the log; if the numbers around it are there but it is not
+    # (or everything is older), the log was renumbered.
+    reset = after > 0 and (last < after or (first <= after and after not in sequences))
+    if reset:
+        after = 0
+    missed = max(first - after - 1, 0) if after and sequences else 0
+    return {
+        "after": after, "first_sequence": first, "last_sequence": last,
+        "reset": reset, "missed": missed,
+    }
+
+
+LOG_EVENT = FieldMap("event", {
+    "sequence-number": "sequence",
+    "timestamp": "timestamp",
+    "severity": ("severity", lowercase),
+    "application": "application",
+    "event-id": "event_id",
+    "subject": "subject",
+    "message": "message",
+})
+
+LOG_SEQUENCE = FieldMap("event", {"sequence-number": ("sequence", integer)})
+
+
+def _parse_log_entries(xml_data, after=None):
+    """Parse log XML into structured entries (only those after sequence ``after``)."""
     entries = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for event in root.iter("{urn:nokia.com:sros:ns:yang:sr:state}event"):
-            entry = {
-                "sequence": "",
-                "timestamp": "",
-                "severity": "",
-                "application": "",
-                "event_id": "",
-                "subject": "",
-                "message": "",
-            }
-            for child in event:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "sequence-number":
-                    entry["sequence"] = child.text or ""
-                elif tag == "timestamp":
-                    entry["timestamp"] = child.text or ""
-                elif tag == "severity":
-                    entry["severity"] = (child.text or "").lower()
-                elif tag == "application":
-                    entry["application"] = child.text or ""
-                elif tag == "event-id":
-                    entry["event_id"] = child.text or ""
-                elif tag == "subject":
-                    entry["subject"] = child.text or ""
-                elif tag == "message":
-                    entry["message"] = child.text or ""
-            entries.append(entry)
+        root = as_root(xml_data)
+        if after is None:
+            entries = list(LOG_EVENT.iter(root))
+        else:
+            entries = [
+                LOG_EVENT.parse(event) for event in LOG_EVENT.elements(root)
+                if LOG_SEQUENCE.parse(event)["sequence"] > after
+            ]
     except ElementTree.ParseError:
         pass
     return {"entries": entries}
 
 
+# Leaves of an SR OS <sros-log-generic-event> notification -> LOG_EVENT names
+# (plus the log the event was sent for).
+LOG_NOTIFICATION_FIELDS = {
+    "log-id": "log_id",
+    "sequence-number": "sequence",
+    "severity": "severity",
+    "application": "application",
+    "event-id": "event_id",
+    "subject": "subject",
+    "message": "message",
+}
+
+
+def parse_log_notification(notification):
+    """The log event carried by a NETCONF <notification>, as a LOG_EVENT dict.
+
+    SR OS sends events of logs with a ``netconf`` destination as
+    <sros-log-generic-event>; the timestamp is the notification's
+    <eventTime> and ``log_id`` the log it was sent for ("" if the event does
+    not say). Returns None for any other notification.
+    """
+    event = timestamp = None
+    for child in notification:
+        name = local_name(child.tag)
+        if name == "eventTime":
+            timestamp = (child.text or "").strip()
+        elif name == "sros-log-generic-event":
+            event = child
+    if event is None:
+        return None
+    entry = dict.fromkeys((*LOG_EVENT.names, "log_id"), "")
+    entry["timestamp"] = timestamp or ""
+    for child in event:
+        name = LOG_NOTIFICATION_FIELDS.get(local_name(child.tag))
+        if name is not None:
+            entry[name] = (child.text or "").strip()
+    entry["severity"] = entry["severity"].lower()
+    if not entry["sequence"].isdigit():
+        return None
+    return entry
+
+
 def calculate_health_score(log_entries):
     """Calculate a device health score from 0-100 based on log severities.
 
@@ -82,17 +179,23 @@ def calculate_health_score(log_entries):
       - warning: -1 per event
     Floor at 0.
     """
-    score = 100
     severity_counts = {"critical": 0, "major": 0, "minor": 0, "warning": 0}
 
     for entry in log_entries:
         severity = entry.get("severity", "").lower()
         if severity in severity_counts:
             severity_counts[severity] += 1
-            score -= SEVERITY_WEIGHTS.get(severity, 0)
 
     return {
-        "score": max(0, score),
+        "score": score_from_counts(severity_counts),
         "severity_counts": severity_counts,
         "total_events": len(log_entries),
     }
+
+
+def score_from_counts(severity_counts):
+    """The health score for per-severity event counts (same scale as above)."""
+    score = 100 - sum(
+        weight * severity_counts.get(severity, 0) for severity, weight in SEVERITY_WEIGHTS.items()
+    )
+    return max(0, score)
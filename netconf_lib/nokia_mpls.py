@@ -1,13 +1,10 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
+from .parsing import FieldMap, ListOf, as_root, integer, reply_data
 
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
 
-
-def get_mpls_lsps(device):
-    """Fetch MPLS LSP information with paths and statistics."""
-    filter_xml = """
+MPLS_LSPS_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <router>
         <router-name>Base</router-name>
@@ -17,69 +14,44 @@ def get_mpls_lsps(device):
       </router>
     </state>
     """
+
+
+def get_mpls_lsps(device):
+    """Fetch MPLS LSP information with paths and statistics."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_mpls_lsps(result.data_xml)
+            result = mgr.get(filter=("subtree", MPLS_LSPS_FILTER))
+            return _parse_mpls_lsps(reply_data(result))
     except Exception as e:
         return {"error": str(e), "lsps": []}
 
 
+MPLS_LSP = FieldMap("lsp", {
+    "lsp-name": "lsp_name",
+    "from": "from_address",
+    "to": "to_address",
+    "admin-state": "admin_state",
+    "oper-state": "oper_state",
+    "metric": "metric",
+    "path/hop/address": ("path_hops", ListOf()),
+    "statistics/forwarded-packets": ("forwarded_packets", integer),
+    "statistics/forwarded-octets": ("forwarded_octets", integer),
+})
+
+
 def _parse_mpls_lsps(xml_data):
     lsps = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for lsp in root.iter(f"{{{NS_STATE}}}lsp"):
-            entry = {
-                "lsp_name": "",
-                "from_address": "",
-                "to_address": "",
-                "admin_state": "",
-                "oper_state": "",
-                "metric": "",
-                "path_hops": [],
-                "forwarded_packets": 0,
-                "forwarded_octets": 0,
-            }
-            for child in lsp:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "lsp-name":
-                    entry["lsp_name"] = child.text or ""
-                elif tag == "from":
-                    entry["from_address"] = child.text or ""
-                elif tag == "to":
-                    entry["to_address"] = child.text or ""
-                elif tag == "admin-state":
-                    entry["admin_state"] = child.text or ""
-                elif tag == "oper-state":
-                    entry["oper_state"] = child.text or ""
-                elif tag == "metric":
-                    entry["metric"] = child.text or ""
-                elif tag == "path":
-                    for hop in child.iter(f"{{{NS_STATE}}}hop"):
-                        hop_addr = ""
-                        for hc in hop:
-                            htag = hc.tag.split("}")[-1] if "}" in hc.tag else hc.tag
-                            if htag == "address":
-                                hop_addr = hc.text or ""
-                        if hop_addr:
-                            entry["path_hops"].append(hop_addr)
-                elif tag == "statistics":
-                    for stat in child:
-                        stag = stat.tag.split("}")[-1] if "}" in stat.tag else stat.tag
-                        if stag == "forwarded-packets":
-                            entry["forwarded_packets"] = int(stat.text or 0)
-                        elif stag == "forwarded-octets":
-                            entry["forwarded_octets"] = int(stat.text or 0)
+        for entry in MPLS_LSP.iter(as_root(xml_data)):
+            if "" in entry["path_hops"]:
+                entry["path_hops"] = [hop for hop in entry["path_hops"] if hop]
             lsps.append(entry)
     except ElementTree.ParseError:
         pass
     return {"lsps": lsps}
 
 
-def get_mpls_tunnels(device):
-    """Fetch MPLS tunnel table (active tunnels with endpoints)."""
-    filter_xml = """
+MPLS_TUNNELS_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <router>
         <router-name>Base</router-name>
@@ -87,42 +59,32 @@ def get_mpls_tunnels(device):
       </router>
     </state>
     """
+
+
+def get_mpls_tunnels(device):
+    """Fetch MPLS tunnel table (active tunnels with endpoints)."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_tunnels(result.data_xml)
+            result = mgr.get(filter=("subtree", MPLS_TUNNELS_FILTER))
+            return _parse_tunnels(reply_data(result))
     except Exception as e:
         return {"error": str(e), "tunnels": []}
 
 
+TUNNEL = FieldMap("tunnel", {
+    "destination": "destination",
+    "tunnel-id": "tunnel_id",
+    "protocol": "protocol",
+    "next-hop": "next_hop",
+    "metric": "metric",
+    "oper-state": "oper_state",
+})
+
+
 def _parse_tunnels(xml_data):
     tunnels = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for tunnel in root.iter(f"{{{NS_STATE}}}tunnel"):
-            entry = {
-                "destination": "",
-                "tunnel_id": "",
-                "protocol": "",
-                "next_hop": "",
-                "metric": "",
-                "oper_state": "",
-            }
-            for child in tunnel:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "destination":
-                    entry["destination"] = child.text or ""
-                elif tag == "tunnel-id":
-                    entry["tunnel_id"] = child.text or ""
-                elif tag == "protocol":
-                    entry["protocol"] = child.text or ""
-                elif tag == "next-hop":
-                    entry["next_hop"] = child.text or ""
-                elif tag == "metric":
-                    entry["metric"] = child.text or ""
-                elif tag == "oper-state":
-                    entry["oper_state"] = child.text or ""
-            tunnels.append(entry)
+        tunnels = list(TUNNEL.iter(as_root(xml_data)))
     except ElementTree.ParseError:
         pass
     return {"tunnels": tunnels}
@@ -145,7 +107,7 @@ def get_lsp_path_detail(device, lsp_name):
     try:
         with netconf_connect(device) as mgr:
             result = mgr.get(filter=("subtree", filter_xml))
-            parsed = _parse_mpls_lsps(result.data_xml)
+            parsed = _parse_mpls_lsps(reply_data(result))
             lsps = parsed.get("lsps", [])
             return lsps[0] if lsps else {"error": f"LSP '{lsp_name}' not found"}
     except Exception as e:
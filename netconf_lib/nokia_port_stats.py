@@ -1,80 +1,48 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
+from .parsing import FieldMap, as_root, integer, reply_data, shared
+from .records import PortCounters
 
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
 
-
-def get_port_utilization(device):
-    """Fetch port statistics for utilization calculation."""
-    filter_xml = """
+PORT_STATS_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <port/>
     </state>
     """
+
+
+def get_port_utilization(device):
+    """Fetch port statistics for utilization calculation."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_port_stats(result.data_xml)
+            result = mgr.get(filter=("subtree", PORT_STATS_FILTER))
+            return _parse_port_stats(reply_data(result))
     except Exception as e:
         return {"error": str(e), "ports": []}
 
 
+PORT_STATS = FieldMap("port", {
+    "port-id": "port_id",
+    "description": "description",
+    "admin-state": ("admin_state", shared),
+    "oper-state": ("oper_state", shared),
+    "ethernet/speed": ("speed", shared),
+    "statistics/in-octets": ("in_octets", integer),
+    "statistics/out-octets": ("out_octets", integer),
+    "statistics/in-packets": ("in_packets", integer),
+    "statistics/out-packets": ("out_packets", integer),
+    "statistics/in-errors": ("in_errors", integer),
+    "statistics/out-errors": ("out_errors", integer),
+    "statistics/in-discards": ("in_discards", integer),
+    "statistics/out-discards": ("out_discards", integer),
+}, record=PortCounters)
+
+
 def _parse_port_stats(xml_data):
     ports = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for port in root.iter(f"{{{NS_STATE}}}port"):
-            entry = {
-                "port_id": "",
-                "description": "",
-                "admin_state": "",
-                "oper_state": "",
-                "speed": "",
-                "in_octets": 0,
-                "out_octets": 0,
-                "in_packets": 0,
-                "out_packets": 0,
-                "in_errors": 0,
-                "out_errors": 0,
-                "in_discards": 0,
-                "out_discards": 0,
-            }
-            for child in port:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "port-id":
-                    entry["port_id"] = child.text or ""
-                elif tag == "description":
-                    entry["description"] = child.text or ""
-                elif tag == "admin-state":
-                    entry["admin_state"] = child.text or ""
-                elif tag == "oper-state":
-                    entry["oper_state"] = child.text or ""
-                elif tag == "ethernet":
-                    for ec in child:
-                        etag = ec.tag.split("}")[-1] if "}" in ec.tag else ec.tag
-                        if etag == "speed":
-                            entry["speed"] = ec.text or ""
-                elif tag == "statistics":
-                    for stat in child:
-                        stag = stat.tag.split("}")[-1] if "}" in stat.tag else stat.tag
-                        if stag == "in-octets":
-                            entry["in_octets"] = int(stat.text or 0)
-                        elif stag == "out-octets":
-                            entry["out_octets"] = int(stat.text or 0)
-                        elif stag == "in-packets":
-                            entry["in_packets"] = int(stat.text or 0)
-                        elif stag == "out-packets":
-                            entry["out_packets"] = int(stat.text or 0)
-                        elif stag == "in-errors":
-                            entry["in_errors"] = int(stat.text or 0)
-                        elif stag == "out-errors":
-                            entry["out_errors"] = int(stat.text or 0)
-                        elif stag == "in-discards":
-                            entry["in_discards"] = int(stat.text or 0)
-                        elif stag == "out-discards":
-                            entry["out_discards"] = int(stat.text or 0)
-            ports.append(entry)
+        ports = list(PORT_STATS.iter(as_root(xml_data)))
     except ElementTree.ParseError:
         pass
     return {"ports": ports}
@@ -1,13 +1,15 @@
+import ipaddress
 from xml.etree import ElementTree
+from xml.sax.saxutils import escape
 
 from .connection import netconf_connect
+from .parsing import (
+    FieldMap, ListOf, as_root, boolean, integer, page_of, reply_data, shared, stream_elements,
+)
+from .records import RouteEntry
 
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
 
-
-def get_route_table(device, prefix_filter=None):
-    """Fetch IPv4 unicast route table from the Base router."""
-    filter_xml = """
+ROUTE_TABLE_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <router>
         <router-name>Base</router-name>
@@ -21,55 +23,137 @@ def get_route_table(device, prefix_filter=None):
       </router>
     </state>
     """
+
+
+ROUTE = FieldMap("route", {
+    "ip-prefix": "prefix",
+    "next-hop/ip-address": "next_hop",
+    "route-type": ("protocol", shared),
+    "preference": "preference",
+    "metric": "metric",
+    "active": ("active", boolean),
+}, record=RouteEntry)
+
+
+def get_route_table(device, prefix_filter=None):
+    """Fetch IPv4 unicast route table from the Base router."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_route_table(result.data_xml, prefix_filter)
+            result = mgr.get(filter=("subtree", ROUTE_TABLE_FILTER))
+            return _parse_route_table(reply_data(result), prefix_filter)
     except Exception as e:
         return {"error": str(e), "routes": []}
 
 
+def get_route_table_page(device, prefix_filter=None, page=1, per_page=100):
+    """Fetch one page of the route table without materializing the whole table.
+
+    Routes are read one at a time out of the reply tree ncclient already
+    holds and only the requested page becomes records, so Python memory stays
+    flat however many routes the router carries. ``total`` is the number of
+    (filtered) routes in the table.
+    """
+    try:
+        with netconf_connect(device) as mgr:
+            xml_data = reply_data(mgr.get(filter=("subtree", ROUTE_TABLE_FILTER)))
+        routes, total = page_of(iter_routes(xml_data, prefix_filter), page, per_page)
+        return {"routes": routes, "total": total, "page": page, "per_page": per_page}
+    except Exception as e:
+        return {"error": str(e), "routes": [], "total": 0, "page": page, "per_page": per_page}
+
+
+def route_lookup_filter(prefixes):
+    """ROUTE_TABLE_FILTER narrowed to the given prefixes (one keyed <route> each)."""
+    keys = "".join(
+        f"<route><ip-prefix>{escape(prefix)}</ip-prefix></route>" for prefix in prefixes
+    )
+    return ROUTE_TABLE_FILTER.replace("<route/>", keys)
+
+
+def lpm_candidates(address):
+    """Every prefix that could cover ``address``, longest first.
+
+    ``address`` is a host address or a prefix; "10.1.2.3" gives 10.1.2.3/32,
+    10.1.2.2/31, ... 0.0.0.0/0. Raises ValueError for invalid input.
+    """
+    network = ipaddress.IPv4Network(address.strip(), strict=False)
+    return [
+        str(network.supernet(new_prefix=length))
+        for length in range(network.prefixlen, -1, -1)
+    ]
+
+
+def lookup_routes(device, prefix, match="exact"):
+    """Look up routes on the device itself instead of downloading the table.
+
+    ``match="exact"`` returns the route(s) for exactly ``prefix``;
+    ``match="longest"`` sends every covering prefix (/32 down to /0) as keys
+    of one <get> and returns the longest one the router has. Either way the
+    reply holds a handful of routes, not the full table. ``reply_bytes`` is
+    the size of what came back.
+    """
+    try:
+        if match == "longest":
+            candidates = lpm_candidates(prefix)
+        else:
+            candidates = [str(ipaddress.IPv4Network(prefix.strip(), strict=False))]
+    except ValueError as e:
+        return {"error": f"Invalid prefix: {e}", "routes": [], "reply_bytes": 0}
+
+    try:
+        with netconf_connect(device) as mgr:
+            result = mgr.get(filter=("subtree", route_lookup_filter(candidates)))
+        routes = list(iter_routes(reply_data(result)))
+    except Exception as e:
+        return {"error": str(e), "routes": [], "reply_bytes": 0}
+
+    # The router only returns the keys it has; keep the most specific one.
+    rank = {candidate: i for i, candidate in enumerate(candidates)}
+    routes = [r for r in routes if r.prefix in rank]
+    if match == "longest" and routes:
+        best = min(rank[r.prefix] for r in routes)
+        routes = [r for r in routes if rank[r.prefix] == best]
+    return {"routes": routes, "reply_bytes": _reply_size(result)}
+
+
+def _reply_size(result):
+    """Size of the reply as received (a transformed reply as serialized)."""
+    raw = getattr(result, "xml", None)
+    if raw is None:
+        raw = getattr(result, "tostring", b"")
+    return len(raw)
+
+
 def _parse_route_table(xml_data, prefix_filter=None):
     routes = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for route in root.iter(f"{{{NS_STATE}}}route"):
-            entry = {
-                "prefix": "",
-                "next_hop": "",
-                "protocol": "",
-                "preference": "",
-                "metric": "",
-                "active": False,
-            }
-            for child in route:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "ip-prefix":
-                    entry["prefix"] = child.text or ""
-                elif tag == "next-hop":
-                    for nhc in child:
-                        nhtag = nhc.tag.split("}")[-1] if "}" in nhc.tag else nhc.tag
-                        if nhtag == "ip-address":
-                            entry["next_hop"] = nhc.text or ""
-                elif tag == "route-type":
-                    entry["protocol"] = child.text or ""
-                elif tag == "preference":
-                    entry["preference"] = child.text or ""
-                elif tag == "metric":
-                    entry["metric"] = child.text or ""
-                elif tag == "active":
-                    entry["active"] = (child.text or "").lower() == "true"
-            if prefix_filter and prefix_filter not in entry["prefix"]:
-                continue
-            routes.append(entry)
+        routes = list(iter_routes(xml_data, prefix_filter))
     except ElementTree.ParseError:
         pass
     return {"routes": routes}
 
 
-def get_bgp_peers(device):
-    """Fetch BGP neighbor/peer status."""
-    filter_xml = """
+def iter_routes(xml_data, prefix_filter=None):
+    """Yield a RouteEntry for every <route> in a route-table reply.
+
+    Reply strings are parsed incrementally: each <route> is turned into a
+    record, then cleared and detached, so only one route is held in memory
+    at a time. Already parsed elements are walked as is. Tags are matched
+    by local name, so namespace-stripped replies parse too.
+    """
+    if isinstance(xml_data, (str, bytes)):
+        elements = (route for route, _ in stream_elements(xml_data, "route"))
+    else:
+        elements = ROUTE.elements(as_root(xml_data))
+    parse = ROUTE.parse
+    for route in elements:
+        record = parse(route)
+        if prefix_filter and prefix_filter not in record.prefix:
+            continue
+        yield record
+
+
+BGP_PEERS_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <router>
         <router-name>Base</router-name>
@@ -79,62 +163,42 @@ def get_bgp_peers(device):
       </router>
     </state>
     """
+
+
+def get_bgp_peers(device):
+    """Fetch BGP neighbor/peer status."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_bgp_peers(result.data_xml)
+            result = mgr.get(filter=("subtree", BGP_PEERS_FILTER))
+            return _parse_bgp_peers(reply_data(result))
     except Exception as e:
         return {"error": str(e), "peers": []}
 
 
+BGP_NEIGHBOR = FieldMap("neighbor", {
+    "peer-address": "peer_address",
+    "ip-address": "peer_address",
+    "peer-as": "peer_as",
+    "local-as": "local_as",
+    "session-state": "state",
+    "up-time": "uptime",
+    "statistics/received-routes": ("received_routes", integer),
+    "statistics/sent-routes": ("sent_routes", integer),
+    "statistics/active-routes": ("active_routes", integer),
+    "description": "description",
+})
+
+
 def _parse_bgp_peers(xml_data):
     peers = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for neighbor in root.iter(f"{{{NS_STATE}}}neighbor"):
-            entry = {
-                "peer_address": "",
-                "peer_as": "",
-                "local_as": "",
-                "state": "",
-                "uptime": "",
-                "received_routes": 0,
-                "sent_routes": 0,
-                "active_routes": 0,
-                "description": "",
-            }
-            for child in neighbor:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "peer-address" or tag == "ip-address":
-                    entry["peer_address"] = child.text or ""
-                elif tag == "peer-as":
-                    entry["peer_as"] = child.text or ""
-                elif tag == "local-as":
-                    entry["local_as"] = child.text or ""
-                elif tag == "session-state":
-                    entry["state"] = child.text or ""
-                elif tag == "up-time":
-                    entry["uptime"] = child.text or ""
-                elif tag == "description":
-                    entry["description"] = child.text or ""
-                elif tag == "statistics":
-                    for stat in child:
-                        stag = stat.tag.split("}")[-1] if "}" in stat.tag else stat.tag
-                        if stag == "received-routes":
-                            entry["received_routes"] = int(stat.text or 0)
-                        elif stag == "sent-routes":
-                            entry["sent_routes"] = int(stat.text or 0)
-                        elif stag == "active-routes":
-                            entry["active_routes"] = int(stat.text or 0)
-            peers.append(entry)
+        peers = list(BGP_NEIGHBOR.iter(as_root(xml_data)))
     except ElementTree.ParseError:
         pass
     return {"peers": peers}
 
 
-def get_system_ip(device):
-    """Get the system interface IP (router-id) of a device."""
-    filter_xml = """
+SYSTEM_IP_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <router>
         <router-name>Base</router-name>
@@ -144,18 +208,26 @@ def get_system_ip(device):
       </router>
     </state>
     """
+
+
+def get_system_ip(device):
+    """Get the system interface IP (router-id) of a device."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            root = ElementTree.fromstring(result.data_xml)
-            for child in root.iter(f"{{{NS_STATE}}}ipv4"):
-                for sub in child:
-                    tag = sub.tag.split("}")[-1] if "}" in sub.tag else sub.tag
-                    if tag == "primary":
-                        for addr in sub:
-                            atag = addr.tag.split("}")[-1] if "}" in addr.tag else addr.tag
-                            if atag == "address":
-                                return {"system_ip": addr.text or ""}
-            return {"system_ip": ""}
+            result = mgr.get(filter=("subtree", SYSTEM_IP_FILTER))
+            return _parse_system_ip(reply_data(result))
     except Exception as e:
         return {"error": str(e), "system_ip": ""}
+
+
+SYSTEM_IPV4 = FieldMap("ipv4", {"primary/address": ("addresses", ListOf())})
+
+
+def _parse_system_ip(xml_data):
+    try:
+        for ipv4 in SYSTEM_IPV4.iter(as_root(xml_data)):
+            if ipv4["addresses"]:
+                return {"system_ip": ipv4["addresses"][0]}
+    except ElementTree.ParseError:
+        pass
+    return {"system_ip": ""}
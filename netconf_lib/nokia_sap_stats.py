@@ -1,13 +1,10 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
+from .parsing import FieldMap, ListOf, as_root, integer, reply_data
 
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
 
-
-def get_sap_statistics(device, service_id=None):
-    """Fetch SAP ingress/egress statistics for VPLS services."""
-    filter_xml = """
+SAP_STATS_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <service>
         <vpls>
@@ -18,59 +15,41 @@ def get_sap_statistics(device, service_id=None):
       </service>
     </state>
     """
+
+
+def get_sap_statistics(device, service_id=None):
+    """Fetch SAP ingress/egress statistics for VPLS services."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_sap_stats(result.data_xml, service_id)
+            result = mgr.get(filter=("subtree", SAP_STATS_FILTER))
+            return _parse_sap_stats(reply_data(result), service_id)
     except Exception as e:
         return {"error": str(e), "saps": []}
 
 
+SAP = FieldMap("sap", {
+    "sap-id": "sap_id",
+    "statistics/ingress-packets": ("ingress_packets", integer),
+    "statistics/ingress-octets": ("ingress_octets", integer),
+    "statistics/egress-packets": ("egress_packets", integer),
+    "statistics/egress-octets": ("egress_octets", integer),
+    "statistics/ingress-dropped-packets": ("ingress_dropped", integer),
+    "statistics/egress-dropped-packets": ("egress_dropped", integer),
+})
+
+VPLS_SAPS = FieldMap("vpls", {
+    "service-id": "service_id",
+    "sap": ("saps", ListOf(SAP)),
+})
+
+
 def _parse_sap_stats(xml_data, service_id=None):
     saps = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        current_service_id = ""
-
-        for vpls in root.iter(f"{{{NS_STATE}}}vpls"):
-            for child in vpls:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "service-id":
-                    current_service_id = child.text or ""
-                elif tag == "sap":
-                    entry = {
-                        "service_id": current_service_id,
-                        "sap_id": "",
-                        "ingress_packets": 0,
-                        "ingress_octets": 0,
-                        "egress_packets": 0,
-                        "egress_octets": 0,
-                        "ingress_dropped": 0,
-                        "egress_dropped": 0,
-                    }
-                    for sap_child in child:
-                        stag = sap_child.tag.split("}")[-1] if "}" in sap_child.tag else sap_child.tag
-                        if stag == "sap-id":
-                            entry["sap_id"] = sap_child.text or ""
-                        elif stag == "statistics":
-                            for stat in sap_child:
-                                stat_tag = stat.tag.split("}")[-1] if "}" in stat.tag else stat.tag
-                                if stat_tag == "ingress-packets":
-                                    entry["ingress_packets"] = int(stat.text or 0)
-                                elif stat_tag == "ingress-octets":
-                                    entry["ingress_octets"] = int(stat.text or 0)
-                                elif stat_tag == "egress-packets":
-                                    entry["egress_packets"] = int(stat.text or 0)
-                                elif stat_tag == "egress-octets":
-                                    entry["egress_octets"] = int(stat.text or 0)
-                                elif stat_tag == "ingress-dropped-packets":
-                                    entry["ingress_dropped"] = int(stat.text or 0)
-                                elif stat_tag == "egress-dropped-packets":
-                                    entry["egress_dropped"] = int(stat.text or 0)
-
-                    if service_id and entry["service_id"] != str(service_id):
-                        continue
-                    saps.append(entry)
+        for vpls in VPLS_SAPS.iter(as_root(xml_data)):
+            if service_id and vpls["service_id"] != str(service_id):
+                continue
+            saps.extend({"service_id": vpls["service_id"], **sap} for sap in vpls["saps"])
     except ElementTree.ParseError:
         pass
     return {"saps": saps}
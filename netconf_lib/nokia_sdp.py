@@ -1,64 +1,43 @@
 from xml.etree import ElementTree
 
 from .connection import netconf_connect
+from .parsing import FieldMap, ListOf, as_root, reply_data
 
-NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
 
-
-def get_sdp_list(device):
-    """Fetch Service Distribution Points (SDPs) and their bindings."""
-    filter_xml = """
+SDP_FILTER = """
     <state xmlns="urn:nokia.com:sros:ns:yang:sr:state">
       <service>
         <sdp/>
       </service>
     </state>
     """
+
+
+def get_sdp_list(device):
+    """Fetch Service Distribution Points (SDPs) and their bindings."""
     try:
         with netconf_connect(device) as mgr:
-            result = mgr.get(filter=("subtree", filter_xml))
-            return _parse_sdp_list(result.data_xml)
+            result = mgr.get(filter=("subtree", SDP_FILTER))
+            return _parse_sdp_list(reply_data(result))
     except Exception as e:
         return {"error": str(e), "sdps": []}
 
 
+SDP = FieldMap("sdp", {
+    "sdp-id": "sdp_id",
+    "far-end/ip-address": "far_end",
+    "admin-state": "admin_state",
+    "oper-state": "oper_state",
+    "delivery-type": "delivery_type",
+    "signaling": "signaling",
+    "binding/service-id": ("bound_services", ListOf()),
+})
+
+
 def _parse_sdp_list(xml_data):
     sdps = []
     try:
-        root = ElementTree.fromstring(xml_data)
-        for sdp in root.iter(f"{{{NS_STATE}}}sdp"):
-            entry = {
-                "sdp_id": "",
-                "far_end": "",
-                "admin_state": "",
-                "oper_state": "",
-                "delivery_type": "",
-                "signaling": "",
-                "bound_services": [],
-            }
-            for child in sdp:
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == "sdp-id":
-                    entry["sdp_id"] = child.text or ""
-                elif tag == "far-end":
-                    for fc in child:
-                        ftag = fc.tag.split("}")[-1] if "}" in fc.tag else fc.tag
-                        if ftag == "ip-address":
-                            entry["far_end"] = fc.text or ""
-                elif tag == "admin-state":
-                    entry["admin_state"] = child.text or ""
-                elif tag == "oper-state":
-                    entry["oper_state"] = child.text or ""
-                elif tag == "delivery-type":
-                    entry["delivery_type"] = child.text or ""
-                elif tag == "signaling":
-                    entry["signaling"] = child.text or ""
-                elif tag == "binding":
-                    for bc in child:
-                        btag = bc.tag.split("}")[-1] if "}" in bc.tag else bc.tag
-                        if btag == "service-id":
-                            entry["bound_services"].append(bc.text or "")
-            sdps.append(entry)
+        sdps = list(SDP.iter(as_root(xml_data)))
     except ElementTree.ParseError:
         pass
     return {"sdps": sdps}
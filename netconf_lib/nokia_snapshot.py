@@ -0,0 +1,25 @@
+from .planner import fetch_datasets
+
+# snapshot key -> planner dataset
+SNAPSHOT_PARTS = {
+    "system_ip": "system_ip",
+    "ldp": "ldp_sessions",
+    "mpls": "mpls_lsps",
+    "tunnels": "tunnels",
+    "lldp": "lldp",
+}
+
+
+def get_device_snapshot(device):
+    """Fetch everything the topology builder needs in a single round trip.
+
+    Returns {"system_ip": ..., "ldp": ..., "mpls": ..., "tunnels": ..., "lldp": ...}
+    where each value has exactly the shape of get_system_ip, get_ldp_sessions,
+    get_mpls_lsps, get_mpls_tunnels and get_lldp_neighbors respectively.
+
+    All five subtree filters are merged into one <get> by the query planner.
+    If a device rejects the combined filter, the five filters are sent one by
+    one on the same session.
+    """
+    results = fetch_datasets(device, list(SNAPSHOT_PARTS.values()))
+    return {key: results[name] for key, name in SNAPSHOT_PARTS.items()}
@@ -0,0 +1,333 @@
+import copy
+import itertools
+import sys
+from xml.etree import ElementTree
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # lxml comes with ncclient; the stdlib path is a fallback only
+    lxml_etree = None
+
+STREAM_CHUNK = 1 << 16
+
+NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
+NS_CONF = "urn:nokia.com:sros:ns:yang:sr:conf"
+
+
+def as_root(xml_data):
+    """Return a parsed root element for ``xml_data``.
+
+    Accepts the ``data_xml`` string of an RPC reply or an already parsed
+    element (e.g. one slice of a combined reply, or the lxml tree from
+    reply_data), so parsers can be fed either. Strings are parsed with lxml
+    when it is installed. Raises ``ElementTree.ParseError`` for malformed
+    strings.
+    """
+    if isinstance(xml_data, (str, bytes)):
+        return parse_xml(xml_data)
+    return xml_data
+
+
+def parse_xml(xml_data):
+    """Parse an XML document with lxml, or ElementTree when lxml is missing."""
+    if lxml_etree is None:
+        return ElementTree.fromstring(xml_data)
+    if isinstance(xml_data, str):
+        # lxml refuses str input that carries an encoding declaration
+        xml_data = xml_data.encode()
+    parser = lxml_etree.XMLParser(huge_tree=True, resolve_entities=False)
+    try:
+        return lxml_etree.fromstring(xml_data, parser)
+    except lxml_etree.XMLSyntaxError as e:
+        raise ElementTree.ParseError(str(e)) from e
+
+
+def reply_data(result):
+    """The <data> element of an RPC reply, as the tree ncclient already parsed.
+
+    ``result.data_xml`` serializes ncclient's lxml tree back into a string
+    that the parsers then parse again; this hands them the tree instead.
+    Plain replies expose it as ``data_ele``; replies a device handler
+    transformed (the alu handler strips namespaces) come back as an
+    NCElement, whose document is searched for <data>. Falls back to
+    ``data_xml`` for anything else.
+    """
+    data = getattr(result, "data_ele", None)
+    if data is None and hasattr(result, "find"):
+        data = result.find("data")
+    if data is None:
+        return result.data_xml
+    return data
+
+
+def is_lxml(elem):
+    return lxml_etree is not None and isinstance(elem, lxml_etree._Element)
+
+
+def iter_tags(root, tags):
+    """Every element under (and including) ``root`` whose tag is one of ``tags``."""
+    if is_lxml(root):
+        # lxml matches several tags in one walk, in document order.
+        return root.iter(*tags)
+    return itertools.chain.from_iterable(root.iter(tag) for tag in tags)
+
+
+def detached(elem):
+    """``elem`` ready to be appended to another tree.
+
+    An lxml element has a single parent, so appending moves it out of the
+    reply; it is copied instead. ElementTree elements are shared as is.
+    """
+    return copy.deepcopy(elem) if is_lxml(elem) else elem
+
+
+def container(elements):
+    """Wrap ``elements`` in a synthetic <data> element for the _parse_* helpers."""
+    root = ElementTree.Element("data")
+    root.extend(elements)
+    return root
+
+
+def qualified(tag):
+    """Every spelling of ``tag`` a reply can use: state, conf or no namespace.
+
+    ncclient's alu handler strips namespaces from replies, so the bare name
+    has to match as well as the qualified ones.
+    """
+    return (f"{{{NS_STATE}}}{tag}", f"{{{NS_CONF}}}{tag}", tag)
+
+
+# Converters take an element's text (None when empty); convert(None) is the default.
+def text(value):
+    return value or ""
+
+
+def shared(value):
+    """Text with a handful of distinct values (protocol, state): one string object for all
+    rows. Not for addresses, SAPs or numbers: interning many distinct values grows the
+    interpreter's intern table, which costs more than the strings it saves."""
+    return sys.intern(value) if value else ""
+
+
+def integer(value):
+    return int(value) if value else 0
+
+
+def boolean(value):
+    return (value or "").lower() == "true"
+
+
+def lowercase(value):
+    return (value or "").lower()
+
+
+class ListOf:
+    """Field spec for a repeated element: collect ``item`` for every occurrence.
+
+    ``item`` is a converter (one value per element) or a FieldMap (one
+    record per element).
+    """
+
+    def __init__(self, item=text):
+        self.item = item
+
+
+_LEAF, _NESTED, _LIST, _RECORDS = range(4)
+
+
+class FieldMap:
+    """Declarative parser for one kind of list entry (a <port>, a <route>, ...).
+
+        PORT = FieldMap("port", {
+            "port-id": "name",
+            "statistics/in-octets": ("in_octets", integer),
+            "lag/port/port-id": ("members", ListOf()),
+        })
+
+    Keys are child paths relative to the entry, values an output name, a
+    (name, converter) pair or a (name, ListOf(...)) pair. The paths are
+    compiled once into per-level dicts keyed by the fully qualified tags, so
+    parsing an element is a dict lookup per child and no string work.
+
+    Records are dicts in field order, or ``record`` instances (a namedtuple
+    class whose fields the names must cover) when given. Unmatched children
+    are skipped; missing fields get their converter's default.
+    """
+
+    def __init__(self, tag, fields, record=None):
+        self.tag = tag
+        self.tags = qualified(tag)
+        self.record = record
+        converters = dict.fromkeys(record._fields) if record else {}
+        # One level per element depth: plain text leaves in one dict (the
+        # common case), everything else in the other.
+        self._level = ({}, {})
+        for path, spec in fields.items():
+            name, convert = (spec, text) if isinstance(spec, str) else spec
+            converters[name] = convert
+
+            *parents, leaf = path.split("/")
+            texts, handlers = self._level
+            for part in parents:
+                nested = handlers.get(part)
+                if nested is None:
+                    if part in texts:
+                        raise ValueError(f"{path}: {part} is already mapped as a leaf")
+                    nested = (_NESTED, None, ({}, {}))
+                    for tag_variant in qualified(part):
+                        handlers[tag_variant] = nested
+                elif nested[0] != _NESTED:
+                    raise ValueError(f"{path}: {part} is already mapped as a leaf")
+                texts, handlers = nested[2]
+            if leaf in handlers and handlers[leaf][0] == _NESTED:
+                raise ValueError(f"{path}: {leaf} is already mapped as a container")
+            for tag_variant in qualified(leaf):
+                if convert is text:
+                    texts[tag_variant] = name
+                elif isinstance(convert, ListOf):
+                    kind = _RECORDS if isinstance(convert.item, FieldMap) else _LIST
+                    handlers[tag_variant] = (kind, name, convert.item)
+                else:
+                    handlers[tag_variant] = (_LEAF, name, convert)
+
+        missing = [name for name, convert in converters.items() if convert is None]
+        if missing:
+            raise ValueError(f"No field spec for {', '.join(missing)}")
+        self.names = list(converters)
+        self._lists = [name for name, convert in converters.items() if isinstance(convert, ListOf)]
+        self._defaults = {
+            name: None if isinstance(convert, ListOf) else convert(None)
+            for name, convert in converters.items()
+        }
+
+    def parse(self, elem, **initial):
+        """Build one record from ``elem``; ``initial`` seeds fields the element may override."""
+        values = self._defaults.copy()
+        for name in self._lists:
+            values[name] = []
+        if initial:
+            values.update(initial)
+        _fill(elem, self._level, values)
+        if self.record is not None:
+            return self.record._make(values.values())
+        return values
+
+    def elements(self, root):
+        """Every ``tag`` element under (and including) ``root``, in any namespace."""
+        return iter_tags(root, self.tags)
+
+    def iter(self, root):
+        """Parse every ``tag`` element under ``root``."""
+        parse = self.parse
+        return (parse(elem) for elem in self.elements(root))
+
+
+def _fill(elem, level, values):
+    texts, handlers = level
+    text_field = texts.get
+    for child in elem:
+        name = text_field(child.tag)
+        if name is not None:
+            values[name] = child.text or ""
+            continue
+        handler = handlers.get(child.tag)
+        if handler is None:
+            continue
+        kind, name, arg = handler
+        if kind == _LEAF:
+            values[name] = arg(child.text)
+        elif kind == _NESTED:
+            _fill(child, arg, values)
+        elif kind == _LIST:
+            values[name].append(arg(child.text))
+        else:
+            values[name].append(arg.parse(child))
+
+
+_local_names = {}
+
+
+def local_name(tag):
+    """``{namespace}port`` -> ``port`` (memoized; replies repeat a few dozen tags)."""
+    name = _local_names.get(tag)
+    if name is None:
+        name = _local_names[tag] = tag.rpartition("}")[2]
+    return name
+
+
+def stream_elements(xml_data, tag, container=None):
+    """Incrementally parse ``xml_data`` and yield each complete ``tag`` element.
+
+    Yields ``(element, container_element)`` pairs, where the second item is
+    the innermost enclosing ``container`` element (or None). The container
+    is still being parsed, but every child that precedes the yielded element
+    (e.g. a VPLS's service-id before its FDB) is already there.
+
+    Tags are local names and match in any (or no) namespace. A yielded
+    element must be consumed before the next one is requested: it is cleared
+    and detached afterwards, which keeps memory bounded by one element rather
+    than the whole document.
+    """
+    if lxml_etree is not None:
+        yield from _stream_lxml(xml_data, tag, container)
+        return
+
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    stack = []
+    containers = []
+    for offset in range(0, len(xml_data), STREAM_CHUNK):
+        parser.feed(xml_data[offset:offset + STREAM_CHUNK])
+        for event, elem in parser.read_events():
+            name = local_name(elem.tag)
+            if event == "start":
+                stack.append(elem)
+                if name == container:
+                    containers.append(elem)
+                continue
+            stack.pop()
+            if name == tag:
+                yield elem, containers[-1] if containers else None
+            elif name == container:
+                containers.pop()
+            else:
+                continue
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+    parser.close()
+
+
+def _stream_lxml(xml_data, tag, container):
+    # lxml filters by tag in C, so only matching elements produce events.
+    tags = [f"{{*}}{tag}"]
+    events = ("end",)
+    if container:
+        tags.append(f"{{*}}{container}")
+        events = ("start", "end")
+    parser = lxml_etree.XMLPullParser(events=events, tag=tags, huge_tree=True)
+    containers = []
+    for offset in range(0, len(xml_data), STREAM_CHUNK):
+        parser.feed(xml_data[offset:offset + STREAM_CHUNK])
+        for event, elem in parser.read_events():
+            if event == "start":
+                if local_name(elem.tag) == container:
+                    containers.append(elem)
+                continue
+            if container and local_name(elem.tag) == container:
+                containers.pop()
+            else:
+                yield elem, containers[-1] if containers else None
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    parser.close()
+
+
+def page_of(records, page, per_page):
+    """Consume ``records`` keeping only page ``page`` (1-based); returns (items, total)."""
+    start = (max(page, 1) - 1) * per_page
+    iterator = iter(records)
+    skipped = sum(1 for _ in itertools.islice(iterator, start))
+    items = list(itertools.islice(iterator, per_page))
+    rest = sum(1 for _ in iterator)
+    return items, skipped + len(items) + rest
@@ -0,0 +1,304 @@
+from collections import namedtuple
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from ncclient.operations.rpc import RPCError
+
+from . import (
+    nokia_interfaces, nokia_lag, nokia_ldp, nokia_mpls, nokia_port_stats,
+    nokia_routing, nokia_sap_stats, nokia_sdp,
+)
+from .connection import netconf_connect
+from .parsing import as_root, detached, iter_tags, local_name, qualified, reply_data
+
+Dataset = namedtuple("Dataset", ["source", "filter_xml", "parser", "empty"])
+
+# source is "state" (sent with <get>) or "running" (sent with <get-config>).
+DATASETS = {
+    "ports": Dataset(
+        "state", nokia_interfaces.INTERFACES_FILTER, nokia_interfaces._parse_interfaces,
+        {"interfaces": []},
+    ),
+    "port_config": Dataset(
+        "running", nokia_interfaces.PORT_CONFIG_FILTER,
+        lambda xml_data: {"ports": nokia_interfaces._parse_port_config(xml_data)},
+        {"ports": []},
+    ),
+    "port_stats": Dataset(
+        "state", nokia_port_stats.PORT_STATS_FILTER, nokia_port_stats._parse_port_stats,
+        {"ports": []},
+    ),
+    "lldp": Dataset(
+        "state", nokia_interfaces.LLDP_FILTER, nokia_interfaces._parse_lldp,
+        {"neighbors": []},
+    ),
+    "lag_config": Dataset(
+        "running", nokia_lag.LAG_CONFIG_FILTER, nokia_lag._parse_lag_config, {"lags": []},
+    ),
+    "lag_state": Dataset(
+        "state", nokia_lag.LAG_STATE_FILTER, nokia_lag._parse_lag_state, {"lags": []},
+    ),
+    "ldp_sessions": Dataset(
+        "state", nokia_ldp.LDP_SESSIONS_FILTER, nokia_ldp._parse_ldp_sessions,
+        {"sessions": [], "statistics": {}},
+    ),
+    "ldp_bindings": Dataset(
+        "state", nokia_ldp.LDP_BINDINGS_FILTER, nokia_ldp._parse_ldp_bindings,
+        {"bindings": []},
+    ),
+    "mpls_lsps": Dataset(
+        "state", nokia_mpls.MPLS_LSPS_FILTER, nokia_mpls._parse_mpls_lsps, {"lsps": []},
+    ),
+    "tunnels": Dataset(
+        "state", nokia_mpls.MPLS_TUNNELS_FILTER, nokia_mpls._parse_tunnels, {"tunnels": []},
+    ),
+    "system_ip": Dataset(
+        "state", nokia_routing.SYSTEM_IP_FILTER, nokia_routing._parse_system_ip,
+        {"system_ip": ""},
+    ),
+    "routes": Dataset(
+        "state", nokia_routing.ROUTE_TABLE_FILTER, nokia_routing._parse_route_table,
+        {"routes": []},
+    ),
+    "bgp": Dataset(
+        "state", nokia_routing.BGP_PEERS_FILTER, nokia_routing._parse_bgp_peers, {"peers": []},
+    ),
+    "sdps": Dataset("state", nokia_sdp.SDP_FILTER, nokia_sdp._parse_sdp_list, {"sdps": []}),
+    "sap_stats": Dataset(
+        "state", nokia_sap_stats.SAP_STATS_FILTER, nokia_sap_stats._parse_sap_stats,
+        {"saps": []},
+    ),
+}
+
+
+class _Node:
+    """One element of a subtree filter.
+
+    ``keys`` holds the content-match children (e.g. router-name=Base) that
+    identify which list entries the node selects. ``children`` holds the
+    containment/selection children. A node without children selects its
+    whole subtree (RFC 6241 section 6.2.5).
+    """
+
+    def __init__(self, tag, keys=(), children=None):
+        self.tag = tag
+        self.keys = tuple(keys)
+        self.children = children or {}
+
+    @property
+    def select_all(self):
+        return not self.children
+
+    @property
+    def ident(self):
+        return (self.tag, self.keys)
+
+    def copy(self):
+        return _Node(self.tag, self.keys, {k: c.copy() for k, c in self.children.items()})
+
+
+def _parse_filter(filter_xml):
+    return _node_from_element(ElementTree.fromstring(filter_xml))
+
+
+def _node_from_element(elem):
+    keys = []
+    children = {}
+    for child in elem:
+        text = (child.text or "").strip()
+        if len(child) == 0 and text:
+            keys.append((child.tag, text))
+        else:
+            node = _node_from_element(child)
+            _add_child(children, node)
+    return _Node(elem.tag, sorted(keys), children)
+
+
+def _add_child(children, node):
+    """Insert ``node`` into a children dict, merging with what is already there."""
+    existing = children.get(node.ident)
+    if existing is not None:
+        children[node.ident] = _merge(existing, node)
+        return
+    # An un-keyed select-all sibling already returns every entry of this list.
+    blanket = children.get((node.tag, ()))
+    if blanket is not None and blanket.select_all:
+        return
+    if not node.keys and node.select_all:
+        for ident in [i for i in children if i[0] == node.tag]:
+            del children[ident]
+    children[node.ident] = node
+
+
+def _merge(a, b):
+    if a.select_all or b.select_all:
+        return _Node(a.tag, a.keys)
+    merged = a.copy()
+    for child in b.children.values():
+        _add_child(merged.children, child.copy())
+    return merged
+
+
+def _serialize(node, parent_ns=None):
+    ns, _, local = node.tag[1:].partition("}") if node.tag.startswith("{") else ("", "", node.tag)
+    attrs = f' xmlns="{ns}"' if ns and ns != parent_ns else ""
+    inner = []
+    for key_tag, text in node.keys:
+        key_local = key_tag.split("}")[-1]
+        inner.append(f"<{key_local}>{escape(text)}</{key_local}>")
+    for child in node.children.values():
+        inner.append(_serialize(child, ns))
+    if not inner:
+        return f"<{local}{attrs}/>"
+    return f"<{local}{attrs}>{''.join(inner)}</{local}>"
+
+
+def _project(elem, node):
+    """Return the part of a reply element that ``node`` alone would have selected.
+
+    Leaves are kept (they carry list keys such as port-id that the device
+    adds to every reply) unless the filter names some of the element's leaves
+    explicitly (``<event><sequence-number/></event>``): then only those and
+    the first leaf, the list key, are kept. Unselected subtrees are pruned.
+    """
+    # Tags are compared by local name: ncclient's alu handler strips the
+    # namespaces from replies, the filter tree keeps them.
+    for key_tag, text in node.keys:
+        key = local_name(key_tag)
+        if not any(
+            local_name(sub.tag) == key and (sub.text or "").strip() == text for sub in elem
+        ):
+            return None
+    if node.select_all:
+        return detached(elem)
+    out = elem.makeelement(elem.tag, {})
+    selected = {local_name(child.tag) for child in node.children.values() if child.select_all}
+    leaves = [sub for sub in elem if len(sub) == 0]
+    keep = None  # every leaf
+    if any(local_name(sub.tag) in selected for sub in leaves):
+        keep = {sub for i, sub in enumerate(leaves) if i == 0 or local_name(sub.tag) in selected}
+    for sub in elem:
+        if len(sub) == 0:
+            if keep is None or sub in keep:
+                out.append(detached(sub))
+            continue
+        tag = local_name(sub.tag)
+        for child in node.children.values():
+            if local_name(child.tag) == tag:
+                projected = _project(sub, child)
+                if projected is not None:
+                    out.append(projected)
+                    break
+    return out
+
+
+_parsed_filters = {}
+
+
+def _filter_tree(name):
+    tree = _parsed_filters.get(name)
+    if tree is None:
+        tree = _parsed_filters[name] = _parse_filter(DATASETS[name].filter_xml)
+    return tree
+
+
+def plan(names):
+    """Group datasets into RPCs.
+
+    Returns a list of (source, filter_xml, [dataset names]) with at most one
+    entry per datastore.
+    """
+    unknown = [n for n in names if n not in DATASETS]
+    if unknown:
+        raise KeyError(f"Unknown dataset(s): {', '.join(unknown)}")
+
+    groups = {}
+    for name in dict.fromkeys(names):
+        source = DATASETS[name].source
+        tops, members = groups.setdefault(source, ({}, []))
+        _add_child(tops, _filter_tree(name).copy())
+        members.append(name)
+
+    return [
+        (source, "".join(_serialize(top) for top in tops.values()), members)
+        for source, (tops, members) in groups.items()
+    ]
+
+
+def _dispatch(root, names):
+    if len(names) == 1:
+        # The reply holds exactly what this one filter selected.
+        return {names[0]: DATASETS[names[0]].parser(root)}
+    results = {}
+    for name in names:
+        tree = _filter_tree(name)
+        data = root.makeelement("data", {})
+        for top in iter_tags(root, qualified(local_name(tree.tag))):
+            projected = _project(top, tree)
+            if projected is not None:
+                data.append(projected)
+        results[name] = DATASETS[name].parser(data)
+    return results
+
+
+def _error_result(name, error):
+    empty = DATASETS[name].empty
+    return {"error": error, **{k: type(v)() for k, v in empty.items()}}
+
+
+def fetch_datasets_with(mgr, names):
+    """Run the plan for ``names`` on an already open session."""
+    results = {}
+    for source, filter_xml, members in plan(names):
+        try:
+            if source == "running":
+                result = mgr.get_config(source="running", filter=("subtree", filter_xml))
+            else:
+                result = mgr.get(filter=("subtree", filter_xml))
+        except RPCError:
+            # The device refused the merged filter; fall back to one RPC per
+            # dataset on the same session.
+            results.update(_fetch_one_by_one(mgr, members))
+            continue
+        try:
+            root = as_root(reply_data(result))
+        except ElementTree.ParseError as e:
+            results.update({name: _error_result(name, str(e)) for name in members})
+            continue
+        results.update(_dispatch(root, members))
+    return results
+
+
+def _fetch_one_by_one(mgr, names):
+    results = {}
+    for name in names:
+        dataset = DATASETS[name]
+        try:
+            if dataset.source == "running":
+                result = mgr.get_config(source="running", filter=("subtree", dataset.filter_xml))
+            else:
+                result = mgr.get(filter=("subtree", dataset.filter_xml))
+            results[name] = dataset.parser(reply_data(result))
+        except RPCError as e:
+            results[name] = _error_result(name, str(e))
+    return results
+
+
+def fetch_datasets(device, names):
+    """Fetch several datasets from ``device`` with as few RPCs as possible.
+
+        results = fetch_datasets(device, ["ports", "lag_state", "ldp_sessions", "bgp"])
+
+    The filters are merged per datastore (one <get> for state, one
+    <get-config> for running config) and sent on a single session. Each
+    dataset's parser then sees only the slice of the reply its own filter
+    would have selected, i.e. the same shape as a standalone call.
+
+    Returns {name: parsed result}; every result has the shape of the matching
+    standalone getter, including an "error" key when the fetch failed.
+    """
+    try:
+        with netconf_connect(device) as mgr:
+            return fetch_datasets_with(mgr, names)
+    except Exception as e:
+        return {name: _error_result(name, str(e) or type(e).__name__) for name in dict.fromkeys(names)}
@@ -0,0 +1,40 @@
+from collections import namedtuple
+
+# Row types for the high-cardinality results (FDB, routes, LDP bindings, port
+# counters). A namedtuple row is a bare tuple: no per-row dict and no repeated
+# key strings, which is what dominates memory at 200k MACs or 900k routes.
+# Templates read the fields as attributes; as_dict() is for JSON.
+
+
+def _as_dict(self):
+    """The row as a plain dict (for JsonResponse / json.dumps)."""
+    return dict(zip(self._fields, self))
+
+
+def record(name, fields):
+    """A namedtuple class with an as_dict() method."""
+    cls = namedtuple(name, fields)
+    cls.as_dict = _as_dict
+    return cls
+
+
+FdbEntry = record("FdbEntry", ["mac_address", "sap", "service_id", "type", "age"])
+
+RouteEntry = record("RouteEntry", [
+    "prefix", "next_hop", "protocol", "preference", "metric", "active",
+])
+
+LdpBinding = record("LdpBinding", [
+    "fec_prefix", "ingress_label", "egress_label", "next_hop", "peer",
+])
+
+PortCounters = record("PortCounters", [
+    "port_id", "description", "admin_state", "oper_state", "speed",
+    "in_octets", "out_octets", "in_packets", "out_packets",
+    "in_errors", "out_errors", "in_discards", "out_discards",
+])
+
+
+def as_dicts(rows):
+    """``[row.as_dict() for row in rows]``, leaving plain dicts alone."""
+    return [row.as_dict() if hasattr(row, "as_dict") else row for row in rows]
@@ -0,0 +1,550 @@
+import copy
+import itertools
+import time
+from xml.etree import ElementTree
+
+from .aio import BASE_10, BASE_11, NOTIFICATION_10, NS_BASE, NS_NOTIFICATION, frame
+from .fakeserver import FakeNetconfServer
+from .planner import _node_from_element, _project
+
+NS_STATE = "urn:nokia.com:sros:ns:yang:sr:state"
+NS_CONF = "urn:nokia.com:sros:ns:yang:sr:conf"
+NS_NOTIFICATIONS = "urn:nokia.com:sros:ns:yang:sr:notifications"
+
+SEVERITIES = ("critical", "major", "minor", "warning", "info", "info", "info", "info")
+
+
+def _leaf(parent, tag, text):
+    el = ElementTree.SubElement(parent, tag)
+    el.text = str(text)
+    return el
+
+
+def _s(tag):
+    return f"{{{NS_STATE}}}{tag}"
+
+
+def _c(tag):
+    return f"{{{NS_CONF}}}{tag}"
+
+
+def system_ip(index):
+    n = index + 1
+    return f"10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}"
+
+
+def port_id(n):
+    """The n-th port id (0-based): 1/1/1 .. 1/1/36, 1/2/1 .. and so on."""
+    return f"1/{n // 36 + 1}/{n % 36 + 1}"
+
+
+def mac_address(n):
+    return ":".join(f"{b:02x}" for b in (0x02, 0, n >> 24 & 255, n >> 16 & 255, n >> 8 & 255, n & 255))
+
+
+class SimulatedFleetData:
+    """Synthetic SR OS state/config shared by every simulated device.
+
+    The large lists (ports, FDB, routes) are built once and shared between
+    devices; ElementTree elements carry no parent pointer, so the same
+    element can sit in many device trees at no extra memory cost. Only the
+    per-device parts (system IP, LLDP neighbours, LDP/MPLS/BGP peers) are
+    built per device.
+    """
+
+    def __init__(self, devices=1, ports=48, macs=1000, routes=1000, services=10, log_events=200,
+                 log_size=None):
+        self.devices = devices
+        self.ports = max(ports, 2)
+        self.macs = macs
+        self.routes = routes
+        self.services = max(services, 1)
+        self.log_events = log_events
+        self.log_size = log_size or max(log_events, 1)
+        self.log_sequence = 0
+        self.started = time.monotonic()
+        self._counters = []
+        self._counters_at = 0.0
+        self._shared_ports = [self._state_port(n) for n in range(2, self.ports)]
+        self._shared_config_ports = [self._config_port(n) for n in range(self.ports)]
+        self._routes = self._route_entries()
+        self._vpls_state = self._vpls_state_entries()
+        self._log = self._log_entries()
+
+    # --- shared parts ---
+
+    def _state_port(self, n, lldp_peer=None):
+        port = ElementTree.Element(_s("port"))
+        _leaf(port, _s("port-id"), port_id(n))
+        _leaf(port, _s("description"), f"sim port {port_id(n)}")
+        _leaf(port, _s("admin-state"), "enable")
+        _leaf(port, _s("oper-state"), "up" if n % 10 else "down")
+        ethernet = ElementTree.SubElement(port, _s("ethernet"))
+        _leaf(ethernet, _s("speed"), "100000" if n < 4 else "10000")
+        if lldp_peer is not None:
+            remote = ElementTree.SubElement(ElementTree.SubElement(ethernet, _s("lldp")), _s("remote-system"))
+            _leaf(remote, _s("system-name"), f"sim-{lldp_peer[0]}")
+            _leaf(remote, _s("port-id"), lldp_peer[1])
+            _leaf(remote, _s("port-description"), f"to sim-{lldp_peer[0]}")
+            _leaf(remote, _s("system-description"), "Nokia 7750 SR (simulated)")
+        stats = ElementTree.SubElement(port, _s("statistics"))
+        rate = (n % 50 + 1) * 1_000_000  # octets/s
+        for name, per_second in (
+            ("in-octets", rate), ("out-octets", rate // 2),
+            ("in-packets", rate // 800), ("out-packets", rate // 1600),
+            ("in-errors", n % 3), ("out-errors", 0),
+            ("in-discards", n % 2), ("out-discards", 0),
+        ):
+            self._counters.append((_leaf(stats, _s(name), 0), per_second))
+        return port
+
+    def _config_port(self, n):
+        port = ElementTree.Element(_c("port"))
+        _leaf(port, _c("port-id"), port_id(n))
+        _leaf(port, _c("description"), f"sim port {port_id(n)}")
+        _leaf(port, _c("admin-state"), "enable")
+        if 2 <= n < 4:
+            _leaf(ElementTree.SubElement(port, _c("ethernet")), _c("lag"), "1")
+        return port
+
+    def _route_entries(self):
+        routes = []
+        for n in range(self.routes):
+            route = ElementTree.Element(_s("route"))
+            _leaf(route, _s("ip-prefix"), f"172.{16 + n // 65536 % 16}.{n // 256 % 256}.{n % 256}/32")
+            _leaf(ElementTree.SubElement(route, _s("next-hop")), _s("ip-address"), "192.168.0.1")
+            _leaf(route, _s("route-type"), ("isis", "bgp", "static")[n % 3])
+            _leaf(route, _s("preference"), (18, 170, 5)[n % 3])
+            _leaf(route, _s("metric"), n % 100)
+            _leaf(route, _s("active"), "true")
+            routes.append(route)
+        return routes
+
+    def _vpls_state_entries(self):
+        services = []
+        per_service = -(-self.macs // self.services) if self.macs else 0
+        mac_numbers = iter(range(self.macs))
+        for s in range(self.services):
+            vpls = ElementTree.Element(_s("vpls"))
+            _leaf(vpls, _s("service-name"), f"vpls-{1000 + s}")
+            _leaf(vpls, _s("service-id"), 1000 + s)
+            _leaf(vpls, _s("oper-state"), "up")
+            sap_id = f"{port_id(4 + s % max(self.ports - 4, 1))}:{100 + s}"
+            sap = ElementTree.SubElement(vpls, _s("sap"))
+            _leaf(sap, _s("sap-id"), sap_id)
+            stats = ElementTree.SubElement(sap, _s("statistics"))
+            for name in ("ingress-packets", "ingress-octets", "egress-packets", "egress-octets"):
+                _leaf(stats, _s(name), 1000 * (s + 1))
+            _leaf(stats, _s("ingress-dropped-packets"), 0)
+            _leaf(stats, _s("egress-dropped-packets"), 0)
+            fdb = ElementTree.SubElement(vpls, _s("fdb"))
+            for n in itertools.islice(mac_numbers, per_service):
+                mac = ElementTree.SubElement(fdb, _s("mac"))
+                _leaf(mac, _s("address"), mac_address(n))
+                _leaf(mac, _s("sap"), sap_id)
+                _leaf(mac, _s("type"), "learned")
+                _leaf(mac, _s("age"), n % 300)
+            services.append(vpls)
+        return services
+
+    def _log_entries(self):
+        log_id = ElementTree.Element(_s("log-id"))
+        _leaf(log_id, _s("name"), "90")
+        self._log_id = log_id
+        self.add_log_events(self.log_events)
+        return log_id
+
+    def add_log_events(self, count):
+        """Append ``count`` events to log 90, dropping the oldest past ``log_size``
+        (a memory log wraps like this on a real router). Returns the new events."""
+        added = []
+        for _ in range(count):
+            self.log_sequence += 1
+            n = self.log_sequence - 1
+            event = ElementTree.SubElement(self._log_id, _s("event"))
+            _leaf(event, _s("sequence-number"), n + 1)
+            _leaf(event, _s("timestamp"), time.strftime("%Y/%m/%d %H:%M:%S", time.gmtime()))
+            _leaf(event, _s("severity"), SEVERITIES[n % len(SEVERITIES)])
+            _leaf(event, _s("application"), ("SNMP", "CHASSIS", "LDP", "PORT")[n % 4])
+            _leaf(event, _s("event-id"), 2000 + n % 50)
+            _leaf(event, _s("subject"), port_id(n % self.ports))
+            _leaf(event, _s("message"), f"Simulated event {n + 1}")
+            added.append(event)
+        events = self._log_id.findall(_s("event"))
+        for event in events[:max(len(events) - self.log_size, 0)]:
+            self._log_id.remove(event)
+        return added
+
+    def clear_log(self):
+        """``clear log 90``: drop every event and restart the sequence numbers."""
+        for event in self._log_id.findall(_s("event")):
+            self._log_id.remove(event)
+        self.log_sequence = 0
+
+    def refresh_counters(self):
+        """Advance every port counter to "now" (at most once per second)."""
+        now = time.monotonic()
+        if now - self._counters_at < 1.0:
+            return
+        self._counters_at = now
+        elapsed = now - self.started
+        for elem, per_second in self._counters:
+            elem.text = str(int(per_second * elapsed))
+
+    # --- per-device trees ---
+
+    def neighbours(self, index):
+        """Ring topology: port 1/1/1 faces the previous device, 1/1/2 the next."""
+        if self.devices < 2:
+            return []
+        return [
+            (port_id(0), (index - 1) % self.devices, port_id(1)),
+            (port_id(1), (index + 1) % self.devices, port_id(0)),
+        ]
+
+    def state_tree(self, index):
+        state = ElementTree.Element(_s("state"))
+        neighbours = {local: (peer, remote) for local, peer, remote in self.neighbours(index)}
+        for n in range(2):
+            state.append(self._state_port(n, neighbours.get(port_id(n))))
+        state.extend(self._shared_ports)
+
+        lag = ElementTree.SubElement(state, _s("lag"))
+        _leaf(lag, _s("lag-id"), "1")
+        _leaf(lag, _s("oper-state"), "up")
+        _leaf(lag, _s("active-port-count"), 2)
+        _leaf(lag, _s("configured-port-count"), 2)
+        _leaf(lag, _s("speed"), "200000")
+
+        router = ElementTree.SubElement(state, _s("router"))
+        _leaf(router, _s("router-name"), "Base")
+        interface = ElementTree.SubElement(router, _s("interface"))
+        _leaf(interface, _s("interface-name"), "system")
+        primary = ElementTree.SubElement(ElementTree.SubElement(interface, _s("ipv4")), _s("primary"))
+        _leaf(primary, _s("address"), system_ip(index))
+
+        ldp = ElementTree.SubElement(router, _s("ldp"))
+        mpls = ElementTree.SubElement(router, _s("mpls"))
+        tunnels = ElementTree.SubElement(router, _s("tunnel-table"))
+        bgp = ElementTree.SubElement(router, _s("bgp"))
+        bindings = ElementTree.SubElement(ldp, _s("bindings"))
+        peers = sorted({peer for _, peer, _ in self.neighbours(index)})
+        for peer in peers:
+            peer_ip = system_ip(peer)
+            session = ElementTree.SubElement(ldp, _s("session"))
+            _leaf(session, _s("peer-address"), peer_ip)
+            _leaf(session, _s("local-address"), system_ip(index))
+            _leaf(session, _s("session-state"), "established")
+            _leaf(session, _s("adjacency-type"), "link")
+            _leaf(session, _s("up-time"), "86400")
+            active = ElementTree.SubElement(bindings, _s("active"))
+            _leaf(active, _s("fec-prefix"), f"{peer_ip}/32")
+            _leaf(active, _s("ingress-label"), 131000 + peer % 1000)
+            _leaf(active, _s("egress-label"), 132000 + peer % 1000)
+            _leaf(active, _s("next-hop"), peer_ip)
+            _leaf(active, _s("peer"), peer_ip)
+
+            lsp = ElementTree.SubElement(mpls, _s("lsp"))
+            _leaf(lsp, _s("lsp-name"), f"to-sim-{peer}")
+            _leaf(lsp, _s("from"), system_ip(index))
+            _leaf(lsp, _s("to"), peer_ip)
+            _leaf(lsp, _s("admin-state"), "enable")
+            _leaf(lsp, _s("oper-state"), "up")
+            _leaf(lsp, _s("metric"), 10)
+            hop = ElementTree.SubElement(ElementTree.SubElement(lsp, _s("path")), _s("hop"))
+            _leaf(hop, _s("address"), peer_ip)
+
+            tunnel = ElementTree.SubElement(tunnels, _s("tunnel"))
+            _leaf(tunnel, _s("destination"), f"{peer_ip}/32")
+            _leaf(tunnel, _s("tunnel-id"), peer % 65536)
+            _leaf(tunnel, _s("protocol"), "ldp")
+            _leaf(tunnel, _s("next-hop"), peer_ip)
+            _leaf(tunnel, _s("metric"), 10)
+            _leaf(tunnel, _s("oper-state"), "up")
+
+            neighbor = ElementTree.SubElement(bgp, _s("neighbor"))
+            _leaf(neighbor, _s("ip-address"), peer_ip)
+            _leaf(neighbor, _s("peer-as"), 65000)
+            _leaf(neighbor, _s("local-as"), 65000)
+            _leaf(neighbor, _s("session-state"), "Established")
+            _leaf(neighbor, _s("up-time"), "86400")
+            bgp_stats = ElementTree.SubElement(neighbor, _s("statistics"))
+            _leaf(bgp_stats, _s("received-routes"), self.routes)
+            _leaf(bgp_stats, _s("sent-routes"), self.routes)
+            _leaf(bgp_stats, _s("active-routes"), self.routes // 2)
+        ldp_stats = ElementTree.SubElement(ldp, _s("statistics"))
+        _leaf(ldp_stats, _s("active-sessions"), len(peers))
+        _leaf(ldp_stats, _s("active-targeted-sessions"), 0)
+        _leaf(ldp_stats, _s("active-link-adjacencies"), len(peers))
+        unicast = ElementTree.SubElement(ElementTree.SubElement(router, _s("route-table")), _s("unicast"))
+        ElementTree.SubElement(unicast, _s("ipv4")).extend(self._routes)
+
+        service = ElementTree.SubElement(state, _s("service"))
+        service.extend(self._vpls_state)
+        for peer in peers:
+            sdp = ElementTree.SubElement(service, _s("sdp"))
+            _leaf(sdp, _s("sdp-id"), 100 + peer % 1000)
+            _leaf(ElementTree.SubElement(sdp, _s("far-end")), _s("ip-address"), system_ip(peer))
+            _leaf(sdp, _s("admin-state"), "enable")
+            _leaf(sdp, _s("oper-state"), "up")
+            _leaf(sdp, _s("delivery-type"), "mpls")
+            _leaf(sdp, _s("signaling"), "tldp")
+            _leaf(ElementTree.SubElement(sdp, _s("binding")), _s("service-id"), 1000)
+
+        ElementTree.SubElement(state, _s("log")).append(self._log)
+        system = ElementTree.SubElement(state, _s("system"))
+        _leaf(system, _s("up-time"), int(time.monotonic() - self.started))
+        return state
+
+    def config_tree(self, index):
+        configure = ElementTree.Element(_c("configure"))
+        configure.extend(self._shared_config_ports)
+        lag = ElementTree.SubElement(configure, _c("lag"))
+        _leaf(lag, _c("lag-id"), "1")
+        _leaf(lag, _c("description"), "sim uplink LAG")
+        _leaf(lag, _c("admin-state"), "enable")
+        _leaf(lag, _c("mode"), "network")
+        for n in (2, 3):
+            _leaf(ElementTree.SubElement(lag, _c("port")), _c("port-id"), port_id(n))
+        service = ElementTree.SubElement(configure, _c("service"))
+        for s in range(self.services):
+            vpls = ElementTree.SubElement(service, _c("vpls"))
+            _leaf(vpls, _c("service-name"), f"vpls-{1000 + s}")
+            _leaf(vpls, _c("service-id"), 1000 + s)
+            _leaf(vpls, _c("customer"), "1")
+            _leaf(vpls, _c("admin-state"), "enable")
+        return configure
+
+
+class SimulatedDevice:
+    """Datastores of one simulated router: state, running and candidate."""
+
+    def __init__(self, index, data):
+        self.index = index
+        self.data = data
+        self.state = data.state_tree(index)
+        self.running = data.config_tree(index)
+        self.candidate = None  # Copy-on-write: created by the first edit-config.
+        self.rollback = None  # Running config to restore if a confirmed commit times out.
+        self.confirm_deadline = None
+        self.commits = 0
+
+    def datastore(self, name):
+        if name == "candidate" and self.candidate is not None:
+            return self.candidate
+        return self.running
+
+    def check_confirm_timeout(self):
+        if self.confirm_deadline is not None and time.monotonic() > self.confirm_deadline:
+            self.running = self.rollback
+            self.rollback = self.confirm_deadline = None
+
+
+def select(root, filter_elem):
+    """Apply a subtree <filter> element to a datastore root (RFC 6241 6.2)."""
+    data = ElementTree.Element(f"{{{NS_BASE}}}data")
+    if filter_elem is None or len(filter_elem) == 0:
+        data.append(root)
+        return data
+    for top in filter_elem:
+        if top.tag != root.tag:
+            continue
+        projected = _project(root, _node_from_element(top))
+        if projected is not None:
+            data.append(projected)
+    return data
+
+
+def _operation(elem):
+    return elem.get(f"{{{NS_BASE}}}operation", "")
+
+
+def _list_key(elem):
+    """The first leaf child of a list entry, used to match it (port-id, service-id, ...)."""
+    for child in elem:
+        if len(child) == 0 and (child.text or "").strip():
+            return child.tag, child.text.strip()
+    return None
+
+
+def _find_match(target, edit):
+    key = _list_key(edit) if len(edit) else None
+    for existing in target.findall(edit.tag):
+        if key is None:
+            return existing
+        if (existing.findtext(key[0]) or "").strip() == key[1]:
+            return existing
+    return None
+
+
+def merge_config(target, edit):
+    """Merge an <edit-config> subtree into ``target`` (merge/replace/delete)."""
+    for child in edit:
+        operation = _operation(child)
+        existing = _find_match(target, child)
+        if operation in ("delete", "remove"):
+            if existing is None and operation == "delete":
+                raise ValueError(f"data-missing: {child.tag.split('}')[-1]} does not exist")
+            if existing is not None:
+                target.remove(existing)
+            continue
+        if len(child) == 0:
+            if existing is None:
+                existing = ElementTree.SubElement(target, child.tag)
+            existing.text = child.text
+            continue
+        if existing is None or operation == "replace":
+            if existing is not None:
+                target.remove(existing)
+            existing = ElementTree.SubElement(target, child.tag)
+        merge_config(existing, child)
+
+
+def validate_config(configure):
+    """Minimal semantic checks standing in for the router's commit validation."""
+    for vpls in configure.iter(_c("vpls")):
+        service_id = vpls.findtext(_c("service-id"))
+        if not service_id or not service_id.strip().isdigit():
+            raise ValueError("invalid-value: VPLS service-id must be numeric")
+        if vpls.find(_c("customer")) is None:
+            raise ValueError(f"missing-element: VPLS {service_id} has no customer")
+
+
+class SrosSimulator(FakeNetconfServer):
+    """FakeNetconfServer that behaves like a fleet of 7750 SRs.
+
+    Each listening port is one device. <get>/<get-config> honour subtree
+    filters (so only the requested slice is serialized and sent), and
+    edit-config/validate/commit/discard-changes operate on a per-device
+    candidate datastore, including confirmed commits with rollback.
+    create-subscription (RFC 5277) subscribes a session to log 90: events
+    added with emit_log_events() are pushed to it as SR OS
+    <sros-log-generic-event> notifications. With ``notifications=False``
+    the devices behave like routers without a netconf log destination.
+    """
+
+    capabilities = (
+        BASE_10, BASE_11, NOTIFICATION_10,
+        "urn:ietf:params:netconf:capability:candidate:1.0",
+        "urn:ietf:params:netconf:capability:validate:1.0",
+        "urn:ietf:params:netconf:capability:validate:1.1",
+        "urn:ietf:params:netconf:capability:confirmed-commit:1.0",
+        "urn:ietf:params:netconf:capability:confirmed-commit:1.1",
+        f"{NS_CONF}?module=nokia-conf",
+        f"{NS_STATE}?module=nokia-state",
+    )
+
+    def __init__(self, data, latency=0.0, notifications=True):
+        super().__init__(latency=latency)
+        self.data = data
+        self.devices = {}  # listening port -> SimulatedDevice
+        self.edits = 0
+        self.notifications = notifications
+        self.subscribers = []  # contexts of sessions that called create-subscription
+        if not notifications:
+            self.capabilities = tuple(c for c in self.capabilities if c != NOTIFICATION_10)
+
+    async def start(self, host="127.0.0.1", ports=(0,)):
+        bound = await super().start(host, ports)
+        for index, port in enumerate(bound):
+            self.devices[port] = SimulatedDevice(index, self.data)
+        return bound
+
+    def handle_rpc(self, operation, context):
+        device = self.devices[context["port"]]
+        device.check_confirm_timeout()
+        op = operation.tag.split("}")[-1]
+
+        if op == "get":
+            self.data.refresh_counters()
+            return self._reply_data(device.state, operation)
+        if op == "get-config":
+            return self._reply_data(device.datastore(_source(operation)), operation)
+        if op == "edit-config":
+            config = operation.find(f"{{{NS_BASE}}}config")
+            if device.candidate is None:
+                device.candidate = copy.deepcopy(device.running)
+            for configure in (config if config is not None else ()):
+                if configure.tag == device.candidate.tag:
+                    merge_config(device.candidate, configure)
+            self.edits += 1
+            return "<ok/>"
+        if op == "validate":
+            validate_config(device.datastore(_source(operation)))
+            return "<ok/>"
+        if op == "commit":
+            confirmed = operation.find(f"{{{NS_BASE}}}confirmed") is not None
+            if device.candidate is not None:
+                validate_config(device.candidate)
+                if confirmed and device.rollback is None:
+                    device.rollback = device.running
+                device.running, device.candidate = device.candidate, None
+            if confirmed:
+                timeout = operation.findtext(f"{{{NS_BASE}}}confirm-timeout") or "600"
+                device.confirm_deadline = time.monotonic() + int(timeout)
+            else:
+                device.rollback = device.confirm_deadline = None
+            device.commits += 1
+            return "<ok/>"
+        if op == "cancel-commit":
+            if device.rollback is not None:
+                device.running = device.rollback
+                device.rollback = device.confirm_deadline = None
+            return "<ok/>"
+        if op == "discard-changes":
+            device.candidate = None
+            return "<ok/>"
+        if op == "create-subscription":
+            if not self.notifications:
+                raise ValueError("operation-not-supported: no netconf log destination")
+            if context in self.subscribers:
+                raise ValueError("in-use: session already has a subscription")
+            self.subscribers.append(context)
+            return "<ok/>"
+        return super().handle_rpc(operation, context)
+
+    def emit_log_events(self, count):
+        """Add ``count`` events to log 90 and notify every subscribed session.
+
+        Safe to call from any thread while the server runs in start_in_thread().
+        """
+        messages = [_log_notification(event) for event in self.data.add_log_events(count)]
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._notify, messages)
+        else:
+            self._notify(messages)
+        return len(messages)
+
+    def _notify(self, messages):
+        for context in list(self.subscribers):
+            stdout = context["process"].stdout
+            try:
+                for message in messages:
+                    stdout.write(frame(message, context.get("chunked", False)))
+            except Exception:
+                self.subscribers.remove(context)  # session gone
+
+    def _reply_data(self, root, operation):
+        data = select(root, operation.find(f"{{{NS_BASE}}}filter"))
+        return ElementTree.tostring(data, encoding="unicode")
+
+
+def _log_notification(event):
+    """An SR OS log event notification for one simulated log 90 <event>."""
+    generic = ElementTree.Element(f"{{{NS_NOTIFICATIONS}}}sros-log-generic-event")
+    _leaf(generic, f"{{{NS_NOTIFICATIONS}}}log-id", "90")
+    for tag in ("sequence-number", "severity", "application", "event-id", "subject", "message"):
+        _leaf(generic, f"{{{NS_NOTIFICATIONS}}}{tag}", event.findtext(_s(tag)))
+    _leaf(generic, f"{{{NS_NOTIFICATIONS}}}event-name", "tmnxSimulatedEvent")
+    notification = ElementTree.Element(f"{{{NS_NOTIFICATION}}}notification")
+    _leaf(notification, f"{{{NS_NOTIFICATION}}}eventTime",
+          time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+    notification.append(generic)
+    return ElementTree.tostring(notification, encoding="unicode")
+
+
+def _source(operation):
+    source = operation.find(f"{{{NS_BASE}}}source")
+    if source is not None and len(source):
+        return source[0].tag.split("}")[-1]
+    return "running"
@@ -90,6 +90,68 @@ LOGOUT_REDIRECT_URL = "/accounts/login/"
 # Fernet encryption key for device passwords
 FERNET_KEY = os.getenv("FERNET_KEY", "")
 
+# --- NETCONF ---
+
+# Connect/RPC timeout in seconds for a single NETCONF session
+NETCONF_TIMEOUT = int(os.getenv("NETCONF_TIMEOUT", "30"))
+
+# Warm per-device session pool (see netconf_lib.connection)
+NETCONF_POOL_ENABLED = os.getenv("NETCONF_POOL_ENABLED", "True").lower() in ("true", "1", "yes")
+NETCONF_POOL_MAX_PER_DEVICE = int(os.getenv("NETCONF_POOL_MAX_PER_DEVICE", "4"))
+NETCONF_POOL_IDLE_TIMEOUT = int(os.getenv("NETCONF_POOL_IDLE_TIMEOUT", "300"))
+NETCONF_POOL_KEEPALIVE_INTERVAL = int(os.getenv("NETCONF_POOL_KEEPALIVE_INTERVAL", "60"))
+
+# Per-device circuit breaker: after THRESHOLD consecutive connect failures, fail
+# fast for BACKOFF seconds (doubling per failed probe, capped at MAX_BACKOFF)
+NETCONF_BREAKER_THRESHOLD = int(os.getenv("NETCONF_BREAKER_THRESHOLD", "3"))
+NETCONF_BREAKER_BACKOFF = int(os.getenv("NETCONF_BREAKER_BACKOFF", "30"))
+NETCONF_BREAKER_MAX_BACKOFF = int(os.getenv("NETCONF_BREAKER_MAX_BACKOFF", "900"))
+
+# --- FDB table ---
+
+# Seconds the FDB table page reuses a device's FDB between draws (paging, sorting, search)
+FDB_CACHE_TTL = int(os.getenv("FDB_CACHE_TTL", "30"))
+
+# --- Port counter history (see sample_port_counters) ---
+
+# Seconds between samples, and days to keep poll/hourly/daily rows
+PORT_SAMPLE_INTERVAL = int(os.getenv("PORT_SAMPLE_INTERVAL", "60"))
+PORT_SAMPLE_RETENTION_DAYS = {
+    "1m": int(os.getenv("PORT_SAMPLE_RETENTION_MINUTE_DAYS", "2")),
+    "1h": int(os.getenv("PORT_SAMPLE_RETENTION_HOUR_DAYS", "30")),
+    "1d": int(os.getenv("PORT_SAMPLE_RETENTION_DAY_DAYS", "365")),
+}
+
+# --- Health score history (see rollup_health) ---
+
+# Days to keep raw scores and their hourly/daily rollups
+HEALTH_RETENTION_DAYS = {
+    "raw": int(os.getenv("HEALTH_RETENTION_RAW_DAYS", "14")),
+    "1h": int(os.getenv("HEALTH_RETENTION_HOUR_DAYS", "90")),
+    "1d": int(os.getenv("HEALTH_RETENTION_DAY_DAYS", "730")),
+}
+
+# --- Topology (see apps/topology/builder.py) ---
+
+# Seconds a device's topology poll is reused before the device is polled again
+TOPOLOGY_POLL_TTL = int(os.getenv("TOPOLOGY_POLL_TTL", "300"))
+# Seconds between graph rebuilds by refresh_topology (keep below TOPOLOGY_POLL_TTL so
+# topology_data always finds a warm graph), and before a stuck rebuild is taken over
+TOPOLOGY_REFRESH_INTERVAL = int(os.getenv("TOPOLOGY_REFRESH_INTERVAL", "60"))
+TOPOLOGY_BUILD_TIMEOUT = int(os.getenv("TOPOLOGY_BUILD_TIMEOUT", "120"))
+# Days of topology snapshot history to keep, and deltas stored per full (base) snapshot
+TOPOLOGY_SNAPSHOT_RETENTION_DAYS = int(os.getenv("TOPOLOGY_SNAPSHOT_RETENTION_DAYS", "30"))
+TOPOLOGY_SNAPSHOT_BASE_EVERY = int(os.getenv("TOPOLOGY_SNAPSHOT_BASE_EVERY", "50"))
+
+# --- Log event notifications (see subscribe_logs) ---
+
+# NETCONF stream the devices send log 90 events on ("" = the default NETCONF stream)
+LOG_NOTIFICATION_STREAM = os.getenv("LOG_NOTIFICATION_STREAM", "")
+# Seconds the writer collects events before storing them in one transaction
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "5"))
+# Seconds between full log reads of a subscribed device (catch-up, aged-out events)
+LOG_RESYNC_INTERVAL = int(os.getenv("LOG_RESYNC_INTERVAL", "3600"))
+
 # --- Security Settings ---
 
 # Session expires after 30 minutes of inactivity